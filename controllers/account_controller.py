@@ -1,4 +1,16 @@
 from fastapi import Request
+from scripts.principal import load_principal
+from scripts.refresh_token_store import revoke_user_refresh_tokens
+from scripts.ttl_cache import token_verification_cache
 
 async def delete_account(request: Request, token):
-    return token
\ No newline at end of file
+    # tokens for a deleted account must not keep passing verification out of the cache
+    token_verification_cache.revoke_user_tokens(token['email'])
+
+    # nor can its refresh tokens be allowed to mint new access tokens
+    user = await load_principal(request, token['email'])
+
+    if user is not None:
+        await revoke_user_refresh_tokens(request, user['_id'])
+
+    return token
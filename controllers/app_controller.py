@@ -1,5 +1,22 @@
+from scripts.password_hashing import password_hasher
+from scripts.ttl_cache import populated_calendar_cache, recurrence_expansion_cache, token_verification_cache, user_search_cache, calendar_permission_cache
+
+
 async def welcome_request():    
     return {'message': "Welcome to the API"}
 
 async def api_welcome_request():
-    return {'message': 'Using the /api prefix please request the correct data needed'}
\ No newline at end of file
+    return {'message': 'Using the /api prefix please request the correct data needed'}
+
+async def cache_metrics_request():
+    return {
+        'populated_calendar_cache': populated_calendar_cache.stats(),
+        'recurrence_expansion_cache': recurrence_expansion_cache.stats(),
+        'token_verification_cache': token_verification_cache.stats(),
+        'user_search_cache': user_search_cache.stats(),
+        'calendar_permission_cache': calendar_permission_cache.stats(),
+    }
+
+
+async def password_hashing_metrics_request():
+    return password_hasher.stats()
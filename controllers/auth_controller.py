@@ -2,9 +2,14 @@ from models.user import User, UserLogin
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
-from scripts.jwt_token_encoders import encode_bearer_token, encode_refresh_token
+from scripts.jwt_token_encoders import encode_bearer_token, encode_bearer_token_for_email
+from scripts.jwt_token_decoders import decode_refresh_token
+from scripts.refresh_token_store import issue_refresh_token, rotate_refresh_token, revoke_refresh_token_family
+from scripts.bson_json_response import BSONJSONResponse
+from scripts.password_hashing import password_hasher
 from models.calendar import Calendar
-import bcrypt
+from services.service_helpers.user_search_helpers import UserSearchHelper
+from services.service_helpers.calendar_member_helpers import CalendarMemberHelper
 
 async def sign_up(request: Request, user: User):
     # check if email has already been registered
@@ -34,19 +39,16 @@ async def sign_up(request: Request, user: User):
                 "success": True,
                 "user": user_data_stripped,
             }
+    except HTTPException:
+        raise
     except Exception as e:
         return JSONResponse(content={'detail': f'Server side error, which was: {e}'}, status_code=500)
     
 
 async def finish_user_setup(request: Request, user: User):
     # no errors on form, email is not already registered and has been checked, continue sanitizing
-    # hash password
-    password_in_bytes = user.password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hash = bcrypt.hashpw(password_in_bytes, salt)
-
-    # store hashed password
-    user.password = hash
+    # hash password off the event loop and store it
+    user.password = await password_hasher.hash_password(user.password)
 
     # build personal calendar
     calendar = await build_personal_calendar_for_new_user(request, user)
@@ -59,15 +61,19 @@ async def finish_user_setup(request: Request, user: User):
 
     # convert user object into a dictionary
     user_data = jsonable_encoder(user)
+    user_data['search_terms'] = UserSearchHelper.build_search_terms(user_data)
+    user_data['fuzzy_search_keys'] = UserSearchHelper.build_fuzzy_search_keys(user_data['search_terms'])
 
     return user_data
     
 
 async def build_personal_calendar_for_new_user(request: Request, user: User):
     new_calendar = Calendar(calendar_color="", calendar_type="personal", name=f"{user.first_name}'s Personal Calendar", user_id=user.id)
-    calendar_upload = await request.app.db['calendars'].insert_one(jsonable_encoder(new_calendar))
+    calendar_document = jsonable_encoder(new_calendar)
+    calendar_upload = await request.app.db['calendars'].insert_one(calendar_document)
     
     if calendar_upload is not None:
+        await CalendarMemberHelper.upsert_members(request, CalendarMemberHelper.build_calendar_members(calendar_document))
         return new_calendar.id
     else:
         return JSONResponse(content={'detail': 'Failed to create personal calendar'}, status_code=422)
@@ -79,9 +85,9 @@ async def user_login(request: Request, user_login: UserLogin):
             "email": user_login.email,
         })
 
-        if user_lookup is None or not bcrypt.checkpw(
-            user_login.password.encode(), 
-            user_lookup['password'].encode()
+        if user_lookup is None or not await password_hasher.check_password(
+            user_login.password, 
+            user_lookup['password']
         ):
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
@@ -90,13 +96,13 @@ async def user_login(request: Request, user_login: UserLogin):
         del user_response['password']
         
         bearer_token = encode_bearer_token(user_login)
-        refresh_token = encode_refresh_token(user_lookup['_id'])
+        refresh_token = await issue_refresh_token(request, user_lookup['_id'])
 
 
-        response = JSONResponse({
+        response = BSONJSONResponse({
             "message": "You have been successfully logged in",
             "status": True,
-            "user": jsonable_encoder(user_response),
+            "user": user_response,
         }, status_code=200)
 
         response.headers["Authorization"] = f"Bearer {bearer_token}"
@@ -104,9 +110,64 @@ async def user_login(request: Request, user_login: UserLogin):
 
         return response
 
-
+    except HTTPException:
+        # bad credentials and a saturated hashing pool keep their status codes
+        raise
     except Exception as e:
         return {
             "detail": "There was a server error processing your request",
             "errors": f"{e}",
-        }
\ No newline at end of file
+        }
+
+
+async def refresh_bearer_token(request: Request):
+    # trades the refresh cookie for a new bearer token, no password check or full user read involved
+    refresh_token = request.cookies.get("refresh_token")
+
+    if refresh_token is None:
+        raise HTTPException(status_code=401, detail="Missing refresh token")
+    
+    payload = decode_refresh_token(refresh_token)
+    rotated_refresh_token = await rotate_refresh_token(request, payload)
+
+    user_lookup = await request.app.db['users'].find_one(
+        {"_id": payload['sub']},
+        projection={"email": 1},
+    )
+
+    if user_lookup is None:
+        await revoke_refresh_token_family(request, payload['family'])
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    
+    bearer_token = encode_bearer_token_for_email(user_lookup['email'])
+
+    response = JSONResponse({
+        "message": "Your session has been refreshed",
+        "status": True,
+    }, status_code=200)
+
+    response.headers["Authorization"] = f"Bearer {bearer_token}"
+    response.set_cookie("refresh_token", rotated_refresh_token, httponly=True, secure=True, samesite="Lax")
+
+    return response
+
+
+async def user_logout(request: Request):
+    refresh_token = request.cookies.get("refresh_token")
+
+    if refresh_token is not None:
+        try:
+            payload = decode_refresh_token(refresh_token)
+            await revoke_refresh_token_family(request, payload['family'])
+        except HTTPException:
+            # an expired or unknown cookie has nothing left to revoke, it is still cleared below
+            pass
+
+    response = JSONResponse({
+        "message": "You have been logged out",
+        "status": True,
+    }, status_code=200)
+
+    response.delete_cookie("refresh_token", httponly=True, secure=True, samesite="Lax")
+
+    return response
\ No newline at end of file
@@ -1,14 +1,18 @@
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
-from models.calendar import PendingUser, Calendar, CalendarNote, Event, UserRef
+from models.calendar import PendingUser, CalendarNote, Event, UserRef
 from services.app_data_services import AppData
 from services.calendar_services import CalendarData
 from services.service_helpers.calendar_service_helpers import CalendarDataHelper
+from services.service_helpers.calendar_member_helpers import CalendarMemberHelper
 from models.color_scheme import ColorScheme
 from fastapi.encoders import jsonable_encoder
 from pydantic import ValidationError
 from datetime import datetime
+from typing import Optional
 from scripts.json_parser import json_parser
+from scripts.bson_json_response import BSONJSONResponse
+from scripts.principal import load_principal
 import logging
 import asyncio
 
@@ -26,7 +30,17 @@ async def fetch_calendar_app_data(request: Request):
     return calendar_app_data
     
 
-async def fetch_all_user_calendar_data(request: Request, user_email: str):
+async def fetch_all_user_calendar_data(
+        request: Request, 
+        user_email: str, 
+        start: Optional[str] = None, 
+        end: Optional[str] = None,
+    ):
+    date_window = CalendarDataHelper.build_date_window(start, end)
+
+    if isinstance(date_window, JSONResponse):
+        return date_window
+
     user = await CalendarData.get_user_calendars_service(
         request, 
         user_email
@@ -37,27 +51,40 @@ async def fetch_all_user_calendar_data(request: Request, user_email: str):
             
     user_with_populated_calendars = await CalendarData.fetch_all_user_calendars_service(
         request, 
-        user
+        user,
+        date_window,
     )
             
     if isinstance(user_with_populated_calendars, JSONResponse):
         return JSONResponse(content={'detail': 'Failed to fetch all user calendars'}, status_code=422)
     
-    return JSONResponse(
+    return BSONJSONResponse(
         content={
             'detail': 'All possible calendars fetched',
             'updated_user': user_with_populated_calendars,
+            'date_window': date_window,
         }
     )
     
 
+async def sync_user_calendars(request: Request, user_email: str):
+    return await CalendarData.sync_calendars_service(
+        request, 
+        user_email,
+    )
+
+
+async def fetch_free_busy(request: Request):
+    return await CalendarData.free_busy_service(request)
+
+
 async def post_new_calendar(request: Request):
     new_calendar = await CalendarData.create_new_calendar_service(request=request)
 
     if 'calendar' in new_calendar:
-        return JSONResponse(content={
+        return BSONJSONResponse(content={
             'detail': new_calendar['detail'],
-            'calendar': jsonable_encoder(new_calendar['calendar']),
+            'calendar': new_calendar['calendar'],
         }, status_code=200)
     else:
         return JSONResponse(content={'detail': new_calendar['detail']}, status_code=422)
@@ -171,6 +198,18 @@ async def post_event(
         )
 
 
+async def post_events(
+          request: Request, 
+          calendar_id: str, 
+          user_email: str
+    ):
+        return await CalendarData.post_events_service(
+            request, 
+            calendar_id, 
+            user_email,
+        )
+
+
 async def put_event(
         request: Request,
         calendar_id: str, 
@@ -191,21 +230,60 @@ async def delete_event(request: Request, calendar_id: str, event_id: str):
     )
 
 
+async def edit_event_occurrence(
+        request: Request,
+        calendar_id: str,
+        event_id: str,
+        occurrence_date: str,
+    ):
+        return await CalendarData.edit_event_occurrence_service(
+            request,
+            calendar_id,
+            event_id,
+            occurrence_date,
+        )
+
+
+async def delete_event_occurrence(
+        request: Request,
+        calendar_id: str,
+        event_id: str,
+        occurrence_date: str,
+    ):
+        return await CalendarData.delete_event_occurrence_service(
+            request,
+            calendar_id,
+            event_id,
+            occurrence_date,
+        )
+
+
 async def update_user_permissions(
         request: Request,
         calendar_id: str,
         new_user_permissions: str,
         user_id: str,
+        principal: dict,
     ):
-        calendar = await request.app.db['calendars'].find_one({'_id': calendar_id})
+        if new_user_permissions not in CalendarMemberHelper.roles:
+            return JSONResponse(content={'detail': 'that is not a valid permission type'}, status_code=422)
+
+        calendar, member, principal_member = await asyncio.gather(
+            request.app.db['calendars'].find_one({'_id': calendar_id}, projection={'created_by': 1}),
+            CalendarMemberHelper.find_member(request, calendar_id, user_id),
+            CalendarMemberHelper.find_member(request, calendar_id, principal['_id']),
+        )
 
         if calendar is None:
             return JSONResponse(content={'detail': 'that calendar could not be found'}, status_code=404)
         
+        if calendar['created_by'] != principal['_id'] and not CalendarMemberHelper.is_authorized(principal_member):
+            return JSONResponse(content={'detail': 'you do not have permission to change user permissions in this calendar'}, status_code=403)
+        
         if calendar['created_by'] == user_id:
           return JSONResponse(content={'detail': 'you cannot change the permissions of the calendar creator'}, status_code=422)
 
-        current_user_permissions = get_user_permissions_in_calendar(calendar, user_id)
+        current_user_permissions = get_user_permissions_in_calendar(member)
 
         if current_user_permissions is None:
             return JSONResponse(content={'detail': 'that user does not belong to this calendar'}, status_code=422)
@@ -232,18 +310,9 @@ async def update_user_permissions(
         }, status_code=200)
 
 
-def get_user_permissions_in_calendar(calendar: Calendar, userId: str):
-    if userId in calendar['authorized_users']:
-        return 'authorized'
-    
-    if userId in calendar['view_only_users']:
-        return 'view_only'
-
-    for user_instance in calendar['pending_users']:
-        if userId == user_instance['_id']:
-            return 'pending'
-        
-    return None
+def get_user_permissions_in_calendar(member: Optional[dict]):
+    # member is the user's calendar_members entry, None when they do not belong to the calendar
+    return CalendarMemberHelper.get_member_permissions(member)
 
 
 async def change_user_calendar_permissions(
@@ -303,29 +372,18 @@ async def remove_user_permissions(
 
 
 async def remove_pending_user_from_calendar(request: Request, calendar_id: str, user_id: str):
-    pending_users = await request.app.db['calendars'].find_one(
-        {'_id': calendar_id},
-        projection={
-            'pending_users': 1,
-        }
-    )
-
-    if pending_users is None:
-        return JSONResponse(content={'detail': 'could not retrieve pending users'}, status_code=422)
-    
-    filtered_users = pending_users['pending_users']
-
-    for user in filtered_users:
-        if user['_id'] == user_id:
-            filtered_users.remove(user)
-
     updated_pending_users = await request.app.db['calendars'].update_one(
         {'_id': calendar_id},
-        {'$set': {'pending_users': filtered_users}}
+        {'$pull': {'pending_users': {'_id': user_id}}}
     )
 
     if updated_pending_users is None:
         return JSONResponse(content={'detail': 'failed to update pending users list'}, status_code=422)
+    
+    await asyncio.gather(
+        CalendarMemberHelper.remove_member(request, calendar_id, user_id),
+        CalendarDataHelper.record_calendar_change(request, calendar_id, 'membership', user_id, 'delete'),
+    )
 
 
 async def remove_non_pending_user_from_calendar(
@@ -342,6 +400,11 @@ async def remove_non_pending_user_from_calendar(
         if calendar is None:
             return JSONResponse(content={'detail': 'that user\'s permission could not be changed'}, status_code=422)
         
+        await asyncio.gather(
+            CalendarMemberHelper.remove_member(request, calendar_id, user_id),
+            CalendarDataHelper.record_calendar_change(request, calendar_id, 'membership', user_id, 'delete'),
+        )
+        
         return calendar
 
 
@@ -364,6 +427,11 @@ async def add_user_permissions(
             if upload_pending_user is None:
                 return JSONResponse(content={'detail': 'failed to switch user to pending user'}, status_code=422)
             
+            await asyncio.gather(
+                CalendarMemberHelper.set_member(request, calendar_id, user_id, new_user_permissions, pending=True),
+                CalendarDataHelper.record_calendar_change(request, calendar_id, 'membership', user_id, 'upsert'),
+            )
+            
             return upload_pending_user
 
         else:
@@ -375,6 +443,11 @@ async def add_user_permissions(
             if upload_non_pending_user is None:
                 return JSONResponse(content={'detail': 'failed to switch user to pending user'}, status_code=422)
             
+            await asyncio.gather(
+                CalendarMemberHelper.set_member(request, calendar_id, user_id, new_user_permissions),
+                CalendarDataHelper.record_calendar_change(request, calendar_id, 'membership', user_id, 'upsert'),
+            )
+            
             return upload_non_pending_user
         
 
@@ -383,11 +456,8 @@ async def set_user_preferred_calendar_color(
         calendar_id: str,
         user_email: str,
     ):
-        calendar = await request.app.db['calendars'].find_one({'_id': calendar_id})
-        user = await request.app.db['users'].find_one({'email': user_email}, projection={
-            '_id': 1,
-            'user_color_preferences.calendars': 1,
-        })
+        calendar = await request.app.db['calendars'].find_one({'_id': calendar_id}, projection={'_id': 1})
+        user = await load_principal(request, user_email)
 
         if user is None or calendar is None:
             return JSONResponse(content={'detail': 'The user or calendar you sent could not be found'}, status_code=404)
@@ -409,30 +479,27 @@ async def set_user_preferred_calendar_color(
         if isinstance(color_preference_update, JSONResponse):
             return color_preference_update
         
-        return JSONResponse(content={
+        return BSONJSONResponse(content={
             'detail': 'Success! We added your preferences',
-            'preferredColor': jsonable_encoder(new_color_scheme),
+            'preferredColor': new_color_scheme,
         }, status_code=200)
 
 
 async def set_preferred_calendar_color(request: Request, user: object, new_color_scheme: ColorScheme):
     
-    # check if a color scheme is set, if so call function to replace the current color scheme
-    user_color_preferences = user['user_color_preferences']['calendars']
-    if user_color_preferences:
-        for color_preference in user_color_preferences:
-            if color_preference['object_id'] == new_color_scheme.object_id:
-                update_preference = await replace_old_calendar_color_preference(
-                    request, 
-                    user['_id'], 
-                    color_preference['object_id'],
-                    new_color_scheme,
-                )
-
-                if isinstance(update_preference, JSONResponse):
-                    return update_preference
-                
-                return update_preference
+    # replace the color scheme if one is set, the update only matches when it is, so no read is needed to check
+    update_preference = await replace_old_calendar_color_preference(
+        request, 
+        user['_id'], 
+        new_color_scheme.object_id,
+        new_color_scheme,
+    )
+
+    if isinstance(update_preference, JSONResponse):
+        return update_preference
+    
+    if update_preference.matched_count > 0:
+        return update_preference
 
     update_user = await add_preferred_calendar_color_to_user(
         request,
@@ -453,7 +520,7 @@ async def replace_old_calendar_color_preference(
         new_color_scheme
     ):
         user_update = await request.app.db['users'].update_one(
-            {'_id': user_id},
+            {'_id': user_id, 'user_color_preferences.calendars.object_id': old_color_scheme_id},
             {'$set': {f'user_color_preferences.calendars.$[query]': jsonable_encoder(new_color_scheme)}},
             array_filters=[{'query.object_id': old_color_scheme_id}]
         )
@@ -7,8 +7,13 @@ from models.project import Project
 from models.note import Note
 from models.notification import Notification
 from services.service_helpers.calendar_service_helpers import CalendarDataHelper
+from services.service_helpers.calendar_member_helpers import CalendarMemberHelper
+from services.service_helpers.membership_helpers import MembershipDataHelper
 from fastapi.encoders import jsonable_encoder
 from scripts.json_parser import json_parser
+from scripts.bson_json_response import BSONJSONResponse
+from scripts.data_loader import get_loaders
+from scripts.principal import load_principal
 import logging
 import asyncio
 
@@ -16,8 +21,9 @@ logger = logging.getLogger(__name__)
 
 
 def order_teams(ordered_team_id_list: list[str], retrieved_teams: list[Team]):
-    # ordered_team_id_list must be the un-populated id list of user['teams']
-    return sorted(retrieved_teams, key=lambda team: ordered_team_id_list.index(team['_id']))
+    # ordered_team_id_list must be the user's un-populated team ids, in membership order
+    team_positions = {team_id: position for position, team_id in enumerate(ordered_team_id_list)}
+    return sorted(retrieved_teams, key=lambda team: team_positions.get(team['_id'], len(team_positions)))
 
 
 async def create_team(request: Request):
@@ -46,9 +52,9 @@ async def create_team(request: Request):
     if isinstance(uploaded_and_populated_team, JSONResponse):
         return uploaded_and_populated_team
 
-    return JSONResponse(content={
+    return BSONJSONResponse(content={
         'detail': 'Success! We uploaded your team, invited users, and added a team calendar!',
-        'team': jsonable_encoder(uploaded_and_populated_team),
+        'team': uploaded_and_populated_team,
     }, status_code=200)
 
 
@@ -133,32 +139,29 @@ def convert_user_ref_list_to_pending_calendar_users_list(pending_users: list[Use
 
 async def upload_team_and_team_calendar_to_db(request: Request, new_team: Team, calendar: Calendar):
     try:
-        upload_calendar = await request.app.db['calendars'].insert_one(jsonable_encoder(calendar))
+        team_document = jsonable_encoder(new_team)
+        calendar_document = jsonable_encoder(calendar)
+
+        # the team and its calendar reference each other by pre-generated ids, so they can be inserted together
+        upload_calendar, upload_team, _ = await asyncio.gather(
+            request.app.db['calendars'].insert_one(calendar_document),
+            request.app.db['teams'].insert_one(team_document),
+            CalendarMemberHelper.upsert_members(request, CalendarMemberHelper.build_calendar_members(calendar_document)),
+        )
 
         if upload_calendar is None:
             return JSONResponse(content={'detail': 'failed to upload calendar'}, status_code=422)
-        
-        invite_calendar_users = await invite_users_to_team_calendar(request=request, calendar=calendar)
-
-        if isinstance(invite_calendar_users, JSONResponse):
-            return invite_calendar_users
-                
-        upload_team = await request.app.db['teams'].insert_one(jsonable_encoder(new_team))
-
         if upload_team is None:
             return JSONResponse(content={'detail': 'failed to upload team'}, status_code=422)
         
-        invite_team_users = await invite_users_to_team(request, new_team)
-
-        if isinstance(invite_team_users, JSONResponse):
-            return invite_team_users
-        
-        fetched_team = await request.app.db['teams'].find_one({'_id': upload_team.inserted_id})
+        # populating reads the team's own user lists, not the users' memberships, so it does not wait on the invites
+        invite_users, populated_team = await asyncio.gather(
+            invite_users_to_team(request, new_team),
+            populate_team(request=request, team=team_document),
+        )
 
-        if fetched_team is None:
-            return JSONResponse(content={'detail': 'failed to retrieve created team'}, status_code=404)
-        
-        populated_team = await populate_team(request=request, team=fetched_team)
+        if isinstance(invite_users, JSONResponse):
+            return invite_users
 
         return populated_team
         
@@ -167,92 +170,61 @@ async def upload_team_and_team_calendar_to_db(request: Request, new_team: Team,
         return JSONResponse(content={'detail': f'failed to upload calendar and or team to db, error: {e}'}, status_code=422)
 
 
-async def invite_users_to_team_calendar(request: Request, calendar: Calendar):
-    users_to_invite: list[str] = []
+def build_team_memberships(new_team: Team):
+    team_id = str(new_team.id)
+    creator_id = str(new_team.users[0])
 
-    for user in calendar.pending_users:
-        users_to_invite.append(user.user_id)
+    # the team calendar's members are written with the calendar, this only covers the team itself
+    return [
+        MembershipDataHelper.build_membership(user_id, 'team', team_id, state='pending')
+        for user_id in sorted({str(user_id) for user_id in new_team.pending_users} - {creator_id})
+    ] + [
+        # user who created the team has it added automatically
+        MembershipDataHelper.build_membership(creator_id, 'team', team_id),
+    ]
 
-    try:
-        # add calendar as a pending one for each invited user
-        async for user in request.app.db['users'].find({'_id': {'$in': users_to_invite}}):
-            request.app.db['users'].update_one(
-                {'_id': user['_id']},
-                {'$push': {'pending_calendars': str(calendar.id)}}
-            )
-
-        # user who created teh calendar should have it automatically added as an approved calendar
-        request.app.db['users'].update_one(
-            {'_id': calendar.authorized_users[0]},
-            {'$push': {'calendars': str(calendar.id)}}
-        )
-        return
-    except Exception as e:
-        logger.error(e)
-        return JSONResponse(content={'detail': f'we ran into an issue updating the invited users to the team calendar {e}'}, status_code=422)
-    
 
 async def invite_users_to_team(request: Request, new_team: Team):
-    try:
-        # add team_id to pending teams array for every invited user
-        async for user in request.app.db['users'].find({'_id': {'$in': new_team.pending_users}}):
-            request.app.db['users'].update_one(
-                {'_id': user['_id']},
-                {'$push': {'pending_teams': str(new_team.id)}}
-            )
-
-        # add team id to user who created the team automatically
-        request.app.db['users'].update_one(
-            {'_id': new_team.users[0]},
-            {'$push': {'teams': str(new_team.id)}}
-        )
+    invite_status = await MembershipDataHelper.upsert_memberships(request, build_team_memberships(new_team))
 
-    except Exception as e:
-        logger.error(e)
-        return JSONResponse(content={'detail': 'we failed to invite users to the team, error: {e}'}, status_code=422)
+    if invite_status is None:
+        return JSONResponse(content={'detail': 'we failed to invite users to the team'}, status_code=422)
+
+    return invite_status
     
 
 async def get_user_team_data(request: Request, user_email: str):
     # fetch all team refs attached to user
     try:
-        user = await request.app.db['users'].find_one(
-            {'email': user_email},
-            projection={
-                'teams': 1,
-                'pending_teams': 1,
-            }
-        )
+        user = await load_principal(request, user_email)
 
         if user is None:
             return JSONResponse(content={'detail': 'there was an issue accessing your account'}, status_code=404)
     
-        # keep teams in order, as order matters on client
-        retrieved_teams = await request.app.db['teams'].find(
-            {'_id': {'$in': user['teams']}}
-        ).to_list(None)
-
-        retrieved_pending_teams = await request.app.db['teams'].find(
-            {'_id': {'$in': user['pending_teams']}}
-        ).to_list(None)
+        user_team_ids, pending_team_ids = await asyncio.gather(
+            MembershipDataHelper.get_resource_ids(request, user, 'team'),
+            MembershipDataHelper.get_resource_ids(request, user, 'team', state='pending'),
+        )
 
-        if retrieved_teams is None or retrieved_pending_teams is None:
-            return JSONResponse(content={'detail': 'failed to retrieve team data'}, status_code=404)
+        retrieved_all_teams = await find_teams(request, user_team_ids + pending_team_ids)
 
-        # populate each team fully
-        populated_teams = await populate_teams(request, retrieved_teams)
-        populated_pending_teams = await populate_teams(request, retrieved_pending_teams)
+        # teams and pending teams are populated in one batch
+        populated_all_teams = await populate_teams(request, retrieved_all_teams)
 
-        ordered_teams = order_teams(ordered_team_id_list=user['teams'], retrieved_teams=retrieved_teams)
+        if isinstance(populated_all_teams, JSONResponse):
+            return populated_all_teams
+        
+        team_ids = set(user_team_ids)
+        populated_teams = [team for team in populated_all_teams if team['_id'] in team_ids]
+        populated_pending_teams = [team for team in populated_all_teams if team['_id'] not in team_ids]
 
-        if isinstance(populated_teams, JSONResponse):
-            return populate_team
-        if isinstance(populated_pending_teams, JSONResponse):
-            return populated_pending_teams
+        # keep teams in order, as order matters on client
+        ordered_teams = order_teams(ordered_team_id_list=user_team_ids, retrieved_teams=populated_teams)
         
-        return JSONResponse(content={
+        return BSONJSONResponse(content={
             'detail': 'Success! We populated all of your team data',
-            'teams': jsonable_encoder(ordered_teams),
-            'pending_teams': jsonable_encoder(populated_pending_teams),
+            'teams': ordered_teams,
+            'pending_teams': populated_pending_teams,
         }, status_code=200)
     
     except Exception as e:
@@ -260,124 +232,123 @@ async def get_user_team_data(request: Request, user_email: str):
         return JSONResponse(content={'detail': 'we failed to retrieve your team data'}, status_code=422)
 
 
-async def populate_teams(request: Request, teams: list[Team]):
-    return await asyncio.gather(*[populate_team(request=request, team=team) for team in teams])
-    
+async def find_teams(request: Request, team_ids: list[str]):
+    teams = await get_loaders(request).teams.load_many(team_ids)
+    # populating overwrites a team's fields and loaded documents are shared across the request, so work on copies
+    return [dict(team) for team in teams if team is not None]
 
-async def populate_team(request, team: Team): 
-    user_projection = {
-        'first_name': 1,
-        'last_name': 1,
-        'email': 1,
-        'job_title': 1,
-        'company': 1,
-        '_id': 1,
-    }
 
-    try:
-        calendar = await request.app.db['calendars'].find_one({'_id': team['calendar']})
-        populated_calendar = await CalendarDataHelper.populate_one_calendar(request=request, calendar_id=team['calendar'])
-        team['calendar'] = populated_calendar if populated_calendar is not None else calendar
-    except Exception as e:
-        logger.error(f"Failed to retrieve calendar: {e}")
+async def find_team_users(request: Request, user_ids: set):
+    # the same loader backs calendar populates, so members already loaded for a team calendar are not fetched again
+    users = await get_loaders(request).users.load_many(list(user_ids))
+    return {user['_id']: user for user in users if user is not None}
 
-    try:
-        retrieved_users = await request.app.db['users'].find(
-            {'_id': {'$in': team['users']}}, 
-            projection=user_projection
-        ).to_list(None)
-        team['users'] = retrieved_users
-    except Exception as e:
-        logger.error(f"Failed to retrieve users: {e}")
 
+async def find_documents_by_id(request: Request, collection: str, ids: set, projection: dict = None):
+    if len(ids) == 0:
+        return {}
+    
     try:
-        retrieved_pending_users = await request.app.db['users'].find(
-            {'_id': {'$in': team['pending_users']}},
-            projection=user_projection
+        documents = await request.app.db[collection].find(
+            {'_id': {'$in': list(ids)}},
+            projection=projection,
         ).to_list(None)
-        team['pending_users'] = retrieved_pending_users
+        return {document['_id']: document for document in documents}
     except Exception as e:
-        logger.error(f"Failed to retrieve pending users: {e}")
+        logger.error(f"Failed to retrieve {collection}: {e}")
+        return {}
+    
 
-    try:
-        retrieved_projects = await request.app.db['projects'].find(
-            {'_id': {'$in': team['projects']}}
-        ).to_list(None)
-        team['projects'] = retrieved_projects
-    except Exception as e:
-        logger.error(f"Failed to retrieve projects: {e}")
+async def find_team_calendars(request: Request, calendar_ids: set):
+    if len(calendar_ids) == 0:
+        return {}
+    
+    populated_calendars = await CalendarDataHelper.populate_individual_calendars(
+        request=request, 
+        calendar_ids=list(calendar_ids),
+    )
 
-    try:
-        retrieved_notes = await request.app.db['notes'].find(
-            {'_id': {'$in': team['notes']}}
-        ).to_list(None)
-        team['notes'] = retrieved_notes
-    except Exception as e:
-        logger.error(f"Failed to retrieve notes: {e}")
+    # fall back to the unpopulated calendars rather than failing the whole team response
+    if isinstance(populated_calendars, JSONResponse):
+        logger.error("Failed to populate team calendars, returning unpopulated calendars")
+        return await find_documents_by_id(request, 'calendars', calendar_ids)
+    
+    return {calendar['_id']: calendar for calendar in populated_calendars}
 
-    try:
-        retrieved_notifications = await request.app.db['notifications'].find(
-            {'_id': {'$in': team['notifications']}}
-        ).to_list(None)
-        team['notifications'] = retrieved_notifications
-    except Exception as e:
-        logger.error(f"Failed to retrieve notifications: {e}")
 
-    return team
+async def populate_teams(request: Request, teams: list[Team]):
+    # collect ids across every team so each collection is queried once, no matter how many teams there are
+    user_ids, project_ids, note_ids, notification_ids, calendar_ids = set(), set(), set(), set(), set()
+
+    for team in teams:
+        user_ids.update(team['users'])
+        user_ids.update(team['pending_users'])
+        project_ids.update(team['projects'])
+        note_ids.update(team['notes'])
+        notification_ids.update(team['notifications'])
+        if team.get('calendar'):
+            calendar_ids.add(team['calendar'])
+
+    users, projects, notes, notifications, calendars = await asyncio.gather(
+        find_team_users(request, user_ids),
+        find_documents_by_id(request, 'projects', project_ids),
+        find_documents_by_id(request, 'notes', note_ids),
+        find_documents_by_id(request, 'notifications', notification_ids),
+        find_team_calendars(request, calendar_ids),
+    )
+
+    for team in teams:
+        team['calendar'] = calendars.get(team['calendar'], team['calendar'])
+        team['users'] = [users[user_id] for user_id in team['users'] if user_id in users]
+        team['pending_users'] = [users[user_id] for user_id in team['pending_users'] if user_id in users]
+        team['projects'] = [projects[project_id] for project_id in team['projects'] if project_id in projects]
+        team['notes'] = [notes[note_id] for note_id in team['notes'] if note_id in notes]
+        team['notifications'] = [
+            notifications[notification_id] 
+            for notification_id in team['notifications'] 
+            if notification_id in notifications
+        ]
+
+    return teams
+    
+
+async def populate_team(request, team: Team): 
+    populated_teams = await populate_teams(request=request, teams=[team])
+    return populated_teams[0]
 
 
 async def reorder_teams_list(request: Request, user_email: str):
     try:
-        user = await request.app.db['users'].find_one(
-            {'email': user_email},
-            projection={
-                'teams': 1,
-                'id': 1,
-            }
-        )
+        user = await load_principal(request, user_email)
 
         if user is None:
             return JSONResponse(content={'detail': 'there was an issue accessing your account'}, status_code=404)
         
         body = await json_parser(request=request)
 
-        if sorted(user['teams']) != sorted(body):
+        if isinstance(body, JSONResponse):
+            return body
+
+        team_ids = await MembershipDataHelper.get_resource_ids(request, user, 'team')
+
+        if sorted(team_ids) != sorted(body):
             return JSONResponse(content={'detail': 'team lists were not the same'}, status_code=422)
         
-        update_user = await update_user_team_list_order(request, body, user['_id'])
-
-        if isinstance(update_user, JSONResponse):
-            return update_user
+        if len(body) > 0 and await MembershipDataHelper.reorder(request, user, 'team', body) is None:
+            return JSONResponse(content={'detail': 'we failed to updated the users team list'}, status_code=422)
 
         # keep teams in order, as order matters on client
-        retrieved_teams = await request.app.db['teams'].find(
-            {'_id': {'$in': user['teams']}}
-        ).to_list(None)
+        retrieved_teams = await find_teams(request, body)
 
         populated_teams = await populate_teams(request=request, teams=retrieved_teams)
-        ordered_teams = order_teams(ordered_team_id_list=user['teams'], retrieved_teams=retrieved_teams)
-
-        if isinstance(populated_teams, JSONResponse):
-            return populated_teams
+        ordered_teams = order_teams(ordered_team_id_list=body, retrieved_teams=populated_teams)
                 
-        return JSONResponse(content={
+        return BSONJSONResponse(content={
             'detail': 'Success! We reordered your teams!',
-            'teams': jsonable_encoder(ordered_teams),
+            'teams': ordered_teams,
         }, status_code=200)
 
   
     except Exception as e:
         logger.error(f'{e}')
         return JSONResponse(content={'detail': 'failed to access server to reorder list'}, status_code=422)
-    
-
-async def update_user_team_list_order(request: Request, updated_list: list[str], user_id: str):
-    updated_user = await request.app.db['users'].update_one(
-        {'_id': user_id},
-        {'$set': {'teams': updated_list}}
-    )
-
-    if updated_user is None:
-        return JSONResponse(content={'detail': 'we failed to updated the users team list'}, status_code=422)
-
-    return updated_user
\ No newline at end of file
@@ -1,5 +1,6 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from services.service_helpers.user_search_helpers import UserSearchHelper
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,25 +8,36 @@ logger = logging.getLogger(__name__)
 async def fetch_users_query(request: Request):
     try: 
         user_query = request.query_params.get('user', default=None)
+        limit = UserSearchHelper.parse_limit(request.query_params.get('limit'))
         
+        if user_query and request.query_params.get('mode') == 'typeahead':
+            # search as you type, prefix matches on the search_terms index with typo tolerance
+            search_results = await UserSearchHelper.search_users(
+                request,
+                user_query,
+                limit,
+                request.query_params.get('cursor'),
+            )
+
+            return JSONResponse(
+                content={
+                    'detail': 'Results found',
+                    **search_results,
+                },
+                status_code=200
+            )
+
         if user_query:
-            # cursor for querying the db
+            # cursor for querying the db, only non-sensitive fields and the best matches are read
             cursor = request.app.db['users'].find(
                 {"$text": {"$search": user_query}},
-                {"score": {"$meta": "textScore"}}
-            ).sort([("score", {"$meta": "textScore"})])
+                {**UserSearchHelper.user_projection, "score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit)
 
             # store non-sensitive data of users and async loop cursor through db
             user_search_results = []
             async for document in cursor:
-                user_ref = {
-                    "company": document["company"] if document["company"] else '',
-                    "email": document["email"] if document["email"] else '',
-                    "first_name": document["first_name"] if document["first_name"] else '',
-                    "job_title": document["job_title"] if document["job_title"] else '',
-                    "last_name": document["last_name"] if document["last_name"] else '',
-                    "_id": document["_id"] if document["_id"] else '',
-                }
+                user_ref = UserSearchHelper.build_user_ref(document)
                 user_search_results.append({"user": user_ref, "score": document.pop("score")})
 
 
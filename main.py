@@ -1,8 +1,16 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import dotenv_values
 from motor.motor_asyncio import AsyncIOMotorClient
 from scripts.task_runner import task_runner, stop_task_runner
+from scripts.bson_json_response import BSONJSONResponse
+from scripts.password_hashing import password_hasher, get_password_hasher_options
+from scripts.refresh_token_store import create_refresh_token_indexes
+from scripts.settings import get_settings
+from scripts.ttl_cache import configure_caches
+from services.service_helpers.calendar_service_helpers import CalendarDataHelper
+from services.service_helpers.user_search_helpers import UserSearchHelper
+from services.service_helpers.calendar_member_helpers import CalendarMemberHelper
+from services.service_helpers.membership_helpers import MembershipDataHelper
 import certifi
 import threading
 
@@ -26,7 +34,8 @@ from routes.users_routes import users_router
 from scripts.custom_middleware import ErrorLoggingMiddleware
 
 
-app = FastAPI()
+# every route serializes raw motor documents with orjson unless it returns its own response
+app = FastAPI(default_response_class=BSONJSONResponse)
 # task_thread = None
 
 
@@ -54,9 +63,24 @@ app.add_middleware(ErrorLoggingMiddleware)
 
 
 async def setup_db_client():
-    config = dotenv_values(".env") # get .env files
-    app.mongodb_client = AsyncIOMotorClient(config["DEV_MONGO_URI"], tlsCAFile=certifi.where())
-    app.db = app.mongodb_client[config["DEV_DB_NAME"]]
+    settings = get_settings()
+    app.mongodb_client = AsyncIOMotorClient(
+        settings.dev_mongo_uri, 
+        tlsCAFile=certifi.where(),
+        maxPoolSize=settings.mongo_max_pool_size,
+        minPoolSize=settings.mongo_min_pool_size,
+        maxIdleTimeMS=settings.mongo_max_idle_time_ms,
+        serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+        connectTimeoutMS=settings.mongo_connect_timeout_ms,
+        socketTimeoutMS=settings.mongo_socket_timeout_ms,
+    )
+    app.db = app.mongodb_client[settings.dev_db_name]
+    CalendarDataHelper.set_populate_engine(settings.calendar_populate_engine)
+    await CalendarDataHelper.create_calendar_indexes(app.db)
+    await create_refresh_token_indexes(app.db)
+    await UserSearchHelper.create_user_search_indexes(app.db)
+    await CalendarMemberHelper.create_calendar_member_indexes(app.db)
+    await MembershipDataHelper.create_membership_indexes(app.db)
     print("Connected to MongoDB!")
     return app # return app instance after setting up db for testing files
 
@@ -67,6 +91,10 @@ async def shutdown_db_client():
 
 @app.on_event("startup")
 async def startup_event():
+    # settings are read here rather than at import, so modules and tests import without a .env
+    settings = get_settings()
+    configure_caches(settings)
+    password_hasher.configure(**get_password_hasher_options(settings))
     await setup_db_client()
     
     # global task_thread
@@ -79,6 +107,7 @@ async def startup_event():
 async def shutdown_event():
     # stop_task_runner()
     await shutdown_db_client()
+    password_hasher.shutdown()
 
     # global task_thread
     
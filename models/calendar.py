@@ -26,6 +26,9 @@ class Event(BaseModel):
     event_time: str = Field(default_factory=str)
     repeat_option: str = Field(default_factory=str)
     repeats: Optional[bool] = Field(default_factory=False)
+    recurrence_exceptions: List[str] = Field(default_factory=list) # 'YYYY-MM-DD' occurrences removed from a repeating event
+    recurrence_overrides: dict[str, dict] = Field(default_factory=dict) # 'YYYY-MM-DD' -> fields edited on that occurrence only
+    revision: int = Field(default=0) # bumped by every write to the event, keys cached recurrence expansions
 
     class Config:
         populate_by_name = True
@@ -122,6 +125,35 @@ class ClientCalendarNoteData(BaseModel):
     extra = Extra.forbid
 
 
+# calendar_id -> last calendar version the client has seen
+class ClientCalendarSyncData(BaseModel):
+  calendars: dict[str, int] = Field(default_factory=dict)
+
+  class Config:
+    extra = Extra.forbid
+
+
+# window bounds are ISO dates or datetimes, same as getUserCalendarData's start and end
+class ClientFreeBusyData(BaseModel):
+  userIds: list[str]
+  start: str
+  end: str
+
+  class Config:
+    extra = Extra.forbid
+
+
+# only the fields sent are changed on that occurrence
+class ClientCalendarEventOccurrenceData(BaseModel):
+  date: Optional[str] = None
+  eventName: Optional[str] = None
+  eventDescription: Optional[str] = None
+  selectedTime: Optional[str] = None
+
+  class Config:
+    extra = Extra.forbid
+
+
 class ClientCalendarEventData(BaseModel):
   combinedDateAndTime: str;
   date: str;
@@ -146,14 +178,13 @@ class Calendar(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     authorized_users: List[PyObjectId] = Field(default_factory=list)
     calendar_color: str = Field(default_factory=str)
-    calendar_notes: List[CalendarNote] = Field(default_factory=list)
     calendar_type: str = Field(default_factory=str)
     created_by: PyObjectId = Field(default_factory=PyObjectId)
     created_on: datetime = Field(default_factory=datetime.now)
-    events: List[Event] = Field(default_factory=list)
     name: str = Field(default_factory=str)
     pending_users: List[PendingUser] = Field(default_factory=list)
     team_id: str = Field(default_factory=str) # only needed for team-calendar instance's, see notes above for details
+    version: int = Field(default=0) # bumped on every change, clients use it as their sync cursor
     view_only_users: list = Field(default_factory=list)
 
 
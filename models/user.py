@@ -16,9 +16,6 @@ class User(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     account_type: str = Field(default='basic')
     email: EmailStr = Field(required=True)
-    calendars: List[PyObjectId] = Field(default_factory=list)
-    chats: List[PyObjectId] = Field(default_factory=list)
-    classes: List[PyObjectId] = Field(default_factory=list)
     company: str = Field(default_factory=str)
     first_name: str = Field(required=True)
     joined: datetime = Field(default_factory=datetime.now)
@@ -26,17 +23,10 @@ class User(BaseModel):
     last_contributed: Optional[datetime] = Field(default_factory=datetime.now)
     last_name: str = Field(required=True)
     last_online: datetime = Field(default_factory=datetime.now)
-    notes: List[PyObjectId] = Field(default_factory=list)
     notifications_read: List = Field(default_factory=list)
     notifications_unread: List = Field(default_factory=list)
     password: str = Field(required=True)
-    pending_calendars: List[PyObjectId] = Field(default_factory=list)
-    pending_chats: List[PyObjectId] = Field(default_factory=list)
-    pending_tasks: List[PyObjectId] = Field(default_factory=list)
-    pending_teams: List[PyObjectId] = Field(default_factory=list)
     personal_calendar: PyObjectId = Field(default_factory=PyObjectId)
-    tasks: List[PyObjectId] = Field(default_factory=list)
-    teams: List[PyObjectId] = Field(default_factory=list)
     total_completed_projects: int = Field(default_factory=int)
     total_completed_tasks: int = Field(default_factory=int)
     total_completed_subtasks: int = Field(default_factory=int)
@@ -124,9 +114,6 @@ class User(BaseModel):
             "example": {
                 "account_type": 'basic',
                 "email": "george123@yahoo.com",
-                "calendars": [str(ObjectId()), str(ObjectId())],
-                "chats": [str(ObjectId()), str(ObjectId())],
-                "classes": [str(ObjectId()), str(ObjectId())],
                 "company": None,
                 "first_name": "Kathy",
                 "joined": "2023-07-27 13:27:25.303335",
@@ -134,13 +121,7 @@ class User(BaseModel):
                 "last_contributed": "2023-07-27 13:27:25.303335",
                 "last_name": "Bean",
                 "last_online": "2023-07-27 13:27:25.303335",
-                "notes": [str(ObjectId()), str(ObjectId()), str(ObjectId()), str(ObjectId()), str(ObjectId())],
                 "password": "$2b$12$TnK7rTwFqTstmcLLNEtyTuiIRBWBz0k8SNSBCx8yPloZCqkH7uIkG",
-                "pending_chats": [],
-                "pending_tasks": [],
-                "pending_teams": [],
-                "tasks": [str(ObjectId()), str(ObjectId())],
-                "teams": [str(ObjectId())],
                 "total_completed_projects": 0,
                 "total_completed_tasks": 0,
                 "total_completed_subtasks": 0,
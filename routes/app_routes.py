@@ -1,9 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from controllers import app_controller
+from scripts.jwt_token_decoders import process_bearer_token
 
 app_router = APIRouter()
 
 # all app routes go here
 @app_router.get('/')
 async def get_welcome():
-    return await app_controller.welcome_request()
\ No newline at end of file
+    return await app_controller.welcome_request()
+
+
+@app_router.get('/cacheMetrics')
+async def get_cache_metrics(token: str | bool = Depends(process_bearer_token)):
+    return await app_controller.cache_metrics_request()
+
+
+@app_router.get('/passwordHashingMetrics')
+async def get_password_hashing_metrics(token: str | bool = Depends(process_bearer_token)):
+    return await app_controller.password_hashing_metrics_request()
\ No newline at end of file
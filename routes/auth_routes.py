@@ -11,4 +11,12 @@ async def post_signup(request: Request, user: User):
 
 @auth_router.post('/login')
 async def post_login(request: Request, user_login: UserLogin):
-    return await auth_controller.user_login(request, user_login)
\ No newline at end of file
+    return await auth_controller.user_login(request, user_login)
+
+@auth_router.post('/refresh')
+async def post_refresh(request: Request):
+    return await auth_controller.refresh_bearer_token(request)
+
+@auth_router.post('/logout')
+async def post_logout(request: Request):
+    return await auth_controller.user_logout(request)
\ No newline at end of file
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Request, Depends
+from typing import Optional
 from controllers import calendar_controller
-from models.calendar import ClientNewCalendarData, ClientCalendarNoteData, ClientCalendarEventData
-from scripts.jwt_token_decoders import process_bearer_token
+from models.calendar import ClientNewCalendarData, ClientCalendarNoteData, ClientCalendarEventData, ClientCalendarEventOccurrenceData, ClientCalendarSyncData, ClientFreeBusyData
+from scripts.principal import get_current_principal
 
 calendar_router = APIRouter()
 
@@ -9,7 +10,7 @@ calendar_router = APIRouter()
 @calendar_router.get('/')
 async def get_calendar_data(
        request: Request, 
-       token: str | bool = Depends(process_bearer_token)
+       principal: dict = Depends(get_current_principal)
     ):
     return await calendar_controller.fetch_calendar_app_data(request)
 
@@ -17,19 +18,44 @@ async def get_calendar_data(
 @calendar_router.get('/getUserCalendarData')
 async def get_user_calendar_data(
        request: Request, 
-       token: str | bool = Depends(process_bearer_token)
+       start: Optional[str] = None,
+       end: Optional[str] = None,
+       principal: dict = Depends(get_current_principal)
     ):
     return await calendar_controller.fetch_all_user_calendar_data(
             request, 
-            token.get('email')
+            principal['email'],
+            start,
+            end,
     )
 
 
+@calendar_router.post('/sync')
+async def post_calendar_sync(
+        request: Request,
+        sync_data: ClientCalendarSyncData,
+        principal: dict = Depends(get_current_principal),
+    ):
+    return await calendar_controller.sync_user_calendars(
+            request,
+            principal['email'],
+    )
+
+
+@calendar_router.post('/freeBusy')
+async def post_free_busy(
+        request: Request,
+        free_busy_data: ClientFreeBusyData,
+        principal: dict = Depends(get_current_principal),
+    ):
+    return await calendar_controller.fetch_free_busy(request)
+
+
 @calendar_router.post('/uploadCalendar')
 async def post_calendar_upload(
         request: Request, 
         calendar_data: ClientNewCalendarData,
-        token: str | bool = Depends(process_bearer_token),
+        principal: dict = Depends(get_current_principal),
     ):
     return await calendar_controller.post_new_calendar(request)
 
@@ -40,14 +66,14 @@ async def delete_user(
        calendar_id: str, 
        user_type: str, 
        user_id: str, 
-       token: str | bool = Depends(process_bearer_token)
+       principal: dict = Depends(get_current_principal)
     ):
     return await calendar_controller.remove_user_from_calendar(
            request, 
            calendar_id, 
            user_type, 
            user_id, 
-           token['email']
+           principal['email']
     )
 
 
@@ -57,14 +83,14 @@ async def post_new_user(
         calendar_id: str,
         user_id: str, 
         permission_type: str,
-        token: str | bool = Depends(process_bearer_token)
+        principal: dict = Depends(get_current_principal)
     ):
     return await calendar_controller.add_user_to_calendar(
           request, 
           calendar_id, 
           user_id, 
           permission_type, 
-          token['email'],
+          principal['email'],
     )
 
 
@@ -73,7 +99,7 @@ async def delete_calendar(
         request: Request, 
         calendar_id: str, 
         user_id: str, 
-        token: str | bool = Depends(process_bearer_token)
+        principal: dict = Depends(get_current_principal)
     ):
         return await calendar_controller.delete_calendar(
                request, 
@@ -87,7 +113,7 @@ async def leave_calendar(
         request: Request, 
         calendar_id: str, 
         user_id: str, 
-        token: str | bool = Depends(process_bearer_token)
+        principal: dict = Depends(get_current_principal)
     ):
         return await calendar_controller.user_leave_calendar_request(
             request, 
@@ -102,12 +128,12 @@ async def post_calendar_note(
         request: Request,
         calendar_note: ClientCalendarNoteData,
         calendar_id: str,
-        token: str | bool = Depends(process_bearer_token)
+        principal: dict = Depends(get_current_principal)
      ):
         return await calendar_controller.post_note(
                request, 
                calendar_id, 
-               token['email']
+               principal['email']
         )
 
 
@@ -117,13 +143,13 @@ async def update_calendar_note(
         calendar_note: ClientCalendarNoteData,
         calendar_id: str,
         note_id: str,
-        token: str | bool = Depends(process_bearer_token)
+        principal: dict = Depends(get_current_principal)
     ):
         return await calendar_controller.update_note(
                request, 
                calendar_id, 
                note_id, 
-               token['email']
+               principal['email']
         )
 
 
@@ -132,13 +158,13 @@ async def delete_calendar_note(
         request: Request, 
         calendar_id: str, 
         calendar_note_id: str, 
-        token: str | bool = Depends(process_bearer_token)
+        principal: dict = Depends(get_current_principal)
     ):
         return await calendar_controller.delete_note(
                request, 
                calendar_id, 
                calendar_note_id,
-               token['email'],
+               principal['email'],
         )
 
 
@@ -147,12 +173,26 @@ async def post_event(
         request: Request, 
         event_data: ClientCalendarEventData,
         calendar_id: str,
-        token: str | bool = Depends(process_bearer_token),
+        principal: dict = Depends(get_current_principal),
     ):
         return await calendar_controller.post_event(
                request, 
                calendar_id, 
-               token['email']
+               principal['email']
+        )
+
+
+@calendar_router.post('/{calendar_id}/createEvents')
+async def post_events(
+        request: Request, 
+        events_data: list[ClientCalendarEventData],
+        calendar_id: str,
+        principal: dict = Depends(get_current_principal),
+    ):
+        return await calendar_controller.post_events(
+               request, 
+               calendar_id, 
+               principal['email']
         )
 
 
@@ -162,7 +202,7 @@ async def put_calendar_event(
         event_data: ClientCalendarEventData,
         calendar_id: str,
         event_id: str,
-        token: str | bool = Depends(process_bearer_token)
+        principal: dict = Depends(get_current_principal)
     ):
         return await calendar_controller.put_event(
                request, 
@@ -176,7 +216,7 @@ async def delete_calendar_event(
         request: Request,
         calendar_id: str,
         event_id: str,
-        token: str | bool = Depends(process_bearer_token)
+        principal: dict = Depends(get_current_principal)
     ):
         return await calendar_controller.delete_event(
                request, 
@@ -185,19 +225,53 @@ async def delete_calendar_event(
         )
 
 
+@calendar_router.put('/{calendar_id}/editEventOccurrence/{event_id}/{occurrence_date}')
+async def put_calendar_event_occurrence(
+        request: Request,
+        occurrence_data: ClientCalendarEventOccurrenceData,
+        calendar_id: str,
+        event_id: str,
+        occurrence_date: str,
+        principal: dict = Depends(get_current_principal)
+    ):
+        return await calendar_controller.edit_event_occurrence(
+               request, 
+               calendar_id, 
+               event_id,
+               occurrence_date,
+        )
+
+
+@calendar_router.delete('/{calendar_id}/deleteEventOccurrence/{event_id}/{occurrence_date}')
+async def delete_calendar_event_occurrence(
+        request: Request,
+        calendar_id: str,
+        event_id: str,
+        occurrence_date: str,
+        principal: dict = Depends(get_current_principal)
+    ):
+        return await calendar_controller.delete_event_occurrence(
+               request, 
+               calendar_id, 
+               event_id,
+               occurrence_date,
+        )
+
+
 @calendar_router.put('/{calendar_id}/{new_user_permissions}/updateUserPermissions/{userId}')
 async def put_calendar_user_permissions(
         request: Request,
         calendar_id: str,
         new_user_permissions: str,
         userId: str,
-        token: str | bool = Depends(process_bearer_token),
+        principal: dict = Depends(get_current_principal),
     ):
         return await calendar_controller.update_user_permissions(
                 request,
                 calendar_id,
                 new_user_permissions,
                 userId,
+                principal,
         )
 
 
@@ -205,10 +279,10 @@ async def put_calendar_user_permissions(
 async def put_preferred_colors(
         request: Request,
         calendar_id: str,
-        token: str | bool = Depends(process_bearer_token),
+        principal: dict = Depends(get_current_principal),
     ):
         return await calendar_controller.set_user_preferred_calendar_color(
                 request,
                 calendar_id,
-                token['email'],
+                principal['email'],
         )
\ No newline at end of file
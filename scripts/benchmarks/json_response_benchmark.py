@@ -0,0 +1,127 @@
+# Compares the old response path, JSONResponse(jsonable_encoder(doc)), with BSONJSONResponse on
+# populated calendar payloads shaped like getUserCalendarData's response. ids and dates are strings,
+# the way the models store them and populate hands them back.
+#
+# run from the project root with:
+# python -m scripts.benchmarks.json_response_benchmark
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from scripts.bson_json_response import BSONJSONResponse
+from bson import ObjectId
+from datetime import datetime, timedelta
+import timeit
+
+
+def new_id():
+    return str(ObjectId())
+
+
+def format_date(date: datetime):
+    return date.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def build_user(index: int):
+    return {
+        '_id': new_id(),
+        'first_name': f'First{index}',
+        'last_name': f'Last{index}',
+        'email': f'user{index}@example.com',
+        'job_title': 'Engineer',
+        'company': 'Company',
+    }
+
+
+def build_populated_calendar(event_count: int, note_count: int, user_count: int):
+    calendar_id = new_id()
+    users = [build_user(index) for index in range(user_count)]
+    first_date = datetime(2024, 1, 1, 9)
+
+    return {
+        '_id': calendar_id,
+        'name': 'Team Calendar',
+        'calendar_color': '#4285f4',
+        'calendar_type': 'team',
+        'created_by': users[0]['_id'],
+        'created_on': format_date(first_date),
+        'version': 42,
+        'authorized_users': users[: user_count // 2],
+        'view_only_users': users[user_count // 2:],
+        'pending_users': [{'type': 'view_only', 'user': build_user(user_count)}],
+        'events': [
+            {
+                '_id': new_id(),
+                'calendar_id': calendar_id,
+                'combined_date_and_time': format_date(first_date + timedelta(hours=index)),
+                'created_by': {'first_name': 'First0', 'last_name': 'Last0', 'user_id': users[0]['_id']},
+                'event_date': format_date(first_date + timedelta(days=index % 90)),
+                'event_description': 'Weekly sync to go over the board ' * 3,
+                'event_name': f'Event {index}',
+                'event_time': '09:00:00',
+                'repeat_option': 'weekly' if index % 5 == 0 else '',
+                'repeats': index % 5 == 0,
+                'recurrence_exceptions': [],
+                'recurrence_overrides': {},
+            }
+            for index in range(event_count)
+        ],
+        'calendar_notes': [
+            {
+                '_id': new_id(),
+                'calendar_id': calendar_id,
+                'created_by': {'first_name': 'First1', 'last_name': 'Last1', 'user_id': users[1]['_id']},
+                'created_on': format_date(first_date),
+                'note': 'Out of office',
+                'start_date': format_date(first_date + timedelta(days=index)),
+                'end_date': format_date(first_date + timedelta(days=index + 2)),
+                'type': 'ooo',
+            }
+            for index in range(note_count)
+        ],
+    }
+
+
+def build_payload(calendar_count: int, event_count: int):
+    return {
+        'detail': 'All possible calendars fetched',
+        'updated_user': {
+            '_id': new_id(),
+            'calendars': [build_populated_calendar(event_count, event_count // 10, 12) for _ in range(calendar_count)],
+            'pending_calendars': [],
+            'personal_calendar': build_populated_calendar(event_count, event_count // 10, 2),
+        },
+    }
+
+
+def render_with_jsonable_encoder(payload):
+    return JSONResponse(content=jsonable_encoder(payload)).body
+
+
+def render_with_bson_json_response(payload):
+    return BSONJSONResponse(content=payload).body
+
+
+def run_benchmark():
+    scenarios = [
+        ('small: 3 calendars x 50 events', build_payload(3, 50)),
+        ('medium: 10 calendars x 200 events', build_payload(10, 200)),
+        ('large: 25 calendars x 1000 events', build_payload(25, 1000)),
+    ]
+
+    for name, payload in scenarios:
+        repeats = 3
+        number = 5
+        encoder_seconds = min(timeit.repeat(lambda: render_with_jsonable_encoder(payload), repeat=repeats, number=number)) / number
+        orjson_seconds = min(timeit.repeat(lambda: render_with_bson_json_response(payload), repeat=repeats, number=number)) / number
+        body_size = len(render_with_bson_json_response(payload))
+
+        print(
+            f'{name} ({body_size / 1024:.0f} KiB): '
+            f'jsonable_encoder + JSONResponse {encoder_seconds * 1000:.2f}ms, '
+            f'BSONJSONResponse {orjson_seconds * 1000:.2f}ms, '
+            f'{encoder_seconds / orjson_seconds:.1f}x faster'
+        )
+
+
+if __name__ == '__main__':
+    run_benchmark()
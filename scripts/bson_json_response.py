@@ -0,0 +1,32 @@
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from typing import Any
+import orjson
+
+
+# orjson handles dicts, lists, strings and datetimes natively in C and only calls back here for
+# the types mongo and our models add on top
+def bson_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json', by_alias=True)
+    if isinstance(value, Decimal128):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps_bson(content: Any):
+    return orjson.dumps(content, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+# serializes raw motor documents directly, so responses skip the jsonable_encoder pass over the whole tree
+class BSONJSONResponse(JSONResponse):
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bson(content)
@@ -0,0 +1,113 @@
+from fastapi import Request
+import asyncio
+
+
+# Batches and dedups id lookups for the length of one request. Every load() made before the event loop
+# gets back around is sent as a single $in query, and an id is only ever fetched once per request, so
+# concurrent populate branches that share members share the query too
+class DataLoader():
+
+    def __init__(self, batch_load_function):
+        # batch_load_function(ids) -> {id: document}, missing ids resolve to None
+        self.batch_load_function = batch_load_function
+        self.futures = {}
+        # (id, future) pairs, so a clear() between load and dispatch can't lose a waiting caller's future
+        self.queued = []
+        self.dispatch_scheduled = False
+        # the event loop only holds weak references to tasks, so running batches are kept here
+        self.tasks = set()
+
+    def load_futures(self, ids):
+        loop = asyncio.get_running_loop()
+        futures = []
+
+        for document_id in ids:
+            future = self.futures.get(document_id)
+            if future is None:
+                future = loop.create_future()
+                self.futures[document_id] = future
+                self.queued.append((document_id, future))
+            futures.append(future)
+
+        if len(self.queued) > 0 and not self.dispatch_scheduled:
+            self.dispatch_scheduled = True
+            loop.call_soon(self.dispatch)
+
+        return futures
+
+    async def load(self, document_id):
+        return await self.load_futures([document_id])[0]
+
+    async def load_many(self, ids):
+        futures = self.load_futures(ids)
+        if len(futures) == 0:
+            return []
+        return list(await asyncio.gather(*futures))
+
+    def dispatch(self):
+        queued = self.queued
+        self.queued = []
+        self.dispatch_scheduled = False
+        task = asyncio.ensure_future(self.resolve_batch(queued))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def resolve_batch(self, queued):
+        try:
+            documents = await self.batch_load_function([document_id for document_id, _ in queued])
+        except Exception as e:
+            for document_id, future in queued:
+                # failed ids are forgotten, so a later load in the same request can retry them.
+                # only forget the future this batch owns, a clear() may already have replaced it
+                if self.futures.get(document_id) is future:
+                    self.futures.pop(document_id)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for document_id, future in queued:
+            if not future.done():
+                future.set_result(documents.get(document_id))
+
+    def clear(self, document_id):
+        self.futures.pop(document_id, None)
+
+
+def build_find_by_ids(db, collection: str, projection: dict = None):
+    async def find_by_ids(ids):
+        documents = await db[collection].find(
+            {'_id': {'$in': ids}},
+            projection=projection,
+        ).to_list(None)
+        return {document['_id']: document for document in documents}
+
+    return find_by_ids
+
+
+class RequestLoaders():
+
+    # the public fields embedded wherever a user is shown on a calendar or team
+    user_projection = {
+        'first_name': 1,
+        'last_name': 1,
+        'email': 1,
+        'job_title': 1,
+        'company': 1,
+    }
+
+    def __init__(self, db):
+        self.users = DataLoader(build_find_by_ids(db, 'users', RequestLoaders.user_projection))
+        self.calendars = DataLoader(build_find_by_ids(db, 'calendars'))
+        self.teams = DataLoader(build_find_by_ids(db, 'teams'))
+
+
+def get_loaders(request: Request):
+    # created on first use, so requests that never populate anything don't pay for it.
+    # documents are shared by every caller in the request, copy them before changing them
+    loaders = getattr(request.state, 'loaders', None)
+
+    if not isinstance(loaders, RequestLoaders):
+        loaders = RequestLoaders(request.app.db)
+        request.state.loaders = loaders
+
+    return loaders
@@ -0,0 +1,78 @@
+from fastapi import FastAPI
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
+import logging
+import asyncio
+import certifi
+import os
+import sys
+
+# run from this directory like the other uploaders, the member helper and settings live at the project root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from services.service_helpers.calendar_member_helpers import CalendarMemberHelper
+from scripts.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# calendars created before calendar_members existed only have their user arrays, this mirrors them in batches.
+# members are replaced by _id, so the backfill can be re-run safely
+class BackfillCalendarMembers:
+
+    batch_size = 1000
+
+    def __init__(self):
+        self.app = FastAPI()
+
+    async def backfill_calendar_members(self):
+        await self.setup_db_client()
+        try:
+            await CalendarMemberHelper.create_calendar_member_indexes(self.app.db)
+            stored_members = await self.store_calendar_members()
+            logger.info(f"Backfilled {stored_members} calendar members")
+        except Exception:
+            logger.exception("There was a server error backfilling calendar members")
+        finally:
+            await self.shutdown_db_client()
+
+    async def setup_db_client(self):
+        settings = get_settings()
+        self.app.mongodb_client = AsyncIOMotorClient(settings.dev_mongo_uri, tlsCAFile=certifi.where())
+        self.app.db = self.app.mongodb_client[settings.dev_db_name]
+        return self.app
+
+    async def shutdown_db_client(self):
+        self.app.mongodb_client.close()
+
+    async def store_calendar_members(self):
+        cursor = self.app.db['calendars'].find(
+            {},
+            projection={'authorized_users': 1, 'view_only_users': 1, 'pending_users': 1},
+        )
+
+        stored_members = 0
+        operations = []
+
+        async for calendar in cursor:
+            for member in CalendarMemberHelper.build_calendar_members(calendar):
+                operations.append(ReplaceOne({'_id': member['_id']}, member, upsert=True))
+
+            if len(operations) >= self.batch_size:
+                stored_members += await self.write_members(operations)
+                operations = []
+
+        if len(operations) > 0:
+            stored_members += await self.write_members(operations)
+
+        return stored_members
+
+    async def write_members(self, operations: list):
+        result = await self.app.db[CalendarMemberHelper.collection].bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    backfill = BackfillCalendarMembers()
+    asyncio.run(backfill.backfill_calendar_members())
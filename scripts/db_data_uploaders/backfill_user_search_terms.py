@@ -0,0 +1,81 @@
+from fastapi import FastAPI
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+import logging
+import asyncio
+import certifi
+import os
+import sys
+
+# run from this directory like the other uploaders, the search helper and settings live at the project root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from services.service_helpers.user_search_helpers import UserSearchHelper
+from scripts.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# users created before typeahead search have no search_terms or fuzzy_search_keys, this writes them in batches
+class BackfillUserSearchTerms:
+
+    batch_size = 1000
+
+    def __init__(self):
+        self.app = FastAPI()
+
+    async def backfill_user_search_terms(self):
+        await self.setup_db_client()
+        try:
+            await UserSearchHelper.create_user_search_indexes(self.app.db)
+            updated_users = await self.store_search_terms()
+            logger.info(f"Backfilled search terms for {updated_users} users")
+        except Exception:
+            logger.exception("There was a server error backfilling user search terms")
+        finally:
+            await self.shutdown_db_client()
+
+    async def setup_db_client(self):
+        settings = get_settings()
+        self.app.mongodb_client = AsyncIOMotorClient(settings.dev_mongo_uri, tlsCAFile=certifi.where())
+        self.app.db = self.app.mongodb_client[settings.dev_db_name]
+        return self.app
+
+    async def shutdown_db_client(self):
+        self.app.mongodb_client.close()
+
+    async def store_search_terms(self):
+        cursor = self.app.db['users'].find(
+            {},
+            projection={field: 1 for field in UserSearchHelper.searchable_fields},
+        )
+
+        updated_users = 0
+        operations = []
+
+        async for user in cursor:
+            search_terms = UserSearchHelper.build_search_terms(user)
+            operations.append(UpdateOne(
+                {'_id': user['_id']},
+                {'$set': {
+                    'search_terms': search_terms,
+                    'fuzzy_search_keys': UserSearchHelper.build_fuzzy_search_keys(search_terms),
+                }},
+            ))
+
+            if len(operations) == self.batch_size:
+                result = await self.app.db['users'].bulk_write(operations, ordered=False)
+                updated_users += result.modified_count
+                operations = []
+
+        if len(operations) > 0:
+            result = await self.app.db['users'].bulk_write(operations, ordered=False)
+            updated_users += result.modified_count
+
+        return updated_users
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    backfill = BackfillUserSearchTerms()
+    asyncio.run(backfill.backfill_user_search_terms())
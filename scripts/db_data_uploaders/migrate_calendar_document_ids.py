@@ -0,0 +1,88 @@
+from fastapi import FastAPI
+from motor.motor_asyncio import AsyncIOMotorClient
+import logging
+import asyncio
+import certifi
+import os
+import sys
+
+# run from this directory like the other uploaders, the calendar helper and settings live at the project root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from services.service_helpers.calendar_service_helpers import CalendarDataHelper
+from scripts.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# calendars used to list every event and note id in their events / calendar_notes arrays. events and notes are
+# now owned through their calendar_id, so this backfills calendar_id from the arrays and then drops the arrays.
+# it runs online against a deployment that no longer pushes into the arrays, the read shims in
+# CalendarDataHelper serve calendars in either state, and it can be stopped and re-run at any point
+class MigrateCalendarDocumentIds:
+
+    batch_size = 1000
+    legacy_fields = {'events': 'events', 'calendar_notes': 'calendar_notes'} # calendar field -> owned collection
+
+    def __init__(self):
+        self.app = FastAPI()
+
+    async def migrate_calendar_document_ids(self):
+        await self.setup_db_client()
+        try:
+            await CalendarDataHelper.create_calendar_indexes(self.app.db)
+            migrated_calendars, claimed_documents = await self.migrate_calendars()
+            logger.info(f"Migrated {migrated_calendars} calendars, {claimed_documents} events and notes were given a calendar_id")
+        except Exception:
+            logger.exception("There was a server error migrating calendar event and note ids")
+        finally:
+            await self.shutdown_db_client()
+
+    async def setup_db_client(self):
+        settings = get_settings()
+        self.app.mongodb_client = AsyncIOMotorClient(settings.dev_mongo_uri, tlsCAFile=certifi.where())
+        self.app.db = self.app.mongodb_client[settings.dev_db_name]
+        return self.app
+
+    async def shutdown_db_client(self):
+        self.app.mongodb_client.close()
+
+    async def migrate_calendars(self):
+        cursor = self.app.db['calendars'].find(
+            {'$or': [{field: {'$exists': True}} for field in self.legacy_fields]},
+            projection={field: 1 for field in self.legacy_fields},
+        )
+
+        migrated_calendars = 0
+        claimed_documents = 0
+
+        async for calendar in cursor:
+            for field, collection in self.legacy_fields.items():
+                claimed_documents += await self.claim_documents(collection, calendar['_id'], calendar.get(field, []))
+
+            # the arrays are only dropped once every document they list can be found through calendar_id
+            await self.app.db['calendars'].update_one(
+                {'_id': calendar['_id']},
+                {'$unset': {field: '' for field in self.legacy_fields}},
+            )
+            migrated_calendars += 1
+
+        return migrated_calendars, claimed_documents
+
+    async def claim_documents(self, collection: str, calendar_id: str, document_ids: list):
+        claimed_documents = 0
+
+        for start in range(0, len(document_ids), self.batch_size):
+            result = await self.app.db[collection].update_many(
+                {'_id': {'$in': document_ids[start:start + self.batch_size]}, 'calendar_id': {'$in': [None, '']}},
+                {'$set': {'calendar_id': calendar_id}},
+            )
+            claimed_documents += result.modified_count
+
+        return claimed_documents
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migration = MigrateCalendarDocumentIds()
+    asyncio.run(migration.migrate_calendar_document_ids())
@@ -0,0 +1,114 @@
+from fastapi import FastAPI
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+import logging
+import asyncio
+import certifi
+import os
+import sys
+
+# run from this directory like the other uploaders, the membership helper and settings live at the project root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from services.service_helpers.membership_helpers import MembershipDataHelper
+from scripts.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# users used to carry an id array per membership type. this moves every array into memberships, keeping each
+# array's order, and then drops the arrays from the user. calendar arrays are only dropped, calendar_members
+# already holds those edges (run backfill_calendar_members.py first on a deployment that predates it).
+# memberships written since the deploy are never overwritten, so the migration can be stopped and re-run
+class MigrateUserMemberships:
+
+    batch_size = 1000
+    calendar_fields = ('calendars', 'pending_calendars')
+
+    def __init__(self):
+        self.app = FastAPI()
+
+    async def migrate_user_memberships(self):
+        await self.setup_db_client()
+        try:
+            await MembershipDataHelper.create_membership_indexes(self.app.db)
+            migrated_users, stored_memberships = await self.migrate_users()
+            logger.info(f"Migrated {migrated_users} users, {stored_memberships} memberships were created")
+        except Exception:
+            logger.exception("There was a server error migrating user memberships")
+        finally:
+            await self.shutdown_db_client()
+
+    async def setup_db_client(self):
+        settings = get_settings()
+        self.app.mongodb_client = AsyncIOMotorClient(settings.dev_mongo_uri, tlsCAFile=certifi.where())
+        self.app.db = self.app.mongodb_client[settings.dev_db_name]
+        return self.app
+
+    async def shutdown_db_client(self):
+        self.app.mongodb_client.close()
+
+    def get_legacy_fields(self):
+        return list(MembershipDataHelper.legacy_fields.values()) + list(self.calendar_fields)
+
+    async def migrate_users(self):
+        legacy_fields = self.get_legacy_fields()
+        cursor = self.app.db['users'].find(
+            {'$or': [{field: {'$exists': True}} for field in legacy_fields]},
+            projection={field: 1 for field in legacy_fields},
+        )
+
+        migrated_users = 0
+        stored_memberships = 0
+        operations = []
+        user_ids = []
+
+        async for user in cursor:
+            operations.extend(self.build_membership_operations(user))
+            user_ids.append(user['_id'])
+
+            if len(operations) >= self.batch_size or len(user_ids) >= self.batch_size:
+                stored_memberships += await self.write_memberships(operations, user_ids)
+                migrated_users += len(user_ids)
+                operations, user_ids = [], []
+
+        if len(user_ids) > 0:
+            stored_memberships += await self.write_memberships(operations, user_ids)
+            migrated_users += len(user_ids)
+
+        return migrated_users, stored_memberships
+
+    def build_membership_operations(self, user: dict):
+        operations = []
+
+        for (resource_type, state), field in MembershipDataHelper.legacy_fields.items():
+            for order, resource_id in enumerate(user.get(field, [])):
+                membership = MembershipDataHelper.build_membership(user['_id'], resource_type, resource_id, state, order)
+                operations.append(UpdateOne(
+                    {'_id': membership.pop('_id')},
+                    {'$setOnInsert': membership},
+                    upsert=True,
+                ))
+
+        return operations
+
+    async def write_memberships(self, operations: list, user_ids: list):
+        stored_memberships = 0
+
+        if len(operations) > 0:
+            result = await self.app.db[MembershipDataHelper.collection].bulk_write(operations, ordered=False)
+            stored_memberships = result.upserted_count
+
+        # the arrays are only dropped once every id they list can be found through memberships
+        await self.app.db['users'].update_many(
+            {'_id': {'$in': user_ids}},
+            {'$unset': {field: '' for field in self.get_legacy_fields()}},
+        )
+
+        return stored_memberships
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migration = MigrateUserMemberships()
+    asyncio.run(migration.migrate_user_memberships())
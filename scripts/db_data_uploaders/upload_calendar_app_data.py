@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List
 from fastapi import FastAPI
-from dotenv import dotenv_values
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
 import calendar
@@ -9,6 +8,13 @@ import holidays
 import logging
 import asyncio
 import certifi
+import os
+import sys
+
+# run from this directory, settings live at the project root
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from scripts.settings import get_settings
 
 class CalendarData(BaseModel):
     app_data_type: str = Field(default_factory=str)
@@ -40,10 +46,9 @@ class UploadCalendarData:
         await self.shutdown_db_client()
 
     async def setup_db_client(self):
-        # get .env files
-        config = dotenv_values("../../.env")
-        self.app.mongodb_client = AsyncIOMotorClient(config["DEV_MONGO_URI"], tlsCAFile=certifi.where())
-        self.app.db = self.app.mongodb_client[config["DEV_DB_NAME"]]
+        settings = get_settings()
+        self.app.mongodb_client = AsyncIOMotorClient(settings.dev_mongo_uri, tlsCAFile=certifi.where())
+        self.app.db = self.app.mongodb_client[settings.dev_db_name]
         return self.app
 
     async def shutdown_db_client(self):
@@ -1,13 +1,11 @@
-from dotenv import dotenv_values
-import os
+from scripts.settings import get_settings
 
 def get_jwt_env_variables():
-    dotenv_path = os.path.join(os.path.dirname(__file__), "..", ".env")
-    config = dotenv_values(dotenv_path)
+    settings = get_settings()
 
     jwt_config = {
-        "JWT_SECRET": config["JWT_SECRET"],
-        "JWT_ALGORITHM": config["JWT_ALGORITHM"],
+        "JWT_SECRET": settings.jwt_secret,
+        "JWT_ALGORITHM": settings.jwt_algorithm,
     }
     
     return jwt_config
\ No newline at end of file
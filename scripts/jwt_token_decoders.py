@@ -1,7 +1,7 @@
 import jwt
 from scripts.jwt_helper_functions import get_jwt_env_variables
 from fastapi import HTTPException, Header, Request
-from scripts.ttl_cache import token_cache
+from scripts.ttl_cache import token_verification_cache
 
 
 async def process_bearer_token(request: Request, authorization: str = Header(...)):
@@ -9,21 +9,32 @@ async def process_bearer_token(request: Request, authorization: str = Header(...
         bearer_token = authorization.split(" ")[1] # extract token from bearer string
         return await validate_bearer_token(request, bearer_token) # request is just being passed to access db ref for token validation
     except IndexError:
-        HTTPException(status_code=401, detail="Invalid Bearer token")
+        raise HTTPException(status_code=401, detail="Invalid Bearer token")
 
 
 async def validate_bearer_token(request, bearer_token):
-    if bearer_token in token_cache:
-        return token_cache[bearer_token]
+    cached_token = token_verification_cache.lookup(bearer_token)
+
+    if cached_token is not None:
+        if cached_token.payload is None:
+            raise HTTPException(status_code=401, detail=cached_token.detail)
+        return cached_token.payload
     
-    decoded_token = decode_bearer_token(bearer_token)
+    try:
+        decoded_token = decode_bearer_token(bearer_token)
+    except HTTPException as e:
+        # expired and forged tokens tend to be retried, remember them so the retries skip the decode
+        token_verification_cache.reject_token(bearer_token, e.detail)
+        raise
+
     verified_token = await verify_bearer_token(request, decoded_token)
 
     if not verified_token:
-        return HTTPException(status_code=401, detail="Invalid Bearer token")
+        token_verification_cache.reject_token(bearer_token, "Invalid Bearer token")
+        raise HTTPException(status_code=401, detail="Invalid Bearer token")
     else:
         # add to cache, user is verified
-        token_cache[bearer_token] = decoded_token
+        token_verification_cache.add_token(bearer_token, decoded_token)
         return decoded_token
 
 
@@ -44,12 +55,29 @@ def decode_bearer_token(bearer_token):
     
 
 async def verify_bearer_token(request, decoded_token):
-    verify_token = await request.app.db['users'].find_one({
-            "email": decoded_token.get("email")
-        })
+    verify_token = await request.app.db['users'].find_one(
+        {"email": decoded_token.get("email")},
+        projection={"_id": 1},
+    )
     
     return verify_token is not None
 
 
-def decode_refresh_token(request: Request, authorization: str = Header(...)):
-    return
\ No newline at end of file
+def decode_refresh_token(refresh_token):
+    try:
+        jwt_config = get_jwt_env_variables()
+        payload = jwt.decode(
+            refresh_token,
+            jwt_config['JWT_SECRET'],
+            algorithms=jwt_config["JWT_ALGORITHM"]
+        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Refresh token has expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    # refresh tokens minted before the server-side store have nothing to rotate against
+    if not payload.get("jti") or not payload.get("family"):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    return payload
\ No newline at end of file
@@ -5,6 +5,10 @@ import jwt
 import uuid
 
 def encode_bearer_token(user_login: UserLogin):
+    return encode_bearer_token_for_email(user_login.email)
+
+
+def encode_bearer_token_for_email(email: str):
     jwt_config = get_jwt_env_variables()
 
     # get timestamp value for jwt.encode()
@@ -13,7 +17,7 @@ def encode_bearer_token(user_login: UserLogin):
 
     # generate bearer token
     bearer_payload = {
-        "email": user_login.email,
+        "email": email,
         "sub": str(uuid.uuid4()),
         "exp": (datetime.utcnow() + timedelta(hours=12)).timestamp(),
         "issued_at": datetime.utcnow().timestamp(),
@@ -28,13 +32,15 @@ def encode_bearer_token(user_login: UserLogin):
     return bearer_token
     
 
-def encode_refresh_token(user_id):
+def encode_refresh_token(user_id, jti: str, family: str, expires_at: datetime):
     jwt_config = get_jwt_env_variables()
 
-    # generate refresh token
+    # generate refresh token, jti and family point at its entry in the refresh_tokens collection
     refresh_payload = {
         "sub": user_id,
-        "exp": (datetime.utcnow() + timedelta(days=30)).timestamp(),
+        "jti": jti,
+        "family": family,
+        "exp": expires_at.timestamp(),
         "issued_at": datetime.utcnow().timestamp(),
     }
 
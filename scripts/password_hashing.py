@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from scripts.settings import get_default_settings
+import asyncio
+import bcrypt
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# bcrypt takes ~250ms of cpu per call and releases the GIL while it works, so it runs on a small thread pool
+# instead of the event loop. past max_pending queued + running hashes, requests are turned away immediately
+# rather than waiting behind a queue that is seconds long
+class PasswordHasher():
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self.pending = 0
+        self.running = 0
+        self.peak_queue_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+
+    def configure(self, workers: int, max_pending: int, retry_after: int):
+        # swaps in a pool sized from the loaded settings, called from the startup hook before any hashing
+        self.executor.shutdown(wait=False)
+        self.__init__(workers, max_pending, retry_after)
+
+    async def run(self, hash_function, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning(f"Password hashing pool saturated, rejecting request with {self.pending} pending")
+            raise HTTPException(
+                status_code=503,
+                detail="The server is busy, please try again shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self.pending += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth())
+        queued_at = time.perf_counter()
+
+        def timed_hash_function():
+            started_at = time.perf_counter()
+            self.running += 1
+            try:
+                return hash_function(*args)
+            finally:
+                self.running -= 1
+                finished_at = time.perf_counter()
+                self.record_latency(started_at - queued_at, finished_at - started_at)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, timed_hash_function)
+        finally:
+            self.pending -= 1
+
+    def record_latency(self, wait_seconds: float, hash_seconds: float):
+        # called from worker threads, the counters are only read for metrics so a rare lost update is acceptable
+        self.completed += 1
+        self.total_wait_seconds += wait_seconds
+        self.total_hash_seconds += hash_seconds
+        self.max_hash_seconds = max(self.max_hash_seconds, hash_seconds)
+
+    def queue_depth(self):
+        return max(0, self.pending - self.workers)
+
+    async def hash_password(self, password: str):
+        hashed_password = await self.run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt())
+        return hashed_password.decode("utf-8")
+
+    async def check_password(self, password: str, hashed_password: str):
+        return await self.run(bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'running': self.running,
+            'queue_depth': self.queue_depth(),
+            'peak_queue_depth': self.peak_queue_depth,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'avg_wait_ms': self.total_wait_seconds / self.completed * 1000 if self.completed > 0 else 0,
+            'avg_hash_ms': self.total_hash_seconds / self.completed * 1000 if self.completed > 0 else 0,
+            'max_hash_ms': self.max_hash_seconds * 1000,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_password_hasher_options(settings):
+    return {
+        'workers': settings.password_hash_workers,
+        'max_pending': settings.password_hash_max_pending or settings.password_hash_workers * 8,
+        'retry_after': settings.password_hash_retry_after_seconds,
+    }
+
+
+# built from the setting defaults so importing this module never needs a .env, the startup hook
+# reconfigures it from the loaded settings. the executor only starts threads once work is submitted
+password_hasher = PasswordHasher(**get_password_hasher_options(get_default_settings()))
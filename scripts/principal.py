@@ -0,0 +1,44 @@
+from fastapi import Depends, HTTPException, Request
+from scripts.jwt_token_decoders import process_bearer_token
+
+
+# the caller's id, name and email, everything the calendar and team services need to know about who is asking.
+# loaded once per request into request.state.principal. calendar and team ids are read from memberships,
+# the legacy team arrays are only projected for users that have not been migrated and are absent otherwise
+principal_projection = {
+    'first_name': 1,
+    'last_name': 1,
+    'email': 1,
+    'job_title': 1,
+    'company': 1,
+    'personal_calendar': 1,
+    'teams': 1,
+    'pending_teams': 1,
+}
+
+
+async def load_principal(request: Request, user_email: str):
+    principal = getattr(request.state, 'principal', None)
+
+    if isinstance(principal, dict) and principal.get('email') == user_email:
+        return principal
+
+    principal = await request.app.db['users'].find_one(
+        {'email': user_email},
+        projection=principal_projection,
+    )
+
+    if principal is not None:
+        request.state.principal = principal
+
+    return principal
+
+
+async def get_current_principal(request: Request, token: dict = Depends(process_bearer_token)):
+    principal = await load_principal(request, token['email'])
+
+    # the token verified, but the account behind it is gone
+    if principal is None:
+        raise HTTPException(status_code=401, detail="Invalid Bearer token")
+
+    return principal
@@ -0,0 +1,64 @@
+from fastapi import Request, HTTPException
+from datetime import datetime, timedelta
+from scripts.jwt_token_encoders import encode_refresh_token
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+refresh_token_lifetime = timedelta(days=30)
+
+
+# one small document per live refresh token: {_id: jti, user_id, family, expires_at}. a token is deleted
+# the moment it is used, so a jti that is missing but still signed means the token was replayed, and every
+# token descended from the same login (its family) is revoked
+async def create_refresh_token_indexes(db):
+    await asyncio.gather(
+        # mongo drops each token once it expires, the store never grows past the live sessions
+        db['refresh_tokens'].create_index(
+            'expires_at',
+            name='expires_at_ttl',
+            expireAfterSeconds=0,
+        ),
+        db['refresh_tokens'].create_index('family', name='family'),
+        db['refresh_tokens'].create_index('user_id', name='user_id'),
+    )
+
+
+async def issue_refresh_token(request: Request, user_id, family: str = None):
+    jti = uuid.uuid4().hex
+    family = family or uuid.uuid4().hex
+    expires_at = datetime.utcnow() + refresh_token_lifetime
+
+    await request.app.db['refresh_tokens'].insert_one({
+        '_id': jti,
+        'user_id': user_id,
+        'family': family,
+        'expires_at': expires_at,
+    })
+
+    return encode_refresh_token(user_id, jti, family, expires_at)
+
+
+async def rotate_refresh_token(request: Request, payload: dict):
+    # deleting is the claim, so two concurrent refreshes with the same token cannot both succeed
+    consumed_token = await request.app.db['refresh_tokens'].find_one_and_delete(
+        {'_id': payload['jti'], 'user_id': payload['sub']},
+        projection={'family': 1},
+    )
+
+    if consumed_token is None:
+        logger.warning(f"Refresh token reuse for user {payload['sub']}, revoking token family {payload['family']}")
+        await revoke_refresh_token_family(request, payload['family'])
+        raise HTTPException(status_code=401, detail="Refresh token has been revoked")
+
+    return await issue_refresh_token(request, payload['sub'], consumed_token['family'])
+
+
+async def revoke_refresh_token_family(request: Request, family: str):
+    return await request.app.db['refresh_tokens'].delete_many({'family': family})
+
+
+async def revoke_user_refresh_tokens(request: Request, user_id):
+    return await request.app.db['refresh_tokens'].delete_many({'user_id': user_id})
@@ -0,0 +1,60 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from functools import lru_cache
+from typing import Optional
+import os
+
+
+# every value can be set in .env or the environment, names match case-insensitively (JWT_SECRET -> jwt_secret)
+class Settings(BaseSettings):
+    # auth
+    jwt_secret: str
+    jwt_algorithm: str
+
+    # mongo
+    dev_mongo_uri: str
+    dev_db_name: str
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_server_selection_timeout_ms: int = 30000
+    mongo_connect_timeout_ms: int = 20000
+    mongo_socket_timeout_ms: Optional[int] = None
+
+    # calendars
+    calendar_populate_engine: str = 'aggregate'
+
+    # caches, sizes are entry counts and ttls are seconds
+    token_cache_size: int = 10000
+    token_cache_ttl_seconds: int = 60 * 60
+    token_negative_cache_ttl_seconds: int = 60
+    populated_calendar_cache_size: int = 1000
+    populated_calendar_cache_ttl_seconds: int = 60 * 5
+    recurrence_expansion_cache_size: int = 5000
+    recurrence_expansion_cache_ttl_seconds: int = 60 * 10
+    user_search_cache_size: int = 2000
+    user_search_cache_ttl_seconds: int = 30
+    calendar_permission_cache_size: int = 10000
+    calendar_permission_cache_ttl_seconds: int = 30
+
+    # password hashing pool, max pending defaults to 8 queued hashes per worker
+    password_hash_workers: int = Field(default_factory=lambda: min(4, os.cpu_count() or 1))
+    password_hash_max_pending: Optional[int] = None
+    password_hash_retry_after_seconds: int = 1
+
+    model_config = {
+        "env_file": os.path.join(os.path.dirname(__file__), "..", ".env"),
+        "extra": "ignore",
+    }
+
+
+@lru_cache
+def get_settings():
+    # read from .env once per process, every caller shares the same instance
+    return Settings()
+
+
+def get_default_settings():
+    # field defaults only, nothing is read from .env or the environment and required fields are left unset.
+    # for objects built at import, which get the real settings from the startup hook
+    return Settings.model_construct()
@@ -1,3 +1,200 @@
+from typing import NamedTuple, Optional
+from scripts.settings import get_default_settings
 import cachetools
+import time
 
-token_cache = cachetools.TTLCache(maxsize=100, ttl=60 * 60)
\ No newline at end of file
+
+# keeps hit/miss/eviction counters so caches can be sized from real traffic, mixed into the cachetools caches below
+class CacheMetrics():
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def lookup(self, key):
+        value = self.get(key)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    def invalidate(self, key):
+        if self.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def popitem(self):
+        # only called when the cache is full and the least recently used entry has to go
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def configure(self, **options):
+        # starts the cache over with new limits, so it is only called at startup before anything is cached
+        self.clear()
+        self.__init__(**options)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+
+        return {
+            'size': self.currsize,
+            'maxsize': self.maxsize,
+            'ttl': getattr(self, 'ttl', None),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0,
+        }
+
+
+class MetricsTTLCache(CacheMetrics, cachetools.TTLCache):
+    pass
+
+
+# per-entry expiry, ttu(key, value, now) returns when the entry stops being valid
+class MetricsTLRUCache(CacheMetrics, cachetools.TLRUCache):
+    pass
+
+
+class TokenCacheEntry(NamedTuple):
+    # payload is None for tokens that failed verification, detail is the 401 they failed with
+    payload: Optional[dict]
+    detail: Optional[str] = None
+
+
+# verified bearer tokens -> decoded payload, so a request only hits the users collection once per token.
+# entries never outlive the token's exp, and tokens that failed are remembered for negative_ttl seconds
+class TokenVerificationCache(MetricsTLRUCache):
+
+    def __init__(self, maxsize: int, ttl: int, negative_ttl: int):
+        super().__init__(maxsize=maxsize, ttu=self.get_entry_expiry)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative_hits = 0
+        self.revocations = 0
+        # email -> tokens cached for that user, so their tokens can be dropped when the account goes away
+        self.tokens_by_email = {}
+
+    def get_entry_expiry(self, token, entry: TokenCacheEntry, now):
+        if entry.payload is None:
+            return now + self.negative_ttl
+
+        # exp is wall clock time while now comes from the cache's monotonic timer
+        expires_in = entry.payload.get('exp', time.time() + self.ttl) - time.time()
+        return now + max(0, min(self.ttl, expires_in))
+
+    def lookup(self, token):
+        entry = super().lookup(token)
+
+        if entry is not None and entry.payload is None:
+            self.negative_hits += 1
+
+        return entry
+
+    def add_token(self, token: str, payload: dict):
+        self[token] = TokenCacheEntry(payload=payload)
+
+        email = payload.get('email')
+        if email is None or token not in self:
+            return
+
+        # expired and evicted tokens are not removed from the index, so it is pruned once it outgrows the cache
+        if len(self.tokens_by_email) > self.maxsize:
+            self.prune_token_index()
+
+        user_tokens = {cached_token for cached_token in self.tokens_by_email.get(email, ()) if cached_token in self}
+        user_tokens.add(token)
+        self.tokens_by_email[email] = user_tokens
+
+    def prune_token_index(self):
+        live_tokens_by_email = {}
+
+        for email, tokens in self.tokens_by_email.items():
+            live_tokens = {token for token in tokens if token in self}
+            if len(live_tokens) > 0:
+                live_tokens_by_email[email] = live_tokens
+
+        self.tokens_by_email = live_tokens_by_email
+
+    def reject_token(self, token: str, detail: str):
+        self[token] = TokenCacheEntry(payload=None, detail=detail)
+
+    def revoke_user_tokens(self, email: str):
+        # revoked tokens are verified against the db again on their next request
+        for token in self.tokens_by_email.pop(email, ()):
+            if self.pop(token, None) is not None:
+                self.revocations += 1
+
+    def stats(self):
+        return {
+            **super().stats(),
+            'negative_ttl': self.negative_ttl,
+            'negative_hits': self.negative_hits,
+            'revocations': self.revocations,
+        }
+
+
+def get_cache_options(settings):
+    return {
+        'populated_calendar_cache': {
+            'maxsize': settings.populated_calendar_cache_size,
+            'ttl': settings.populated_calendar_cache_ttl_seconds,
+        },
+        'recurrence_expansion_cache': {
+            'maxsize': settings.recurrence_expansion_cache_size,
+            'ttl': settings.recurrence_expansion_cache_ttl_seconds,
+        },
+        'token_verification_cache': {
+            'maxsize': settings.token_cache_size,
+            'ttl': settings.token_cache_ttl_seconds,
+            'negative_ttl': settings.token_negative_cache_ttl_seconds,
+        },
+        'user_search_cache': {
+            'maxsize': settings.user_search_cache_size,
+            'ttl': settings.user_search_cache_ttl_seconds,
+        },
+        'calendar_permission_cache': {
+            'maxsize': settings.calendar_permission_cache_size,
+            'ttl': settings.calendar_permission_cache_ttl_seconds,
+        },
+    }
+
+
+# the caches are built from the setting defaults so importing this module never needs a .env,
+# configure_caches resizes them from the loaded settings in the startup hook
+default_cache_options = get_cache_options(get_default_settings())
+
+# populated calendars keyed by calendar_id, writers in CalendarDataHelper invalidate their entry
+populated_calendar_cache = MetricsTTLCache(**default_cache_options['populated_calendar_cache'])
+
+# expanded occurrences keyed by (event_id, event revision, window start, window end, fields read), edits bump the revision
+recurrence_expansion_cache = MetricsTTLCache(**default_cache_options['recurrence_expansion_cache'])
+
+token_verification_cache = TokenVerificationCache(**default_cache_options['token_verification_cache'])
+
+# typeahead results keyed by (normalized query, limit, cursor), short lived since new users should show up quickly
+user_search_cache = MetricsTTLCache(**default_cache_options['user_search_cache'])
+
+# calendar_members entries keyed by (user_id, calendar_id), non-members are cached as {}. writes through
+# CalendarMemberHelper invalidate their entries, the short ttl bounds staleness from other processes
+calendar_permission_cache = MetricsTTLCache(**default_cache_options['calendar_permission_cache'])
+
+caches = {
+    'populated_calendar_cache': populated_calendar_cache,
+    'recurrence_expansion_cache': recurrence_expansion_cache,
+    'token_verification_cache': token_verification_cache,
+    'user_search_cache': user_search_cache,
+    'calendar_permission_cache': calendar_permission_cache,
+}
+
+
+def configure_caches(settings):
+    for cache_name, options in get_cache_options(settings).items():
+        caches[cache_name].configure(**options)
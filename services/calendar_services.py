@@ -1,8 +1,14 @@
 from fastapi import Request
-from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from scripts.json_parser import json_parser
+from scripts.bson_json_response import BSONJSONResponse
+from scripts.principal import load_principal
 from .service_helpers.calendar_service_helpers import CalendarDataHelper
+from .service_helpers.calendar_recurrence_helpers import RecurrenceHelper
+from .service_helpers.calendar_free_busy_helpers import FreeBusyHelper
+from .service_helpers.calendar_member_helpers import CalendarMemberHelper
+from .service_helpers.membership_helpers import MembershipDataHelper
+from typing import Optional
 import asyncio
 import logging
 
@@ -13,34 +19,44 @@ logger = logging.getLogger(__name__)
 # to prepare and manipulate the data for retrieval or storage
 class CalendarData():
 
+    # keeps a single free/busy query from fanning out over the whole user base
+    free_busy_max_users = 100
+
+    # an import is one insert_many, this only bounds the request body and the change log write
+    max_events_per_import = 1000
+
     @staticmethod
     async def get_user_calendars_service(request: Request, user_email: str):
         try:
-            user = await request.app.db['users'].find_one(
-                {"email": user_email},
-                projection={
-                    'calendars': 1,
-                    'pending_calendars': 1,
-                    'personal_calendar': 1,
-                },
-            )
+            principal = await load_principal(request, user_email)
 
-            if user is None:
+            if principal is None:
                 return JSONResponse(content={'detail': 'User not found'}, status_code=404)
             
-            return user
+            calendars, pending_calendars = await asyncio.gather(
+                MembershipDataHelper.get_resource_ids(request, principal, 'calendar'),
+                MembershipDataHelper.get_resource_ids(request, principal, 'calendar', state='pending'),
+            )
+
+            # callers replace the id lists with populated calendars, so they get their own copy of the principal
+            return {
+                '_id': principal['_id'],
+                'calendars': calendars,
+                'pending_calendars': pending_calendars,
+                'personal_calendar': principal.get('personal_calendar'),
+            }
         
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
         
 
     @staticmethod
-    async def fetch_all_user_calendars_service(request: Request, user):
+    async def fetch_all_user_calendars_service(request: Request, user, date_window: Optional[dict] = None):
         try:
             calendars, pending_calendars, personal_calendar = await asyncio.gather(
-                CalendarDataHelper.populate_individual_calendars(request=request, calendar_ids=user.get('calendars', [])),
-                CalendarDataHelper. populate_individual_calendars(request=request, calendar_ids= user.get('pending_calendars', [])),
-                CalendarDataHelper.populate_one_calendar(request=request, calendar_id=user.get('personal_calendar', None)),
+                CalendarDataHelper.populate_individual_calendars(request=request, calendar_ids=user.get('calendars', []), date_window=date_window),
+                CalendarDataHelper.populate_individual_calendars(request=request, calendar_ids=user.get('pending_calendars', []), date_window=date_window),
+                CalendarDataHelper.populate_one_calendar(request=request, calendar_id=user.get('personal_calendar', None), date_window=date_window),
             )
 
             if isinstance(calendars, JSONResponse) or isinstance(pending_calendars, JSONResponse) or personal_calendar is None:
@@ -56,6 +72,107 @@ class CalendarData():
             return CalendarDataHelper.handle_server_error(e)
     
     
+    @staticmethod
+    async def sync_calendars_service(request: Request, user_email: str):
+        try:
+            request_body = await json_parser(request=request)
+
+            if isinstance(request_body, JSONResponse):
+                return request_body
+            
+            user = await CalendarData.get_user_calendars_service(request, user_email)
+
+            if isinstance(user, JSONResponse):
+                return user
+            
+            calendar_sync = await CalendarDataHelper.build_calendar_sync(
+                request,
+                CalendarDataHelper.get_accessible_calendar_ids(user),
+                request_body.get('calendars', {}),
+            )
+
+            if isinstance(calendar_sync, JSONResponse):
+                return calendar_sync
+            
+            return BSONJSONResponse(content={
+                'detail': 'Calendars synced',
+                **calendar_sync,
+            }, status_code=200)
+        
+        except Exception as e:
+            return CalendarDataHelper.handle_server_error(e)
+    
+    
+    @staticmethod
+    async def free_busy_service(request: Request):
+        try:
+            request_body = await json_parser(request=request)
+
+            if isinstance(request_body, JSONResponse):
+                return request_body
+            
+            user_ids = request_body.get('userIds', [])
+
+            if len(user_ids) == 0 or len(user_ids) > CalendarData.free_busy_max_users:
+                return JSONResponse(content={
+                    'detail': f'Free/busy needs between 1 and {CalendarData.free_busy_max_users} users'}, status_code=422
+                )
+            
+            # free time is only meaningful between two bounds, so neither one can be left open
+            if not request_body.get('start') or not request_body.get('end'):
+                return JSONResponse(content={
+                    'detail': 'Free/busy needs a start and an end'}, status_code=422
+                )
+            
+            date_window = CalendarDataHelper.build_date_window(request_body['start'], request_body['end'])
+
+            if isinstance(date_window, JSONResponse):
+                return date_window
+            
+            users, calendar_ids_by_user = await asyncio.gather(
+                request.app.db['users'].find({'_id': {'$in': user_ids}}, projection={'_id': 1}).to_list(length=None),
+                CalendarMemberHelper.get_users_calendar_ids(request, user_ids),
+            )
+
+            # personal calendars are memberships too, so these are every calendar each user is busy on
+            for user in users:
+                user['calendars'] = calendar_ids_by_user.get(user['_id'], [])
+
+            calendar_ids = list({
+                calendar_id 
+                for user in users 
+                for calendar_id in FreeBusyHelper.get_user_calendar_ids(user)
+            })
+
+            # only what is needed to place an event in time, names and descriptions never leave the db
+            events = await request.app.db['events'].find(
+                CalendarDataHelper.build_events_window_query(calendar_ids, date_window),
+                projection={
+                    'calendar_id': 1,
+                    'combined_date_and_time': 1,
+                    'event_date': 1,
+                    'event_time': 1,
+                    'repeats': 1,
+                    'repeat_option': 1,
+                    'recurrence_exceptions': 1,
+                    'recurrence_overrides': 1,
+                    'revision': 1,
+                },
+            ).to_list(length=None)
+
+            free_busy = FreeBusyHelper.build_free_busy(users, events, date_window)
+
+            return BSONJSONResponse(content={
+                'detail': 'Free/busy calculated',
+                'date_window': date_window,
+                'missing_user_ids': [user_id for user_id in user_ids if user_id not in free_busy['users']],
+                **free_busy,
+            }, status_code=200)
+        
+        except Exception as e:
+            return CalendarDataHelper.handle_server_error(e)
+    
+    
     @staticmethod
     async def create_new_calendar_service(request: Request):
         try:
@@ -69,8 +186,7 @@ class CalendarData():
             upload_status = await CalendarDataHelper.upload_new_calendar(
                 request, 
                 new_calendar, 
-                pending_users, 
-                request_body['createdBy']
+                pending_users,
             )
 
             return upload_status
@@ -91,29 +207,28 @@ class CalendarData():
             user, calendar = await CalendarDataHelper.validate_user_and_calendar(
                 request, 
                 user_email, 
-                user_id,
                 calendar_id
             )
 
             if (user is None or 
                 calendar is None or 
                 user_id == calendar['created_by'] or 
-                user['_id'] not in calendar['authorized_users'] or
-                not CalendarDataHelper.has_calendar_permissions(user, calendar)
+                not await CalendarDataHelper.has_calendar_permissions(request, user, calendar)
                 ):
                 return JSONResponse(content={
                     'detail': 'This request cannot be processed'
                 }, status_code=422)
             
-            filtered_calendar = CalendarDataHelper.filter_out_user_from_calendar_list(user_id, calendar, user_type)
+            user_removal = CalendarDataHelper.build_user_removal_update(user_id, user_type)
 
-            if filtered_calendar is None:
+            if user_removal is None:
                 return JSONResponse(content={'detail': 'Failed to remove user'}, status_code=422)
 
-            updated_calendar = await CalendarDataHelper.replace_one_calendar(
+            updated_calendar = await CalendarDataHelper.remove_user_from_calendar(
                 request, 
+                user_id,
                 calendar_id, 
-                filtered_calendar
+                user_removal
             )
 
             if updated_calendar is None:
@@ -124,10 +239,10 @@ class CalendarData():
             if populated_calendar is None:
                 return JSONResponse(content={'detail': 'Failed to refetch updated calendar with removed user'}, status_code=404)
             
-            return JSONResponse(
+            return BSONJSONResponse(
                 content={
                     'detail': 'User successfully removed from calendar',
-                    'updated_calendar': jsonable_encoder(populated_calendar),
+                    'updated_calendar': populated_calendar,
                 },
                 status_code=200
             )
@@ -153,8 +268,7 @@ class CalendarData():
             if (user is None or 
                 calendar is None or 
                 user_id == calendar['created_by'] or 
-                user['_id'] not in calendar['authorized_users'] or
-                not CalendarDataHelper.has_calendar_permissions(user, calendar)
+                not await CalendarDataHelper.has_calendar_permissions(request, user, calendar)
                 ):
                 return JSONResponse(content={
                     'detail': 'This request cannot be processed'
@@ -178,15 +292,9 @@ class CalendarData():
             if updated_list is None:
                 return JSONResponse(content={'detail': 'There was an issue adding that user, either the user was already in the list, or we failed to update the list'}, status_code=422)
             
-            updated_calendar = await CalendarDataHelper.find_one_calendar(request, calendar_id)
-
-            if updated_calendar is None:
-                return JSONResponse(content={
-                    'detail': 'Failed to refetch updated calendar with added user'}, status_code=404
-                )
-            
-            if not CalendarDataHelper.verify_user_is_in_calendar(
-                updated_calendar, 
+            if not await CalendarDataHelper.verify_user_is_in_calendar(
+                request,
+                calendar_id, 
                 permission_type, user_id
             ):
                 return JSONResponse(content={
@@ -200,9 +308,9 @@ class CalendarData():
                     'detail': 'Failed to refetch updated calendar with added user'}, status_code=404
                 )
                         
-            return JSONResponse(content={
+            return BSONJSONResponse(content={
                 'detail': 'We successfully added user to your calendar',
-                'updated_calendar': jsonable_encoder(populated_calendar),
+                'updated_calendar': populated_calendar,
             }, status_code=200)
             
         except Exception as e:
@@ -230,40 +338,38 @@ class CalendarData():
                     status_code=422
                 )
             
-            all_user_ids = CalendarDataHelper.group_all_user_ids_in_calendar(calendar, user['_id'])
-
-            users_remove_status = 0
-            if (len(all_user_ids) > 0):
-                users_remove_status = await CalendarDataHelper.remove_calendar_from_users(
-                    request, 
-                    all_user_ids,
-                    calendar_id
-                )
-
-            CalendarDataHelper.log_user_removal_status(users_remove_status)
-
-            if (len(calendar['events']) > 0):
-                await CalendarDataHelper.remove_all_calendar_events(
+            # events, notes and the calendar itself do not depend on each other, so they are sent to mongo together
+            removed_events, removed_notes, delete_calendar = await asyncio.gather(
+                CalendarDataHelper.remove_all_calendar_events(
                     request,
-                    calendar['events'],
-                )
-
-            if (len(calendar['notes']) > 0):
-                await CalendarDataHelper.remove_all_calendar_notes(
+                    calendar,
+                ),
+                CalendarDataHelper.remove_all_calendar_notes(
                     request,
-                    calendar['notes'],
-                )
-
-            delete_calendar = await CalendarDataHelper.delete_one_calendar(
-                request,
-                calendar_id,
+                    calendar,
+                ),
+                CalendarDataHelper.delete_one_calendar(
+                    request,
+                    calendar_id,
+                ),
             )
 
-            if delete_calendar is None:
+            if delete_calendar is None or delete_calendar.deleted_count == 0:
                 return JSONResponse(content={
                     'detail': 'Failed to delete calendar'}, status_code=422
                 )
             
+            # users hold the calendar only through its members, which are only removed once the calendar is gone
+            removed_members = await CalendarDataHelper.remove_all_calendar_members(
+                request,
+                calendar_id,
+            )
+
+            # the calendar is gone either way, so a failed cascade step is logged for cleanup rather than undone
+            for cascade_step, removal_status in (('events', removed_events), ('notes', removed_notes), ('members', removed_members)):
+                if isinstance(removal_status, JSONResponse):
+                    logger.error(f"Deleted calendar {calendar_id} but failed to remove its {cascade_step}")
+            
             return JSONResponse(content={
                 'detail': 'Calendar successfully deleted',
                 'calendar_id': calendar_id,
@@ -280,29 +386,21 @@ class CalendarData():
         user_id: str
     ):
         try:
-            user = await CalendarDataHelper.find_one_user(request, user_id)
-            calendar = await CalendarDataHelper.find_one_calendar(request, calendar_id)
+            user = await CalendarDataHelper.find_one_user(request, user_id, projection={'_id': 1})
+            calendar = await CalendarDataHelper.find_one_calendar(request, calendar_id, projection={'_id': 1})
 
             if user is None or calendar is None:
                 return JSONResponse(content={
                     'detail': 'The user or calendar sent do not exist'}, status_code=404
                 )
             
-            updated_user = await CalendarDataHelper.remove_calendar_from_user(
-                request,
-                user_id,
-                calendar_id,
-            )
-            
             updated_calendar = await CalendarDataHelper.handle_remove_user_from_calendar(
                 request,
                 user_id,
                 calendar_id,
-                calendar['authorized_users'],
-                calendar['view_only_users'],
             )
 
-            if updated_user is None or updated_calendar is None:
+            if updated_calendar is None:
                 return JSONResponse(content={
                     'detail': 'Failed to complete removal'}, status_code=422
                 )
@@ -357,14 +455,23 @@ class CalendarData():
             if isinstance(calendar_note, JSONResponse):
                 return calendar_note
             
-            updated_calendar = await CalendarDataHelper.add_note_to_calendar(
+            calendar_version = await CalendarDataHelper.add_note_to_calendar(
                 request,
                 calendar_id,
                 calendar_note['_id'],
             )
 
-            if isinstance(updated_calendar, JSONResponse):
-                return updated_calendar
+            if isinstance(calendar_version, JSONResponse):
+                return calendar_version
+            
+            if CalendarDataHelper.wants_delta_response(request):
+                return CalendarDataHelper.build_delta_response(
+                    'Successfully updated calendar with note',
+                    calendar_id,
+                    calendar_version,
+                    'calendar_note',
+                    calendar_note,
+                )
             
             populated_calendar = await CalendarDataHelper.populate_one_calendar(
                 request,
@@ -376,9 +483,9 @@ class CalendarData():
                     'detail': 'Failed to refetch updated calendar with note'}, status_code=404
                 )
             
-            return JSONResponse(content={
+            return BSONJSONResponse(content={
                 'detail': 'Successfully updated calendar with note',
-                'updated_calendar': jsonable_encoder(populated_calendar),
+                'updated_calendar': populated_calendar,
             }, status_code=200)
       
         except Exception as e:
@@ -424,10 +531,10 @@ class CalendarData():
                 return updated_note
             
             # move note to new calendar if necessary
-            if note['calendar_id'] is not calendar_id:
+            if note['calendar_id'] != calendar_id:
                 change_status = await CalendarDataHelper.handle_move_calendar_note_to_new_calendar(
                     request,
-                    updated_note,
+                    note,
                     calendar_id,
                     note_id,                                                                   
                 )
@@ -435,18 +542,27 @@ class CalendarData():
                 if isinstance(change_status, JSONResponse):
                     return change_status
                 
-            uploaded_note = await CalendarDataHelper.update_calendar_note(
+            calendar_version = await CalendarDataHelper.update_calendar_note(
                 request,
-                updated_note,
-                note_id
+                note_id=note_id,
+                note=updated_note,
             )
 
-            if isinstance(uploaded_note, JSONResponse):
-                return uploaded_note
+            if isinstance(calendar_version, JSONResponse):
+                return calendar_version
             
-            return JSONResponse(content={
+            if CalendarDataHelper.wants_delta_response(request):
+                return CalendarDataHelper.build_delta_response(
+                    'Successfully updated the note',
+                    calendar_id,
+                    calendar_version,
+                    'updated_note',
+                    updated_note,
+                )
+            
+            return BSONJSONResponse(content={
                 'detail': 'Successfully updated the note',
-                'updated_note': jsonable_encoder(updated_note),
+                'updated_note': updated_note,
             }, status_code=200)
 
         except Exception as e:
@@ -495,14 +611,23 @@ class CalendarData():
             if isinstance(note_deletion_status, JSONResponse):
                 return note_deletion_status
 
-            note_removal_status = await CalendarDataHelper.remove_note_from_calendar(
+            calendar_version = await CalendarDataHelper.remove_note_from_calendar(
                 request,
                 calendar_id,
                 note_id,
             )
 
-            if isinstance(note_removal_status, JSONResponse):
-                return note_removal_status
+            if isinstance(calendar_version, JSONResponse):
+                return calendar_version
+            
+            if CalendarDataHelper.wants_delta_response(request):
+                return CalendarDataHelper.build_delta_response(
+                    'Success! Calendar was updated, note was removed',
+                    calendar_id,
+                    calendar_version,
+                    'deleted_note_id',
+                    note_id,
+                )
             
             populated_calendar = await CalendarDataHelper.populate_one_calendar(
                 request,
@@ -514,7 +639,7 @@ class CalendarData():
                     'detail': 'we failed to populate an updated calendar without the note, but the note was removed'}, 
                 status_code=422)
             
-            return JSONResponse(content={
+            return BSONJSONResponse(content={
                 'detail': 'Success! Calendar was updated, note was removed',
                 'updated_calendar': populated_calendar,
             }, status_code=200)
@@ -542,7 +667,7 @@ class CalendarData():
         if isinstance(request_body, JSONResponse):
             return request_body
         
-        new_event = await CalendarDataHelper.create_event_instance(
+        new_event = CalendarDataHelper.create_event_instance(
             request_body,
             calendar_id,
             user_ref,
@@ -551,14 +676,23 @@ class CalendarData():
         if isinstance(new_event, JSONResponse):
             return new_event
         
-        event_upload = await CalendarDataHelper.upload_new_event(
+        calendar_version = await CalendarDataHelper.upload_new_event(
             request,
             calendar_id,
             new_event,
         )
 
-        if isinstance(event_upload, JSONResponse):
-            return event_upload
+        if isinstance(calendar_version, JSONResponse):
+            return calendar_version
+        
+        if CalendarDataHelper.wants_delta_response(request):
+            return CalendarDataHelper.build_delta_response(
+                'Success! We uploaded your event',
+                calendar_id,
+                calendar_version,
+                'event',
+                new_event,
+            )
         
         populated_calendar = await CalendarDataHelper.populate_one_calendar(
             request,
@@ -570,12 +704,99 @@ class CalendarData():
                 'detail': 'Failed to populated updated calendar'}, status_code=422
             )
         
-        return JSONResponse(content={
+        return BSONJSONResponse(content={
             'detail': 'Success! We uploaded your event',
-            'updated_calendar': jsonable_encoder(populated_calendar),
+            'updated_calendar': populated_calendar,
         }, status_code=200)
     
 
+    @staticmethod
+    async def post_events_service(
+        request: Request, 
+        calendar_id: str, 
+        user_email: str,
+    ):
+        try:
+            permissions = await CalendarDataHelper.verify_user_has_calendar_authorization(
+                request, 
+                user_email, 
+                calendar_id
+            )
+
+            if permissions is False or isinstance(permissions, JSONResponse):
+                return JSONResponse(content={
+                    'detail': 'We could not validate permissions'}, status_code=404
+                )
+            
+            user_ref = await CalendarDataHelper.build_user_reference(
+                request, 
+                user_email
+            )
+
+            if isinstance(user_ref, JSONResponse):
+                return user_ref
+            
+            request_body = await json_parser(request=request)
+
+            if isinstance(request_body, JSONResponse):
+                return request_body
+            
+            if len(request_body) == 0 or len(request_body) > CalendarData.max_events_per_import:
+                return JSONResponse(content={
+                    'detail': f'Send between 1 and {CalendarData.max_events_per_import} events'}, status_code=422
+                )
+            
+            # every event is built before anything is written, so a bad event fails the whole import
+            new_events = []
+            for event_data in request_body:
+                new_event = CalendarDataHelper.create_event_instance(
+                    event_data,
+                    calendar_id,
+                    user_ref,
+                )
+
+                if isinstance(new_event, JSONResponse):
+                    return new_event
+                
+                new_events.append(new_event)
+            
+            calendar_version = await CalendarDataHelper.upload_new_events(
+                request,
+                calendar_id,
+                new_events,
+            )
+
+            if isinstance(calendar_version, JSONResponse):
+                return calendar_version
+            
+            if CalendarDataHelper.wants_delta_response(request):
+                return CalendarDataHelper.build_delta_response(
+                    f'Success! We uploaded {len(new_events)} events',
+                    calendar_id,
+                    calendar_version,
+                    'events',
+                    new_events,
+                )
+            
+            populated_calendar = await CalendarDataHelper.populate_one_calendar(
+                request,
+                calendar_id,
+            )
+
+            if populated_calendar is None:
+                return JSONResponse(content={
+                    'detail': 'Failed to populated updated calendar'}, status_code=422
+                )
+            
+            return BSONJSONResponse(content={
+                'detail': f'Success! We uploaded {len(new_events)} events',
+                'updated_calendar': populated_calendar,
+            }, status_code=200)
+        
+        except Exception as e:
+            return CalendarDataHelper.handle_server_error(e)
+    
+
     @staticmethod
     async def put_event_service(
         request: Request,
@@ -592,24 +813,32 @@ class CalendarData():
         if isinstance(request_body, JSONResponse):
             return request_body
         
-        updated_event = await CalendarDataHelper.create_event_instance(
+        updated_event = CalendarDataHelper.create_event_instance(
             request_body,
             calendar_id,
             event_creator,
-            event_creator,
         )
 
         if isinstance(updated_event, JSONResponse):
             return updated_event
         
-        event_status = await CalendarDataHelper.replace_event(
+        calendar_version = await CalendarDataHelper.replace_event(
             request,
             updated_event,
             event_id,
         )
 
-        if isinstance(event_status, JSONResponse):
-            return event_status
+        if isinstance(calendar_version, JSONResponse):
+            return calendar_version
+        
+        if CalendarDataHelper.wants_delta_response(request):
+            return CalendarDataHelper.build_delta_response(
+                'Success! We updated your event',
+                calendar_id,
+                calendar_version,
+                'event',
+                updated_event,
+            )
         
         updated_calendar = await CalendarDataHelper.populate_one_calendar(
             request,
@@ -621,7 +850,7 @@ class CalendarData():
                 'detail': 'Failed to populate updated calendar'}, status_code=422
             )
         
-        return JSONResponse(content={
+        return BSONJSONResponse(content={
             'detail': 'Success! We updated your event',
             'updated_calendar': updated_calendar,
         }, status_code=200)
@@ -656,6 +885,23 @@ class CalendarData():
                 status_code=422
             )
 
+        calendar_version = await CalendarDataHelper.record_calendar_change(
+            request, 
+            calendar_id, 
+            'event', 
+            event_id, 
+            'delete',
+        )
+
+        if CalendarDataHelper.wants_delta_response(request):
+            return CalendarDataHelper.build_delta_response(
+                'Success! We deleted your event',
+                calendar_id,
+                calendar_version,
+                'deleted_event_id',
+                event_id,
+            )
+
         updated_calendar = await CalendarDataHelper.populate_one_calendar(
             request, 
             calendar_id
@@ -667,7 +913,138 @@ class CalendarData():
                 status_code=422
             )
 
-        return JSONResponse(content={
+        return BSONJSONResponse(content={
             'detail': 'Success! We deleted your event',
             'updated_calendar': updated_calendar,
-        }, status_code=200)
\ No newline at end of file
+        }, status_code=200)
+    
+
+    @staticmethod
+    async def edit_event_occurrence_service(
+        request: Request,
+        calendar_id: str,
+        event_id: str,
+        occurrence_date: str,
+    ):
+        try:
+            event = await CalendarDataHelper.find_one_event(request, calendar_id, event_id)
+
+            if event is None or not RecurrenceHelper.is_occurrence(event, occurrence_date):
+                return JSONResponse(content={
+                    'detail': 'That occurrence could not be found'}, status_code=404
+                )
+            
+            request_body = await json_parser(request=request)
+
+            if isinstance(request_body, JSONResponse):
+                return request_body
+            
+            override = CalendarDataHelper.build_occurrence_override(event, request_body)
+            
+            updated_event = await CalendarDataHelper.update_event_occurrences(
+                request,
+                event_id,
+                {
+                    '$set': {f'recurrence_overrides.{occurrence_date}': override},
+                    '$pull': {'recurrence_exceptions': occurrence_date},
+                },
+            )
+
+            if updated_event is None:
+                return JSONResponse(content={
+                    'detail': 'we could not update that occurrence'}, status_code=422
+                )
+            
+            return await CalendarData.build_event_occurrence_response(
+                request,
+                calendar_id,
+                event_id,
+                updated_event,
+                'Success! We updated that occurrence',
+            )
+        
+        except Exception as e:
+            return CalendarDataHelper.handle_server_error(e)
+        
+
+    @staticmethod
+    async def delete_event_occurrence_service(
+        request: Request,
+        calendar_id: str,
+        event_id: str,
+        occurrence_date: str,
+    ):
+        try:
+            event = await CalendarDataHelper.find_one_event(request, calendar_id, event_id)
+
+            if event is None or not RecurrenceHelper.is_occurrence(event, occurrence_date):
+                return JSONResponse(content={
+                    'detail': 'That occurrence could not be found'}, status_code=404
+                )
+            
+            updated_event = await CalendarDataHelper.update_event_occurrences(
+                request,
+                event_id,
+                {
+                    '$addToSet': {'recurrence_exceptions': occurrence_date},
+                    '$unset': {f'recurrence_overrides.{occurrence_date}': ''},
+                },
+            )
+
+            if updated_event is None:
+                return JSONResponse(content={
+                    'detail': 'we could not remove that occurrence'}, status_code=422
+                )
+            
+            return await CalendarData.build_event_occurrence_response(
+                request,
+                calendar_id,
+                event_id,
+                updated_event,
+                'Success! We removed that occurrence',
+            )
+        
+        except Exception as e:
+            return CalendarDataHelper.handle_server_error(e)
+        
+
+    @staticmethod
+    async def build_event_occurrence_response(
+        request: Request,
+        calendar_id: str,
+        event_id: str,
+        updated_event,
+        detail: str,
+    ):
+        # occurrence edits live on the series event, so clients see them as an upsert of that event
+        calendar_version = await CalendarDataHelper.record_calendar_change(
+            request, 
+            calendar_id, 
+            'event', 
+            event_id, 
+            'upsert',
+        )
+
+        if CalendarDataHelper.wants_delta_response(request):
+            return CalendarDataHelper.build_delta_response(
+                detail,
+                calendar_id,
+                calendar_version,
+                'event',
+                updated_event,
+            )
+        
+        updated_calendar = await CalendarDataHelper.populate_one_calendar(
+            request,
+            calendar_id,
+        )
+
+        if updated_calendar is None:
+            return JSONResponse(content={
+                'detail': 'Failed to populate updated calendar'}, status_code=422
+            )
+        
+        return BSONJSONResponse(content={
+            'detail': detail,
+            'updated_calendar': updated_calendar,
+        }, status_code=200)
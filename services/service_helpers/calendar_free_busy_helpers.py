@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from .calendar_recurrence_helpers import RecurrenceHelper
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Turns events into busy intervals and merges them. Events only carry a start, so timed events are
+# given a default length and events without a time block out the whole day
+class FreeBusyHelper():
+
+    default_event_duration = timedelta(minutes=60)
+
+    @staticmethod
+    def parse_event_time(event_time: str):
+        for time_format in ('%H:%M:%S', '%H:%M'):
+            try:
+                return datetime.strptime(event_time, time_format).time()
+            except (TypeError, ValueError):
+                continue
+        return None
+
+
+    @staticmethod
+    def build_event_interval(event):
+        event_date = RecurrenceHelper.parse_event_date(event['event_date'])
+
+        if event.get('combined_date_and_time'):
+            start = RecurrenceHelper.parse_event_date(event['combined_date_and_time'])
+            return (start, start + FreeBusyHelper.default_event_duration)
+
+        event_time = FreeBusyHelper.parse_event_time(event.get('event_time'))
+
+        if event_time is None:
+            day_start = datetime.combine(event_date.date(), datetime.min.time())
+            return (day_start, day_start + timedelta(days=1))
+
+        start = datetime.combine(event_date.date(), event_time)
+        return (start, start + FreeBusyHelper.default_event_duration)
+
+
+    @staticmethod
+    def merge_intervals(intervals: list, window_start: datetime, window_end: datetime):
+        # sort once, then sweep, folding every interval that overlaps or touches the current block into it
+        merged = []
+
+        for start, end in sorted(intervals):
+            start, end = max(start, window_start), min(end, window_end)
+            if start >= end:
+                continue
+
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        return merged
+
+
+    @staticmethod
+    def invert_intervals(busy: list, window_start: datetime, window_end: datetime):
+        free = []
+        cursor = window_start
+
+        for start, end in busy:
+            if start > cursor:
+                free.append([cursor, start])
+            cursor = max(cursor, end)
+
+        if cursor < window_end:
+            free.append([cursor, window_end])
+
+        return free
+
+
+    @staticmethod
+    def format_intervals(intervals: list):
+        return [
+            {'start': RecurrenceHelper.format_event_date(start), 'end': RecurrenceHelper.format_event_date(end)}
+            for start, end in intervals
+        ]
+
+
+    @staticmethod
+    def build_free_busy(users: list, events: list, date_window: dict):
+        window_start = RecurrenceHelper.parse_event_date(date_window['start'])
+        window_end = RecurrenceHelper.parse_event_date(date_window['end'])
+
+        # calendar_id -> ids of the requested users who can see it, so each event is placed once per viewer
+        calendar_viewers = {}
+        for user in users:
+            for calendar_id in FreeBusyHelper.get_user_calendar_ids(user):
+                calendar_viewers.setdefault(calendar_id, []).append(user['_id'])
+
+        user_intervals = {user['_id']: [] for user in users}
+        all_intervals = []
+
+        for event in RecurrenceHelper.expand_events(events, date_window):
+            try:
+                interval = FreeBusyHelper.build_event_interval(event)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Skipping event {event.get('_id')} in free/busy: {e}")
+                continue
+
+            all_intervals.append(interval)
+            for user_id in calendar_viewers.get(event.get('calendar_id'), []):
+                user_intervals[user_id].append(interval)
+
+        users_free_busy = {}
+        for user_id, intervals in user_intervals.items():
+            busy = FreeBusyHelper.merge_intervals(intervals, window_start, window_end)
+            users_free_busy[user_id] = {
+                'busy': FreeBusyHelper.format_intervals(busy),
+                'free': FreeBusyHelper.format_intervals(FreeBusyHelper.invert_intervals(busy, window_start, window_end)),
+            }
+
+        busy = FreeBusyHelper.merge_intervals(all_intervals, window_start, window_end)
+
+        return {
+            'users': users_free_busy,
+            'busy': FreeBusyHelper.format_intervals(busy),
+            'free': FreeBusyHelper.format_intervals(FreeBusyHelper.invert_intervals(busy, window_start, window_end)),
+        }
+
+
+    @staticmethod
+    def get_user_calendar_ids(user):
+        # pending calendars are unanswered invitations, so they do not make a user busy
+        calendar_ids = list(user.get('calendars', []))
+        if user.get('personal_calendar'):
+            calendar_ids.append(user['personal_calendar'])
+        return calendar_ids
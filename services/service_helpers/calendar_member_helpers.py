@@ -0,0 +1,198 @@
+from fastapi import Request
+from pymongo import ReplaceOne
+from scripts.ttl_cache import calendar_permission_cache
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# one document per (calendar, user) pair, mirroring the calendar's authorized_users, view_only_users and
+# pending_users arrays. permission checks read a single indexed member instead of the whole calendar,
+# the arrays stay on the calendar for populating and for older clients
+class CalendarMemberHelper:
+
+    collection = 'calendar_members'
+    roles = ('authorized', 'view_only')
+
+    # bumped by every invalidation, a read that raced a membership write does not cache what it read
+    member_writes = 0
+
+    @staticmethod
+    def build_member_id(calendar_id: str, user_id: str):
+        return f"{calendar_id}:{user_id}"
+
+
+    @staticmethod
+    def build_member(calendar_id: str, user_id: str, role: str, pending: bool = False):
+        return {
+            '_id': CalendarMemberHelper.build_member_id(calendar_id, user_id),
+            'calendar_id': str(calendar_id),
+            'user_id': str(user_id),
+            'role': role,
+            'pending': pending,
+        }
+
+
+    @staticmethod
+    def build_calendar_members(calendar: dict):
+        # takes an encoded calendar document, a user listed more than once keeps their accepted role
+        calendar_id = calendar['_id']
+        members = {}
+
+        for user_id in calendar.get('authorized_users', []):
+            members.setdefault(str(user_id), CalendarMemberHelper.build_member(calendar_id, user_id, 'authorized'))
+
+        for user_id in calendar.get('view_only_users', []):
+            members.setdefault(str(user_id), CalendarMemberHelper.build_member(calendar_id, user_id, 'view_only'))
+
+        for pending_user in calendar.get('pending_users', []):
+            members.setdefault(
+                str(pending_user['_id']),
+                CalendarMemberHelper.build_member(calendar_id, pending_user['_id'], pending_user['type'], pending=True),
+            )
+
+        return list(members.values())
+
+
+    @staticmethod
+    async def create_calendar_member_indexes(db):
+        # _id already makes (calendar_id, user_id) unique, these cover "which calendars can this user see"
+        # without touching the documents and the cleanup when a calendar is deleted
+        await asyncio.gather(
+            db[CalendarMemberHelper.collection].create_index(
+                [('user_id', 1), ('pending', 1), ('calendar_id', 1)],
+                name='user_id_pending_calendar_id',
+            ),
+            db[CalendarMemberHelper.collection].create_index(
+                'calendar_id',
+                name='calendar_id',
+            ),
+        )
+
+
+    @staticmethod
+    async def upsert_members(request: Request, members: list[dict]):
+        if len(members) == 0:
+            return None
+
+        try:
+            return await request.app.db[CalendarMemberHelper.collection].bulk_write(
+                [ReplaceOne({'_id': member['_id']}, member, upsert=True) for member in members],
+                ordered=False,
+            )
+        except Exception as e:
+            logger.error(f"Error saving calendar members: {e}")
+            return None
+        finally:
+            for member in members:
+                CalendarMemberHelper.invalidate_cached_member(member['calendar_id'], member['user_id'])
+
+
+    @staticmethod
+    async def set_member(
+        request: Request,
+        calendar_id: str,
+        user_id: str,
+        role: str,
+        pending: bool = False,
+    ):
+        return await CalendarMemberHelper.upsert_members(
+            request,
+            [CalendarMemberHelper.build_member(calendar_id, user_id, role, pending)],
+        )
+
+
+    @staticmethod
+    async def remove_member(request: Request, calendar_id: str, user_id: str):
+        try:
+            return await request.app.db[CalendarMemberHelper.collection].delete_one(
+                {'_id': CalendarMemberHelper.build_member_id(calendar_id, user_id)}
+            )
+        except Exception as e:
+            logger.error(f"Error removing user {user_id} from calendar {calendar_id} members: {e}")
+            return None
+        finally:
+            CalendarMemberHelper.invalidate_cached_member(calendar_id, user_id)
+
+
+    @staticmethod
+    async def remove_calendar_members(request: Request, calendar_id: str):
+        try:
+            return await request.app.db[CalendarMemberHelper.collection].delete_many({'calendar_id': calendar_id})
+        except Exception as e:
+            logger.error(f"Error removing members of calendar {calendar_id}: {e}")
+            return None
+        finally:
+            CalendarMemberHelper.invalidate_cached_calendar_members(calendar_id)
+
+
+    @staticmethod
+    async def find_member(request: Request, calendar_id: str, user_id: str):
+        # bursts of edits from one user re-check the same member, so decisions are served from the cache
+        cache_key = (str(user_id), calendar_id)
+        member = calendar_permission_cache.lookup(cache_key)
+
+        if member is not None:
+            return member or None
+
+        member_writes = CalendarMemberHelper.member_writes
+        member = await request.app.db[CalendarMemberHelper.collection].find_one(
+            {'_id': CalendarMemberHelper.build_member_id(calendar_id, user_id)},
+            projection={'role': 1, 'pending': 1},
+        )
+
+        if member_writes == CalendarMemberHelper.member_writes:
+            calendar_permission_cache[cache_key] = member or {}
+
+        return member
+
+
+    @staticmethod
+    def invalidate_cached_member(calendar_id: str, user_id: str):
+        CalendarMemberHelper.member_writes += 1
+        calendar_permission_cache.invalidate((str(user_id), calendar_id))
+
+
+    @staticmethod
+    def invalidate_cached_calendar_members(calendar_id: str):
+        CalendarMemberHelper.member_writes += 1
+        for cache_key in [cache_key for cache_key in list(calendar_permission_cache.keys()) if cache_key[1] == calendar_id]:
+            calendar_permission_cache.invalidate(cache_key)
+
+
+    @staticmethod
+    async def get_user_calendar_ids(request: Request, user_id: str, pending: bool = False):
+        cursor = request.app.db[CalendarMemberHelper.collection].find(
+            {'user_id': str(user_id), 'pending': pending},
+            projection={'_id': 0, 'calendar_id': 1},
+        ).sort('calendar_id', 1)
+        return [member['calendar_id'] async for member in cursor]
+
+
+    @staticmethod
+    async def get_users_calendar_ids(request: Request, user_ids: list[str]):
+        # accepted calendars only, for reading many users at once. served from the same index as a single user
+        cursor = request.app.db[CalendarMemberHelper.collection].find(
+            {'user_id': {'$in': [str(user_id) for user_id in user_ids]}, 'pending': False},
+            projection={'_id': 0, 'user_id': 1, 'calendar_id': 1},
+        )
+
+        calendar_ids = {}
+        async for member in cursor:
+            calendar_ids.setdefault(member['user_id'], []).append(member['calendar_id'])
+        return calendar_ids
+
+
+    @staticmethod
+    def get_member_permissions(member):
+        if member is None:
+            return None
+        if member.get('pending'):
+            return 'pending'
+        return member.get('role')
+
+
+    @staticmethod
+    def is_authorized(member):
+        return CalendarMemberHelper.get_member_permissions(member) == 'authorized'
@@ -0,0 +1,219 @@
+from datetime import datetime, date, timedelta
+from calendar import monthrange
+from typing import Optional
+from scripts.ttl_cache import recurrence_expansion_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Expands repeating events into occurrences inside a date window. Occurrence dates are computed
+# arithmetically from the first occurrence, so a window costs O(occurrences in the window) no matter
+# how long ago the series started
+class RecurrenceHelper():
+
+    # normalized repeat_option -> (unit, interval)
+    recurrence_rules = {
+        'daily': ('days', 1),
+        'weekdays': ('weekdays', 1),
+        'weekly': ('days', 7),
+        'biweekly': ('days', 14),
+        'monthly': ('months', 1),
+        'yearly': ('months', 12),
+    }
+
+    # event fields a single occurrence can override
+    overridable_fields = ('event_name', 'event_description', 'event_time', 'event_date')
+
+    @staticmethod
+    def parse_event_date(value):
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+
+
+    @staticmethod
+    def format_event_date(value: datetime):
+        # same '%Y-%m-%d %H:%M:%S' format events are stored in, isoformat is several times faster than strftime
+        return value.isoformat(sep=' ', timespec='seconds')
+
+
+    @staticmethod
+    def parse_occurrence_key(occurrence_key: str):
+        try:
+            occurrence_day = date.fromisoformat(occurrence_key)
+        except (TypeError, ValueError):
+            return None
+        # keys are used as mongo paths and matched against expanded dates, so only the canonical form is accepted
+        return occurrence_day if occurrence_day.isoformat() == occurrence_key else None
+
+
+    @staticmethod
+    def get_recurrence_rule(event):
+        if not event.get('repeats'):
+            return None
+
+        repeat_option = (event.get('repeat_option') or '').strip().lower().replace(' ', '').replace('-', '')
+        return RecurrenceHelper.recurrence_rules.get(repeat_option)
+
+
+    @staticmethod
+    def expand_day_series(first: datetime, step_days: int, start: datetime, end: datetime):
+        step = timedelta(days=step_days)
+        # jump straight to the first index inside [start, end) instead of walking from the first occurrence
+        first_index = max(0, -((first - start) // step))
+        end_index = -((first - end) // step)
+        return [first + step * index for index in range(first_index, end_index)]
+
+
+    @staticmethod
+    def expand_weekday_series(first: datetime, start: datetime, end: datetime):
+        # monday-friday is five weekly series, one per weekday, starting at the first occurrence
+        occurrences = []
+        for offset in range(7):
+            series_start = first + timedelta(days=offset)
+            if series_start.weekday() < 5:
+                occurrences.extend(RecurrenceHelper.expand_day_series(series_start, 7, start, end))
+        return sorted(occurrences)
+
+
+    @staticmethod
+    def add_months(first: datetime, months: int):
+        month_index = first.month - 1 + months
+        year = first.year + month_index // 12
+        month = month_index % 12 + 1
+        # the 29th-31st land on the last day of shorter months
+        day = min(first.day, monthrange(year, month)[1])
+        return first.replace(year=year, month=month, day=day)
+
+
+    @staticmethod
+    def expand_month_series(first: datetime, step_months: int, start: datetime, end: datetime):
+        months_to_start = (start.year - first.year) * 12 + start.month - first.month
+        months_to_end = (end.year - first.year) * 12 + end.month - first.month
+        first_index = max(0, months_to_start // step_months)
+        last_index = months_to_end // step_months
+
+        occurrences = [
+            RecurrenceHelper.add_months(first, step_months * index)
+            for index in range(first_index, last_index + 1)
+        ]
+        return [occurrence for occurrence in occurrences if start <= occurrence < end]
+
+
+    @staticmethod
+    def expand_occurrence_dates(first: datetime, rule: tuple, start: datetime, end: datetime):
+        unit, interval = rule
+
+        if unit == 'weekdays':
+            return RecurrenceHelper.expand_weekday_series(first, start, end)
+        if unit == 'months':
+            return RecurrenceHelper.expand_month_series(first, interval, start, end)
+        return RecurrenceHelper.expand_day_series(first, interval, start, end)
+
+
+    @staticmethod
+    def is_occurrence(event, occurrence_key: str):
+        occurrence_day = RecurrenceHelper.parse_occurrence_key(occurrence_key)
+        rule = RecurrenceHelper.get_recurrence_rule(event)
+
+        if occurrence_day is None or rule is None:
+            return False
+
+        day_start = datetime.combine(occurrence_day, datetime.min.time())
+        first = RecurrenceHelper.parse_event_date(event['event_date'])
+        return len(RecurrenceHelper.expand_occurrence_dates(first, rule, day_start, day_start + timedelta(days=1))) > 0
+
+
+    @staticmethod
+    def build_occurrence(event, occurrence_key: str, occurrence_date: datetime, first: datetime, override: Optional[dict] = None):
+        occurrence = {**event, **(override or {})}
+        del occurrence['recurrence_exceptions']
+        del occurrence['recurrence_overrides']
+
+        if override is not None and 'event_date' in override:
+            occurrence_date = RecurrenceHelper.parse_event_date(override['event_date'])
+
+        if event.get('combined_date_and_time'):
+            combined_date_and_time = RecurrenceHelper.parse_event_date(event['combined_date_and_time'])
+            occurrence['combined_date_and_time'] = RecurrenceHelper.format_event_date(combined_date_and_time + (occurrence_date - first))
+
+        occurrence['event_date'] = RecurrenceHelper.format_event_date(occurrence_date)
+        occurrence['occurrence_date'] = occurrence_key
+        occurrence['recurring_event_id'] = event['_id']
+        return occurrence
+
+
+    @staticmethod
+    def build_occurrences(event, date_window: dict):
+        start = RecurrenceHelper.parse_event_date(date_window['start'])
+        end = RecurrenceHelper.parse_event_date(date_window['end'])
+        first = RecurrenceHelper.parse_event_date(event['event_date'])
+        rule = RecurrenceHelper.get_recurrence_rule(event)
+
+        # unknown repeat options are treated as one-off events
+        if rule is None:
+            return [event] if start <= first < end else []
+
+        event = {'recurrence_exceptions': [], 'recurrence_overrides': {}, **event}
+        exceptions = set(event['recurrence_exceptions'])
+        overrides = event['recurrence_overrides']
+
+        occurrences = []
+        for occurrence_date in RecurrenceHelper.expand_occurrence_dates(first, rule, start, end):
+            occurrence_key = occurrence_date.date().isoformat()
+            if occurrence_key in exceptions or occurrence_key in overrides:
+                continue
+            occurrences.append(RecurrenceHelper.build_occurrence(event, occurrence_key, occurrence_date, first))
+
+        # edited occurrences can be moved into or out of the window, so they are placed by their overridden date
+        for occurrence_key, override in overrides.items():
+            occurrence_day = RecurrenceHelper.parse_occurrence_key(occurrence_key)
+            if occurrence_key in exceptions or occurrence_day is None:
+                continue
+
+            occurrence_date = datetime.combine(occurrence_day, first.time())
+            occurrence = RecurrenceHelper.build_occurrence(event, occurrence_key, occurrence_date, first, override)
+            if date_window['start'] <= occurrence['event_date'] < date_window['end']:
+                occurrences.append(occurrence)
+
+        return sorted(occurrences, key=lambda occurrence: occurrence['event_date'])
+
+
+    @staticmethod
+    def expand_event(event, date_window: dict):
+        # every write to an event bumps its revision, and projected reads like free/busy keep their own entries
+        cache_key = (
+            str(event['_id']),
+            event.get('revision', 0),
+            date_window['start'],
+            date_window['end'],
+            tuple(sorted(event)),
+        )
+        occurrences = recurrence_expansion_cache.lookup(cache_key)
+
+        if occurrences is None:
+            occurrences = RecurrenceHelper.build_occurrences(event, date_window)
+            recurrence_expansion_cache[cache_key] = occurrences
+
+        # nested values like created_by are shared with the cache, only the top level is copied
+        return [dict(occurrence) for occurrence in occurrences]
+
+
+    @staticmethod
+    def expand_events(events: list, date_window: dict):
+        expanded_events = []
+
+        for event in events:
+            if not event.get('repeats'):
+                expanded_events.append(event)
+                continue
+
+            try:
+                expanded_events.extend(RecurrenceHelper.expand_event(event, date_window))
+            except (KeyError, TypeError, ValueError) as e:
+                # a malformed repeating event should not take the whole calendar down with it
+                logger.error(f"Error expanding recurring event {event.get('_id')}: {e}")
+                expanded_events.append(event)
+
+        return expanded_events
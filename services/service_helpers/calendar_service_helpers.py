@@ -1,17 +1,35 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from scripts import json_parser
+from scripts.json_parser import json_parser
+from scripts.bson_json_response import BSONJSONResponse
+from scripts.ttl_cache import populated_calendar_cache
+from scripts.data_loader import get_loaders
+from scripts.principal import load_principal, principal_projection
+from .calendar_recurrence_helpers import RecurrenceHelper
+from .calendar_member_helpers import CalendarMemberHelper
 from fastapi.encoders import jsonable_encoder
 from models.calendar import Calendar, PendingUser, UserRef, CalendarNote, Event
+from pymongo import ReturnDocument
 from datetime import datetime
 from typing import Optional
 import asyncio
+import copy
 import logging
 
 logger = logging.getLogger(__name__)
 
 class CalendarDataHelper:
-    
+
+    # 'aggregate' populates a calendar with one $lookup pipeline, 'find' runs one query per populated field
+    populate_engines = ('aggregate', 'find')
+    populate_engine = 'aggregate'
+
+    # how long calendar_changes entries are kept around for delta sync
+    calendar_change_retention_seconds = 60 * 60 * 24 * 30
+
+    # bumped by every invalidation, a populate that raced a calendar write does not cache what it read
+    calendar_writes = 0
+
     @staticmethod
     def handle_server_error(e: str):
         logger.error(f"Error processing request: {e}")
@@ -21,96 +39,517 @@ class CalendarDataHelper:
             }, status_code=500
         )
     
+    @staticmethod
+    async def record_calendar_changes(request: Request, calendar_id: str, changes: list[tuple]):
+        # changes are (entity_type, entity_id, operation) tuples, each one gets its own calendar version
+        if len(changes) == 0:
+            return None
+
+        try:
+            calendar = await request.app.db['calendars'].find_one_and_update(
+                {'_id': calendar_id},
+                {'$inc': {'version': len(changes)}},
+                projection={'version': 1},
+                return_document=ReturnDocument.AFTER,
+            )
+
+            if calendar is None:
+                return None
+
+            first_version = calendar['version'] - len(changes) + 1
+            changed_on = datetime.utcnow()
+
+            await request.app.db['calendar_changes'].insert_many([
+                {
+                    'calendar_id': calendar_id,
+                    'version': first_version + index,
+                    'entity_type': entity_type,
+                    'entity_id': entity_id,
+                    'operation': operation,
+                    'changed_on': changed_on,
+                }
+                for index, (entity_type, entity_id, operation) in enumerate(changes)
+            ])
+
+            return calendar['version']
+
+        except Exception as e:
+            # the document write already happened, so this must not fail it. if the $inc went through the missing
+            # versions send clients to a full resync on their next sync, if it did not the change is unversioned
+            # and clients only see it once they load the calendar in full
+            logger.error(f"Error recording calendar change for calendar {calendar_id}: {e}")
+            return None
+        finally:
+            # after the $inc, so a populate that read the calendar before this change cannot be cached past it
+            CalendarDataHelper.invalidate_cached_calendar(calendar_id)
+
+
+    @staticmethod
+    async def record_calendar_change(
+        request: Request, 
+        calendar_id: str, 
+        entity_type: str, 
+        entity_id: str, 
+        operation: str,
+    ):
+        return await CalendarDataHelper.record_calendar_changes(
+            request,
+            calendar_id,
+            [(entity_type, entity_id, operation)],
+        )
+
+
+    @staticmethod
+    def wants_delta_response(request: Request):
+        # clients opt in with an `X-Response-Mode: delta` header or a `?response=delta` query flag
+        return (
+            request.headers.get('x-response-mode', '').lower() == 'delta'
+            or request.query_params.get('response', '').lower() == 'delta'
+        )
+
+
+    @staticmethod
+    def build_delta_response(
+        detail: str, 
+        calendar_id: str, 
+        version: Optional[int], 
+        entity_key: str, 
+        entity,
+    ):
+        # version is None when the change log write failed, clients should fall back to /calendar/sync
+        return BSONJSONResponse(content={
+            'detail': detail,
+            'calendar_id': calendar_id,
+            'version': version,
+            entity_key: entity,
+        }, status_code=200)
+
+
+    @staticmethod
+    def get_cached_calendar(calendar_id: str):
+        cached_calendar = populated_calendar_cache.lookup(calendar_id)
+        # callers mutate populated calendars, never hand out the cached instance
+        return copy.deepcopy(cached_calendar) if cached_calendar is not None else None
+
+
+    @staticmethod
+    def cache_populated_calendar(calendar):
+        populated_calendar_cache[calendar['_id']] = copy.deepcopy(calendar)
+
+
+    @staticmethod
+    def invalidate_cached_calendar(calendar_id: str):
+        CalendarDataHelper.calendar_writes += 1
+        populated_calendar_cache.invalidate(calendar_id)
+
+
+    @staticmethod
+    def invalidate_cached_calendars_for_user(user_id: str):
+        # populated calendars embed UserProjection fields, so a change to any of them evicts every calendar showing the user.
+        # nothing edits those fields after signup yet, so this has no caller. a profile or account write that
+        # touches them has to call it, otherwise calendars keep serving the old name or email until their ttl runs out
+        for calendar_id, calendar in list(populated_calendar_cache.items()):
+            calendar_users = calendar.get('authorized_users', []) + calendar.get('view_only_users', [])
+            calendar_users += [pending_user['user'] for pending_user in calendar.get('pending_users', [])]
+
+            if any(user is not None and user.get('_id') == user_id for user in calendar_users):
+                CalendarDataHelper.invalidate_cached_calendar(calendar_id)
+
+
     @staticmethod
     async def get_calendars(request: Request, calendar_ids: list[str]):
-        calendars = []
-        async for calendar in request.app.db['calendars'].find({'_id': {'$in': calendar_ids}}):
-            calendars.append(calendar)
-        return calendars
+        calendars = await get_loaders(request).calendars.load_many(calendar_ids)
+        # loaded documents are shared across the request and populating overwrites their fields, so work on copies
+        return [dict(calendar) for calendar in calendars if calendar is not None]
 
 
     @staticmethod
-    async def gather_calendar_field_data(request: Request, calendars):
-        authorized_user_ids = set()
-        view_only_user_ids = set()
-        calendar_notes_ids = set()
-        event_ids = set()
+    async def gather_calendar_field_data(request: Request, calendars, date_window: Optional[dict] = None):
+        user_ids = set()
+        calendar_ids = [calendar['_id'] for calendar in calendars]
+        legacy_note_owners = CalendarDataHelper.get_legacy_document_owners(calendars, 'calendar_notes')
+        legacy_event_owners = CalendarDataHelper.get_legacy_document_owners(calendars, 'events')
 
+        # authorized, view only, and pending users share a projection, so they are fetched in one query
         for calendar in calendars:
-            authorized_user_ids.update(calendar.get('authorized_users', []))
-            view_only_user_ids.update(calendar.get('view_only_users', []))
-            calendar_notes_ids.update(calendar.get('calendar_notes', []))
-            event_ids.update(calendar.get('events', []))
-
-        user_projection = UserProjection.user_projection
+            user_ids.update(calendar.get('authorized_users', []))
+            user_ids.update(calendar.get('view_only_users', []))
+            user_ids.update(str(pending_user.get('_id')) for pending_user in calendar.get('pending_users', []))
+
+        # notes and events are owned through their indexed calendar_id
+        if date_window is not None:
+            calendar_notes_query = CalendarDataHelper.build_calendar_notes_window_query(calendar_ids, date_window)
+            events_query = CalendarDataHelper.build_events_window_query(calendar_ids, date_window)
+        else:
+            calendar_notes_query = CalendarDataHelper.build_owned_documents_query(calendar_ids, legacy_note_owners)
+            events_query = CalendarDataHelper.build_owned_documents_query(calendar_ids, legacy_event_owners)
 
-        authorized_users, view_only_users, calendar_notes, events = await asyncio.gather(
-            request.app.db['users'].find({'_id': {'$in': list(authorized_user_ids)}}, projection=user_projection).to_list(None),
-            request.app.db['users'].find({'_id': {'$in': list(view_only_user_ids)}}, projection=user_projection).to_list(None),
-            request.app.db['calendar_notes'].find({'_id': {'$in': list(calendar_notes_ids)}}).to_list(None),
-            request.app.db['events'].find({'_id': {'$in': list(event_ids)}}).to_list(None)
+        users, calendar_notes, events = await asyncio.gather(
+            CalendarDataHelper.load_users(request, user_ids),
+            request.app.db['calendar_notes'].find(calendar_notes_query).to_list(None),
+            request.app.db['events'].find(events_query).to_list(None)
         )
 
-        return authorized_users, view_only_users, calendar_notes, events
+        CalendarDataHelper.claim_legacy_documents(calendar_notes, legacy_note_owners)
+        CalendarDataHelper.claim_legacy_documents(events, legacy_event_owners)
+
+        return users, calendar_notes, events
 
 
+    # compatibility shims for calendars that still carry the old events / calendar_notes id arrays, they can go
+    # once scripts/db_data_uploaders/migrate_calendar_document_ids.py has run everywhere
     @staticmethod
-    async def attach_retrieved_calendar_fields_to_calendar(request: Request, calendars, authorized_users, view_only_users, calendar_notes, events):
-        user_projection = UserProjection.user_projection
+    def get_legacy_document_owners(calendars, field: str):
+        return {
+            str(document_id): calendar['_id']
+            for calendar in calendars
+            for document_id in calendar.get(field, [])
+        }
 
-        calendar_authorized_users_dict = {str(user['_id']): user for user in authorized_users}
-        calendar_view_only_users_dict = {str(user['_id']): user for user in view_only_users}
 
-        for calendar in calendars:
-            authorized_user_ids = calendar.get('authorized_users', [])
-            view_only_user_ids = calendar.get('view_only_users', [])
-            pending_user_ids = [str(pending_user.get('_id')) for pending_user in calendar.get('pending_users', [])]
+    @staticmethod
+    def build_owned_documents_query(calendar_ids: list[str], legacy_owners: dict):
+        query = {'calendar_id': {'$in': calendar_ids}}
+
+        if len(legacy_owners) == 0:
+            return query
 
-            pending_users = await request.app.db['users'].find({
-                '_id': {'$in': pending_user_ids}},
-                projection=user_projection
-            ).to_list(None)
+        # documents listed in a legacy array only count when nothing else claims them through calendar_id
+        return {'$or': [
+            query,
+            {'_id': {'$in': list(legacy_owners)}, 'calendar_id': {'$in': [None, '']}},
+        ]}
 
+
+    @staticmethod
+    def claim_legacy_documents(documents, legacy_owners: dict):
+        for document in documents:
+            if not document.get('calendar_id'):
+                document['calendar_id'] = legacy_owners.get(document['_id'])
+
+        return documents
+
+
+    @staticmethod
+    async def load_users(request: Request, user_ids):
+        # concurrent populates in the same request share one users query and never fetch a member twice
+        users = await get_loaders(request).users.load_many(list(user_ids))
+        return [user for user in users if user is not None]
+
+
+    @staticmethod
+    def group_documents_by_calendar(documents):
+        grouped_documents = {}
+        for document in documents:
+            grouped_documents.setdefault(document['calendar_id'], []).append(document)
+        return grouped_documents
+
+
+    @staticmethod
+    def attach_retrieved_calendar_fields_to_calendar(calendars, users, calendar_notes, events):
+        users_dict = {str(user['_id']): user for user in users}
+        calendar_notes_by_calendar = CalendarDataHelper.group_documents_by_calendar(calendar_notes)
+        events_by_calendar = CalendarDataHelper.group_documents_by_calendar(events)
+
+        for calendar in calendars:
             pending_users_with_type = []
-            for pending_user in calendar.get('pending_users'):
-                matching_user = next((user for user in pending_users if user['_id'] == pending_user['_id']), None)
+            for pending_user in calendar.get('pending_users', []):
+                matching_user = users_dict.get(str(pending_user.get('_id')))
                 if matching_user:
-                    combined_data = {
+                    pending_users_with_type.append({
                         'type': pending_user.get('type'),
-                        'user': matching_user  # Add the populated user instance
-                    }
-                    pending_users_with_type.append(combined_data)
-                else:
-                    continue
+                        'user': matching_user,  # Add the populated user instance
+                    })
 
             calendar['authorized_users'] = [
-                calendar_authorized_users_dict.get(str(user_id)) for user_id in authorized_user_ids
+                users_dict.get(str(user_id)) for user_id in calendar.get('authorized_users', [])
             ]
             calendar['pending_users'] = pending_users_with_type
             calendar['view_only_users'] = [
-                calendar_view_only_users_dict.get(str(user_id)) for user_id in view_only_user_ids
+                users_dict.get(str(user_id)) for user_id in calendar.get('view_only_users', [])
             ]
-            calendar['calendar_notes'] = [calendar_note for calendar_note in calendar_notes if calendar_note['calendar_id'] == calendar['_id']]
-            calendar['events'] = [event for event in events if event['calendar_id'] == calendar['_id']]
+            calendar['calendar_notes'] = calendar_notes_by_calendar.get(calendar['_id'], [])
+            calendar['events'] = events_by_calendar.get(calendar['_id'], [])
 
         return calendars
 
 
     @staticmethod
-    async def populate_individual_calendars(request: Request, calendar_ids: list[str]):
+    async def populate_individual_calendars(request: Request, calendar_ids: list[str], date_window: Optional[dict] = None):
         try:
             if len(calendar_ids) == 0: return []
 
-            calendars = await CalendarDataHelper.get_calendars(request, calendar_ids)
-            authorized_users, view_only_users, calendar_notes, events = await CalendarDataHelper.gather_calendar_field_data(request, calendars)
-            updated_calendars = await CalendarDataHelper.attach_retrieved_calendar_fields_to_calendar(request, calendars, authorized_users, view_only_users, calendar_notes, events)
+            # windowed calendars are partial, only full calendars are read from or written to the cache
+            cached_calendars = {}
+            if date_window is None:
+                for calendar_id in calendar_ids:
+                    cached_calendar = CalendarDataHelper.get_cached_calendar(calendar_id)
+                    if cached_calendar is not None:
+                        cached_calendars[calendar_id] = cached_calendar
+
+            uncached_calendar_ids = [calendar_id for calendar_id in calendar_ids if calendar_id not in cached_calendars]
+
+            if len(uncached_calendar_ids) == 0:
+                return [cached_calendars[calendar_id] for calendar_id in calendar_ids]
 
-            return updated_calendars
+            calendar_writes = CalendarDataHelper.calendar_writes
+            calendars = await CalendarDataHelper.get_calendars(request, uncached_calendar_ids)
+            users, calendar_notes, events = await CalendarDataHelper.gather_calendar_field_data(request, calendars, date_window)
+            updated_calendars = CalendarDataHelper.attach_retrieved_calendar_fields_to_calendar(calendars, users, calendar_notes, events)
+
+            if date_window is not None:
+                for calendar in updated_calendars:
+                    calendar['events'] = RecurrenceHelper.expand_events(calendar['events'], date_window)
+                return updated_calendars
+
+            for calendar in updated_calendars:
+                if calendar_writes == CalendarDataHelper.calendar_writes:
+                    CalendarDataHelper.cache_populated_calendar(calendar)
+                cached_calendars[calendar['_id']] = calendar
+
+            return [cached_calendars[calendar_id] for calendar_id in calendar_ids if calendar_id in cached_calendars]
         except Exception as e:
             logger.error(f"Error populating calendars: {e}")
             return JSONResponse(content={'detail': 'Error populating calendars'}, status_code=500)
         
     
+    @staticmethod
+    def get_accessible_calendar_ids(user):
+        calendar_ids = list(user.get('calendars', [])) + list(user.get('pending_calendars', []))
+        if user.get('personal_calendar'):
+            calendar_ids.append(user['personal_calendar'])
+        return calendar_ids
+
+
+    @staticmethod
+    async def find_calendar_changes(request: Request, calendar_cursors: dict):
+        if len(calendar_cursors) == 0:
+            return []
+
+        return await request.app.db['calendar_changes'].find(
+            {'$or': [
+                {'calendar_id': calendar_id, 'version': {'$gt': version}}
+                for calendar_id, version in calendar_cursors.items()
+            ]},
+            projection={'_id': 0},
+        ).sort([('calendar_id', 1), ('version', 1)]).to_list(None)
+
+
+    @staticmethod
+    def collapse_calendar_changes(changes):
+        # only the latest operation on each entity matters to a client catching up
+        collapsed_changes = {}
+        for change in changes:
+            collapsed_changes[(change['entity_type'], change['entity_id'])] = change
+        return list(collapsed_changes.values())
+
+
+    @staticmethod
+    async def populate_calendar_memberships(request: Request, calendar_ids: list[str]):
+        if len(calendar_ids) == 0:
+            return []
+
+        calendars = await request.app.db['calendars'].find(
+            {'_id': {'$in': calendar_ids}},
+            projection={'events': 0, 'calendar_notes': 0},
+        ).to_list(None)
+
+        user_ids = set()
+        for calendar in calendars:
+            user_ids.update(calendar.get('authorized_users', []))
+            user_ids.update(calendar.get('view_only_users', []))
+            user_ids.update(str(pending_user.get('_id')) for pending_user in calendar.get('pending_users', []))
+
+        users = await CalendarDataHelper.load_users(request, user_ids)
+
+        populated_calendars = CalendarDataHelper.attach_retrieved_calendar_fields_to_calendar(calendars, users, [], [])
+
+        for calendar in populated_calendars:
+            del calendar['events']
+            del calendar['calendar_notes']
+
+        return populated_calendars
+
+
+    @staticmethod
+    async def build_calendar_sync(request: Request, calendar_ids: list[str], client_versions: dict):
+        calendars = await request.app.db['calendars'].find(
+            {'_id': {'$in': calendar_ids}},
+            projection={'version': 1},
+        ).to_list(None)
+        current_versions = {calendar['_id']: calendar.get('version', 0) for calendar in calendars}
+
+        removed_calendar_ids = [calendar_id for calendar_id in client_versions if calendar_id not in current_versions]
+        full_resync_ids = []
+        calendar_cursors = {}
+
+        for calendar_id, current_version in current_versions.items():
+            client_version = client_versions.get(calendar_id)
+
+            if not isinstance(client_version, int) or client_version < 0 or client_version > current_version:
+                full_resync_ids.append(calendar_id)
+            elif client_version < current_version:
+                calendar_cursors[calendar_id] = client_version
+
+        changes = await CalendarDataHelper.find_calendar_changes(request, calendar_cursors)
+        changes_by_calendar = CalendarDataHelper.group_documents_by_calendar(changes)
+
+        delta_changes = {}
+        for calendar_id, client_version in calendar_cursors.items():
+            current_version = current_versions[calendar_id]
+            # anything recorded after the versions were read is picked up on the next sync
+            calendar_changes = [
+                change for change in changes_by_calendar.get(calendar_id, [])
+                if change['version'] <= current_version
+            ]
+
+            # every version up to the one we report has to be there, a hole anywhere means entries
+            # expired, were never recorded, or are still being written, and only a full resync is safe
+            if [change['version'] for change in calendar_changes] != list(range(client_version + 1, current_version + 1)):
+                full_resync_ids.append(calendar_id)
+            else:
+                delta_changes[calendar_id] = CalendarDataHelper.collapse_calendar_changes(calendar_changes)
+
+        upserted_ids = {'event': set(), 'note': set()}
+        membership_calendar_ids = set()
+        for calendar_id, calendar_changes in delta_changes.items():
+            for change in calendar_changes:
+                if change['entity_type'] == 'membership':
+                    membership_calendar_ids.add(calendar_id)
+                elif change['operation'] == 'upsert':
+                    upserted_ids[change['entity_type']].add(change['entity_id'])
+
+        events, calendar_notes, memberships, full_calendars = await asyncio.gather(
+            request.app.db['events'].find({'_id': {'$in': list(upserted_ids['event'])}}).to_list(None),
+            request.app.db['calendar_notes'].find({'_id': {'$in': list(upserted_ids['note'])}}).to_list(None),
+            CalendarDataHelper.populate_calendar_memberships(request, list(membership_calendar_ids)),
+            CalendarDataHelper.populate_individual_calendars(request, full_resync_ids),
+        )
+
+        if isinstance(full_calendars, JSONResponse):
+            return full_calendars
+
+        events_by_id = {event['_id']: event for event in events}
+        calendar_notes_by_id = {calendar_note['_id']: calendar_note for calendar_note in calendar_notes}
+        memberships_by_id = {membership['_id']: membership for membership in memberships}
+
+        calendar_deltas = []
+        for calendar_id, calendar_changes in delta_changes.items():
+            calendar_delta = {
+                'calendar_id': calendar_id,
+                'version': current_versions[calendar_id],
+                'events': [],
+                'deleted_event_ids': [],
+                'calendar_notes': [],
+                'deleted_calendar_note_ids': [],
+                'membership': memberships_by_id.get(calendar_id),
+            }
+
+            for change in calendar_changes:
+                if change['entity_type'] == 'event':
+                    documents, upserted_key, deleted_key = events_by_id, 'events', 'deleted_event_ids'
+                elif change['entity_type'] == 'note':
+                    documents, upserted_key, deleted_key = calendar_notes_by_id, 'calendar_notes', 'deleted_calendar_note_ids'
+                else:
+                    continue
+
+                # documents that vanished or moved to another calendar are sent as tombstones
+                document = documents.get(change['entity_id'])
+                if change['operation'] == 'upsert' and document is not None and document['calendar_id'] == calendar_id:
+                    calendar_delta[upserted_key].append(document)
+                else:
+                    calendar_delta[deleted_key].append(change['entity_id'])
+
+            calendar_deltas.append(calendar_delta)
+
+        return {
+            'calendars': calendar_deltas,
+            'full_calendars': full_calendars,
+            'removed_calendar_ids': removed_calendar_ids,
+        }
+
+
+    @staticmethod
+    def parse_date_window_bound(value: str):
+        # events and notes store dates as '%Y-%m-%d %H:%M:%S' strings, which sort lexicographically
+        parsed_date = datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+        return parsed_date.strftime('%Y-%m-%d %H:%M:%S')
+
+
+    @staticmethod
+    def build_date_window(start: Optional[str], end: Optional[str]):
+        if not start and not end:
+            return None
+
+        # every windowed read expands repeating events, and an open-ended series has no last occurrence to stop at
+        if not start or not end:
+            return JSONResponse(content={'detail': 'start and end must be given together'}, status_code=422)
+
+        try:
+            date_window = {
+                'start': CalendarDataHelper.parse_date_window_bound(start),
+                'end': CalendarDataHelper.parse_date_window_bound(end),
+            }
+        except ValueError:
+            return JSONResponse(content={'detail': 'start and end must be ISO formatted dates'}, status_code=422)
+
+        if date_window['start'] >= date_window['end']:
+            return JSONResponse(content={'detail': 'start must be before end'}, status_code=422)
+
+        return date_window
+
+
+    @staticmethod
+    def build_events_window_query(calendar_ids: list[str], date_window: dict):
+        return {
+            'calendar_id': {'$in': calendar_ids},
+            '$or': [
+                {'event_date': {'$gte': date_window['start'], '$lt': date_window['end']}},
+                # repeating events that started before the window can still occur inside of it
+                {'repeats': True, 'event_date': {'$lt': date_window['end']}},
+            ],
+        }
+
+
+    @staticmethod
+    def build_calendar_notes_window_query(calendar_ids: list[str], date_window: dict):
+        return {
+            'calendar_id': {'$in': calendar_ids},
+            'start_date': {'$lt': date_window['end']},
+            'end_date': {'$gte': date_window['start']},
+        }
+
+
+    @staticmethod
+    async def create_calendar_indexes(db):
+        await asyncio.gather(
+            db['events'].create_index(
+                [('calendar_id', 1), ('event_date', 1)],
+                name='calendar_id_event_date',
+            ),
+            db['events'].create_index(
+                [('calendar_id', 1), ('event_date', 1)],
+                name='calendar_id_repeating_event_date',
+                partialFilterExpression={'repeats': True},
+            ),
+            db['calendar_notes'].create_index(
+                [('calendar_id', 1), ('start_date', 1), ('end_date', 1)],
+                name='calendar_id_start_date_end_date',
+            ),
+            db['calendar_changes'].create_index(
+                [('calendar_id', 1), ('version', 1)],
+                name='calendar_id_version',
+                unique=True,
+            ),
+            # clients with a cursor older than the retained history are sent a full resync
+            db['calendar_changes'].create_index(
+                'changed_on',
+                name='changed_on_ttl',
+                expireAfterSeconds=CalendarDataHelper.calendar_change_retention_seconds,
+            ),
+        )
+
+
     @staticmethod
     def create_calendar_instance(request_body):
         pending_users = CalendarDataHelper.create_pending_user_instances(
@@ -146,91 +585,227 @@ class CalendarDataHelper:
     
 
     @staticmethod
-    async def upload_new_calendar(request: Request, new_calendar: Calendar, pending_users, user_id: str):
+    async def upload_new_calendar(request: Request, new_calendar: Calendar, pending_users):
         try:
-            calendar_upload = await CalendarDataHelper.upload_calendar_to_db(request, new_calendar)
-            calendar_id = str(calendar_upload.inserted_id)
-            uploaded_calendar = await CalendarDataHelper.get_uploaded_calendar(request, calendar_id)
-            updated_user_who_created_calendar = await CalendarDataHelper.update_user_calendars(request, user_id, calendar_id)
+            uploaded_calendar = jsonable_encoder(new_calendar)
+            calendar_upload = await CalendarDataHelper.upload_calendar_to_db(request, uploaded_calendar)
 
-            if calendar_upload is None or uploaded_calendar is None or updated_user_who_created_calendar is None:
+            if calendar_upload is None or isinstance(calendar_upload, JSONResponse):
                 return {
                     'detail': 'Failed to save, retrieve, and update calendar to user'
                 }
+            
+            calendar_id = str(calendar_upload.inserted_id)
 
-            successful_users_updated, unsuccessful_users_updated = await CalendarDataHelper.update_pending_users(request, pending_users, calendar_id)
+            # the creator and every invitee become calendar members, which is all a user's calendar list is read from
+            saved_members, (_, missing_users), populated_calendar = await asyncio.gather(
+                CalendarMemberHelper.upsert_members(request, CalendarMemberHelper.build_calendar_members(uploaded_calendar)),
+                CalendarDataHelper.count_invited_users(request, pending_users),
+                CalendarDataHelper.populate_one_calendar(request, calendar_id),
+            )
+
+            if saved_members is None:
+                return {
+                    'detail': 'Failed to save, retrieve, and update calendar to user'
+                }
 
-            if unsuccessful_users_updated > 0:
+            if missing_users > 0:
                 return {
                     'calendar': uploaded_calendar,
                     'detail': 'Calendar created, all users were not invited successfully, please check the users and try again.',
                 }
             
-            if successful_users_updated == len(pending_users) or (successful_users_updated == 0 and unsuccessful_users_updated == 0):
-                populated_calendar = await CalendarDataHelper.populate_one_calendar(request, calendar_id)
-                if populated_calendar is None:
-                    return {'detail': 'Calendar was not able to be populated'}
-                
-                return {
-                  'detail': 'Calendar created and all necessary users added',
-                  'calendar': populated_calendar,   
-                }
+            if populated_calendar is None:
+                return {'detail': 'Calendar was not able to be populated'}
             
-            return {'detail': 'Something went wrong'}
+            return {
+              'detail': 'Calendar created and all necessary users added',
+              'calendar': populated_calendar,   
+            }
 
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
 
     
     @staticmethod
-    async def upload_calendar_to_db(request: Request, new_calendar: Calendar):
+    async def upload_calendar_to_db(request: Request, new_calendar: dict):
         try:
-            calendar_upload = await request.app.db['calendars'].insert_one(jsonable_encoder(new_calendar))
+            calendar_upload = await request.app.db['calendars'].insert_one(new_calendar)
             return calendar_upload
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
 
 
     @staticmethod
-    async def get_uploaded_calendar(request: Request, calendar_id: str):
+    async def count_invited_users(request: Request, pending_users):
+        pending_user_ids = list({str(user.user_id) for user in pending_users})
+
+        if len(pending_user_ids) == 0:
+            return 0, 0
+
+        # invites are memberships, so the users collection is only asked whether every invitee exists
         try:
-            uploaded_calendar = await request.app.db['calendars'].find_one({'_id': calendar_id})
-            return uploaded_calendar
+            found_users = await request.app.db['users'].count_documents({'_id': {'$in': pending_user_ids}})
         except Exception as e:
-            return CalendarDataHelper.handle_server_error(e)
+            logger.error(f"Error checking invited users: {e}")
+            found_users = 0
 
+        return found_users, len(pending_user_ids) - found_users
+    
 
     @staticmethod
-    async def update_user_calendars(request: Request, user_id: str, calendar_id: str):
-        try:
-            updated_user = await request.app.db['users'].update_one(
-            {'_id': str(user_id)}, {'$push': {'calendars': calendar_id}})
-            return updated_user
-        except Exception as e:
-            return CalendarDataHelper.handle_server_error(e)
+    def set_populate_engine(engine: str):
+        if engine not in CalendarDataHelper.populate_engines:
+            raise ValueError(f"Unknown calendar populate engine: {engine}")
+        CalendarDataHelper.populate_engine = engine
 
 
     @staticmethod
-    async def update_pending_users(request: Request, pending_users, calendar_id: str):
-        successful_users_updated = 0
-        unsuccessful_users_updated = 0
+    async def populate_one_calendar(request: Request, calendar_id: str, date_window: Optional[dict] = None):
+        if date_window is None:
+            cached_calendar = CalendarDataHelper.get_cached_calendar(calendar_id)
+            if cached_calendar is not None:
+                return cached_calendar
 
-        for user in pending_users:
-            update_user = await request.app.db['users'].find_one_and_update(
-                {"_id": user.user_id}, {"$push": {"pending_calendars": calendar_id}}
-            )
+        calendar_writes = CalendarDataHelper.calendar_writes
 
-            if update_user is not None:
-                successful_users_updated += 1
-            else:
-                unsuccessful_users_updated += 1
+        # engine is selected at startup, but can be swapped at runtime with set_populate_engine
+        if CalendarDataHelper.populate_engine == 'find':
+            calendar = await CalendarDataHelper.populate_one_calendar_with_finds(request, calendar_id, date_window)
+        else:
+            calendar = await CalendarDataHelper.populate_one_calendar_with_aggregation(request, calendar_id, date_window)
+
+        if calendar is not None and date_window is None and calendar_writes == CalendarDataHelper.calendar_writes:
+            CalendarDataHelper.cache_populated_calendar(calendar)
+
+        if calendar is not None and date_window is not None:
+            calendar['events'] = RecurrenceHelper.expand_events(calendar['events'], date_window)
+
+        return calendar
 
-        return successful_users_updated, unsuccessful_users_updated
-    
 
     @staticmethod
-    async def populate_one_calendar(request: Request, calendar_id: str):
-            
+    def build_populate_calendar_pipeline(calendar_id: str, date_window: Optional[dict] = None):
+        user_projection = UserProjection.user_projection
+
+        if date_window is not None:
+            calendar_notes_lookup = {
+                'from': 'calendar_notes',
+                'localField': '_id',
+                'foreignField': 'calendar_id',
+                'pipeline': [{'$match': CalendarDataHelper.build_calendar_notes_window_query([calendar_id], date_window)}],
+                'as': 'calendar_notes',
+            }
+            events_lookup = {
+                'from': 'events',
+                'localField': '_id',
+                'foreignField': 'calendar_id',
+                'pipeline': [{'$match': CalendarDataHelper.build_events_window_query([calendar_id], date_window)}],
+                'as': 'events',
+            }
+            legacy_lookups = []
+        else:
+            calendar_notes_lookup = {
+                'from': 'calendar_notes',
+                'localField': '_id',
+                'foreignField': 'calendar_id',
+                'as': 'calendar_notes',
+            }
+            events_lookup = {
+                'from': 'events',
+                'localField': '_id',
+                'foreignField': 'calendar_id',
+                'as': 'events',
+            }
+            # unmigrated calendars still list documents that have no calendar_id yet, a missing array matches nothing
+            legacy_lookups = [
+                {'$lookup': {
+                    'from': 'calendar_notes',
+                    'localField': 'calendar_notes',
+                    'foreignField': '_id',
+                    'pipeline': [{'$match': {'calendar_id': {'$in': [None, '']}}}],
+                    'as': 'legacy_calendar_notes',
+                }},
+                {'$lookup': {
+                    'from': 'events',
+                    'localField': 'events',
+                    'foreignField': '_id',
+                    'pipeline': [{'$match': {'calendar_id': {'$in': [None, '']}}}],
+                    'as': 'legacy_events',
+                }},
+            ]
+
+        return [
+            {'$match': {'_id': calendar_id}},
+            *legacy_lookups,
+            {'$lookup': {
+                'from': 'users',
+                'localField': 'authorized_users',
+                'foreignField': '_id',
+                'pipeline': [{'$project': user_projection}],
+                'as': 'authorized_users',
+            }},
+            {'$lookup': {
+                'from': 'users',
+                'localField': 'view_only_users',
+                'foreignField': '_id',
+                'pipeline': [{'$project': user_projection}],
+                'as': 'view_only_users',
+            }},
+            # pending users are nested with their type, keep the originals and stitch them back after the lookup
+            {'$lookup': {
+                'from': 'users',
+                'localField': 'pending_users._id',
+                'foreignField': '_id',
+                'pipeline': [{'$project': user_projection}],
+                'as': 'populated_pending_users',
+            }},
+            {'$lookup': calendar_notes_lookup},
+            {'$lookup': events_lookup},
+        ]
+
+
+    @staticmethod
+    async def populate_one_calendar_with_aggregation(request: Request, calendar_id: str, date_window: Optional[dict] = None):
+        pipeline = CalendarDataHelper.build_populate_calendar_pipeline(calendar_id, date_window)
+        calendars = await request.app.db['calendars'].aggregate(pipeline).to_list(1)
+
+        if not calendars:
+            return None
+
+        calendar = calendars[0]
+        populated_pending_users = {
+            user['_id']: user for user in calendar.pop('populated_pending_users', [])
+        }
+
+        # keep the same { type, user } shape the find engine returns
+        pending_users_with_type = []
+        for pending_user in calendar.get('pending_users', []):
+            matching_user = populated_pending_users.get(pending_user.get('_id'))
+            if matching_user:
+                pending_users_with_type.append({
+                    'type': pending_user.get('type'),
+                    'user': matching_user,
+                })
+
+        calendar['pending_users'] = pending_users_with_type
+
+        legacy_calendar_notes = calendar.pop('legacy_calendar_notes', [])
+        legacy_events = calendar.pop('legacy_events', [])
+        # a calendar with nothing owned through calendar_id may come back without the lookup fields at all
+        calendar.setdefault('calendar_notes', []).extend(
+            CalendarDataHelper.claim_legacy_documents(legacy_calendar_notes, {note['_id']: calendar_id for note in legacy_calendar_notes})
+        )
+        calendar.setdefault('events', []).extend(
+            CalendarDataHelper.claim_legacy_documents(legacy_events, {event['_id']: calendar_id for event in legacy_events})
+        )
+
+        return calendar
+
+
+    @staticmethod
+    async def populate_one_calendar_with_finds(request: Request, calendar_id: str, date_window: Optional[dict] = None):
+
         calendar = await request.app.db['calendars'].find_one({'_id': calendar_id})
         
         if calendar is None:
@@ -240,8 +815,8 @@ class CalendarDataHelper:
         authorized_user_ids = list(calendar.get('authorized_users', []))
         view_only_user_ids = list(calendar.get('view_only_users', []))
         pending_user_ids = [] # pending users are nested, need to loop through and retrieve id below
-        calendar_note_ids = list(calendar.get('calendar_notes', []))
-        event_ids = list(calendar.get('events', []))
+        legacy_note_owners = CalendarDataHelper.get_legacy_document_owners([calendar], 'calendar_notes')
+        legacy_event_owners = CalendarDataHelper.get_legacy_document_owners([calendar], 'events')
 
         # pending users are nested, loop through to retrieve and store
         for pending_user in calendar.get('pending_users', []):
@@ -249,28 +824,22 @@ class CalendarDataHelper:
             if user_id:
                 pending_user_ids.append(user_id)
         
-        # entire user object should not be pulled, just grab these fields
-        user_projection = UserProjection.user_projection
-
-        # loop through and query ALL users for the following 3 lists
-        authorized_users = await request.app.db['users'].find({
-            '_id': {'$in': authorized_user_ids}},
-            projection=user_projection
-        ).to_list(None)
-        view_only_users = await request.app.db['users'].find({
-            '_id': {'$in': view_only_user_ids}},
-            projection=user_projection
+        # the 3 user lists are loaded together, so they go out as a single users query
+        authorized_users, view_only_users, pending_users = await asyncio.gather(
+            CalendarDataHelper.load_users(request, authorized_user_ids),
+            CalendarDataHelper.load_users(request, view_only_user_ids),
+            CalendarDataHelper.load_users(request, pending_user_ids),
+        )
+        calendar_notes = await request.app.db['calendar_notes'].find(
+            CalendarDataHelper.build_calendar_notes_window_query([calendar_id], date_window)
+            if date_window is not None
+            else CalendarDataHelper.build_owned_documents_query([calendar_id], legacy_note_owners)
         ).to_list(None)
-        pending_users = await request.app.db['users'].find({
-            '_id': {'$in': pending_user_ids}},
-            projection=user_projection
+        events = await request.app.db['events'].find(
+            CalendarDataHelper.build_events_window_query([calendar_id], date_window)
+            if date_window is not None
+            else CalendarDataHelper.build_owned_documents_query([calendar_id], legacy_event_owners)
         ).to_list(None)
-        calendar_notes = await request.app.db['calendar_notes'].find({
-            '_id': {'$in': calendar_note_ids}
-        }).to_list(None)
-        events = await request.app.db['events'].find({
-            '_id': {'$in': event_ids}
-        }).to_list(None)
 
         # if any list fails return early as None as an error
         if authorized_users is None or view_only_users is None or pending_users is None or calendar_notes is None or events is None:
@@ -291,8 +860,8 @@ class CalendarDataHelper:
         calendar['authorized_users'] = authorized_users
         calendar['view_only_users'] = view_only_users
         calendar['pending_users'] = pending_users_with_type
-        calendar['calendar_notes'] = calendar_notes
-        calendar['events'] = events
+        calendar['calendar_notes'] = CalendarDataHelper.claim_legacy_documents(calendar_notes, legacy_note_owners)
+        calendar['events'] = CalendarDataHelper.claim_legacy_documents(events, legacy_event_owners)
         
         return calendar
     
@@ -304,49 +873,36 @@ class CalendarDataHelper:
         calendar_id: str
     ):
         try:
-            user = await request.app.db['users'].find_one({'email': user_email})
-            calendar = await request.app.db['calendars'].find_one({'_id': calendar_id})
+            user = await load_principal(request, user_email)
+            # membership is checked against calendar_members, the calendar itself is only needed for its creator
+            calendar = await request.app.db['calendars'].find_one({'_id': calendar_id}, projection={'created_by': 1})
             return user, calendar
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
     
 
     @staticmethod
-    def has_calendar_permissions(user, calendar):
-        return user is not None and (calendar['created_by'] == user['_id'] or user['_id'] in calendar['authorized_users'])
+    async def has_calendar_permissions(request: Request, user, calendar):
+        if user is None:
+            return False
+
+        if calendar['created_by'] == user['_id']:
+            return True
+
+        member = await CalendarMemberHelper.find_member(request, calendar['_id'], user['_id'])
+        return CalendarMemberHelper.is_authorized(member)
    
     
     @staticmethod
-    def filter_out_user_from_calendar_list(
-        user_id: str, 
-        calendar, 
-        user_type: str
-    ):
+    def build_user_removal_update(user_id: str, user_type: str):
         if user_type == 'authorized':
-            calendar['authorized_users'].remove(user_id)
+            return {'authorized_users': user_id}
         elif user_type == 'pending':
-            updated_pending_users = [user for user in calendar['pending_users'] if user['_id'] != user_id] # users are nested in pending list, need to loop through to modify
-            calendar['pending_users'] = updated_pending_users
+            return {'pending_users': {'_id': user_id}} # users are nested in pending list, pull by their id
         elif user_type == 'view_only':
-            calendar['view_only_users'].remove(user_id)
+            return {'view_only_users': user_id}
         else:
             return None # invalid type
-        return calendar
-    
-
-    @staticmethod
-    async def replace_one_calendar(
-        request: Request, 
-        calendar_id: str, 
-        updated_calendar: dict
-    ):
-        try:
-            return await request.app.db['calendars'].replace_one(
-                {'_id': calendar_id},
-                updated_calendar
-            )
-        except Exception as e:
-            return CalendarDataHelper.handle_server_error(e)
     
 
     @staticmethod
@@ -386,15 +942,21 @@ class CalendarDataHelper:
         projection: Optional[dict] = None
     ):
         try:
-            user = await request.app.db['users'].find_one(
-                {'email': user_email},
-                projection
-            )
+            # the caller's own slim fields come from the request's principal instead of another read
+            if projection is not None and all(field in principal_projection for field in projection):
+                user = await load_principal(request, user_email)
+            else:
+                user = await request.app.db['users'].find_one(
+                    {'email': user_email},
+                    projection
+                )
 
             if user is None:
                 return JSONResponse(content={
                     'detail': 'User not found'}, status_code=404
                 )
+            
+            return user
 
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -407,16 +969,34 @@ class CalendarDataHelper:
         converted_user: dict
     ):
         try:
-            return await request.app.db['calendars'].update_one(
+            updated_calendar = await request.app.db['calendars'].update_one(
                 {'_id': calendar_id},
                 {'$push': {'pending_users': converted_user}}
             )
+
+            await CalendarMemberHelper.set_member(
+                request,
+                calendar_id,
+                converted_user.get('_id'),
+                converted_user.get('type'),
+                pending=True,
+            )
+
+            await CalendarDataHelper.record_calendar_change(
+                request, 
+                calendar_id, 
+                'membership', 
+                converted_user.get('_id'), 
+                'upsert',
+            )
+
+            return updated_calendar
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
     
 
     @staticmethod
-    async def create_calendar_note(
+    async def upload_calendar_note(
         request: Request, 
         calendar_note: CalendarNote
     ):
@@ -430,6 +1010,8 @@ class CalendarDataHelper:
                     'detail': 'Failed to upload new note'}, status_code=422
                 )
             
+            return uploaded_note
+            
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
     
@@ -442,48 +1024,25 @@ class CalendarDataHelper:
             return CalendarDataHelper.handle_server_error(e)
     
 
-    @staticmethod
-    async def add_calendar_note_to_calendar(
-        request: Request, 
-        calendar_id: str, 
-        note_id: str
-    ):
-        try:
-            return await request.app.db['calendars'].update_one(
-                {'_id': calendar_id},
-                {'$push': {'calendar_notes': note_id}}
-            )
-        except Exception as e:  
-            return CalendarDataHelper.handle_server_error(e)
-    
-
-    @staticmethod
-    async def remove_calendar_from_user(
-        request: Request,
-        user_id: str,
-        calendar_id: str,
-    ):
-        try:
-            return await request.app.db['users'].update_one(
-                {'_id': user_id},
-                {'$pull': {'calendars': calendar_id}}
-            )
-        except Exception as e:
-            return CalendarDataHelper.handle_server_error(e)
-        
-
     @staticmethod
     async def remove_user_from_calendar(
         request: Request,
         user_id: str,
         calendar_id: str,
-        calendar_type: str
+        user_removal: dict,
     ):
         try:
-            return await request.app.db['calendars'].update_one(
+            updated_calendar = await request.app.db['calendars'].update_one(
                 {'_id': calendar_id},
-                {'$pull': {calendar_type: user_id}}
+                {'$pull': user_removal}
             )
+
+            await asyncio.gather(
+                CalendarMemberHelper.remove_member(request, calendar_id, user_id),
+                CalendarDataHelper.record_calendar_change(request, calendar_id, 'membership', user_id, 'delete'),
+            )
+
+            return updated_calendar
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
         
@@ -491,23 +1050,22 @@ class CalendarDataHelper:
     @staticmethod
     async def remove_all_calendar_events(
         request: Request, 
-        calendar_events: list[str]
+        calendar: dict,
     ):
-        removal_amount = len(calendar_events)
+        owned_events_query = CalendarDataHelper.build_owned_documents_query(
+            [calendar['_id']],
+            CalendarDataHelper.get_legacy_document_owners([calendar], 'events'),
+        )
 
         try:
-            event_removal_status = await request.app.db['events'].delete_many({
-                '_id': {'$in': calendar_events}}
-            )
+            event_removal_status = await request.app.db['events'].delete_many(owned_events_query)
 
-            actual_removal_amount = event_removal_status.deleted_count
-
-            if actual_removal_amount != removal_amount:
-                CalendarDataHelper.log_event_removal_status(
-                    removal_amount - actual_removal_amount
-                )
+            # anything the query still matches was not removed
+            CalendarDataHelper.log_event_removal_status(
+                await request.app.db['events'].count_documents(owned_events_query)
+            )
 
-            return
+            return event_removal_status.deleted_count
 
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -516,23 +1074,21 @@ class CalendarDataHelper:
     @staticmethod
     async def remove_all_calendar_notes(
         request: Request,
-        calendar_notes: list[str],
+        calendar: dict,
     ):
-        removal_amount = len(calendar_notes)
+        owned_notes_query = CalendarDataHelper.build_owned_documents_query(
+            [calendar['_id']],
+            CalendarDataHelper.get_legacy_document_owners([calendar], 'calendar_notes'),
+        )
 
         try:
-            note_removal_status = await request.app.db['calendar_notes'].delete_many({
-                '_id': {'$in': calendar_notes}}
-            )
-
-            actual_removal_amount = note_removal_status.deleted_count
+            note_removal_status = await request.app.db['calendar_notes'].delete_many(owned_notes_query)
 
-            if actual_removal_amount != removal_amount:
-                CalendarDataHelper.log_note_removal_status(
-                    removal_amount - actual_removal_amount
-                )
+            CalendarDataHelper.log_note_removal_status(
+                await request.app.db['calendar_notes'].count_documents(owned_notes_query)
+            )
 
-            return
+            return note_removal_status.deleted_count
 
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -552,6 +1108,8 @@ class CalendarDataHelper:
                 return JSONResponse(content={
                     'detail': 'Note not found'}, status_code=404
                 )
+            
+            return note
 
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -573,6 +1131,14 @@ class CalendarDataHelper:
                 return JSONResponse(content={
                     'detail': 'Failed to update note'}, status_code=422
                 )
+            
+            return await CalendarDataHelper.record_calendar_change(
+                request, 
+                note.calendar_id, 
+                'note', 
+                note_id, 
+                'upsert',
+            )
 
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -604,15 +1170,20 @@ class CalendarDataHelper:
         note_id: str,
     ):
         try:
-            removal_status = await request.app.db['calendars'].update_one(
-                {'_id': calendar_id},
-                {'$pull': {'calendar_notes': note_id}}
-            )
+            removal_status = await CalendarDataHelper.pull_legacy_document_id(request, calendar_id, 'calendar_notes', note_id)
 
             if removal_status is None:
                 return JSONResponse(content={
                     'detail': 'Failed to remove note from calendar'}, status_code=422
                 )
+            
+            return await CalendarDataHelper.record_calendar_change(
+                request, 
+                calendar_id, 
+                'note', 
+                note_id, 
+                'delete',
+            )
 
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -633,18 +1204,43 @@ class CalendarDataHelper:
                 return JSONResponse(content={
                     'detail': 'failed to upload event'}, status_code=422
                 )
+            
+            return await CalendarDataHelper.record_calendar_change(
+                request, 
+                calendar_id, 
+                'event', 
+                str(new_event.id), 
+                'upsert',
+            )
+        
+        except Exception as e:
+            return CalendarDataHelper.handle_server_error(e)
+        
 
-            update_calendar = await request.app.db['calendars'].update_one(
-                {'_id': calendar_id},
-                {'$push': {'events': str(new_event.id)}}
+    @staticmethod
+    async def upload_new_events(
+        request: Request, 
+        calendar_id: str, 
+        new_events: list[Event],
+    ):
+        # one insert and one change log write no matter how many events are imported
+        try:
+            upload_events = await request.app.db['events'].insert_many(
+                [jsonable_encoder(new_event) for new_event in new_events]
             )
 
-            if update_calendar is None:
+            if upload_events is None:
                 return JSONResponse(content={
-                    'detail': 'failed to update calendar with new event'}, status_code=422
+                    'detail': 'failed to upload events'}, status_code=422
                 )
             
-            return
+            event_ids = [str(new_event.id) for new_event in new_events]
+            
+            return await CalendarDataHelper.record_calendar_changes(
+                request,
+                calendar_id,
+                [('event', event_id, 'upsert') for event_id in event_ids],
+            )
         
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -672,28 +1268,77 @@ class CalendarDataHelper:
         edited_event: Event, 
         event_id: str,
     ):
-        updated_event = await request.app.db['events'].replace_one(
-            {'_id': event_id},
-            jsonable_encoder(edited_event),
+        # $set rather than a replace so per-occurrence exceptions and edits survive a series edit. calendar_id comes
+        # from the url, so matching on it keeps an edit through another calendar from moving the event into it
+        updated_event = await request.app.db['events'].update_one(
+            {'_id': event_id, 'calendar_id': edited_event.calendar_id},
+            {
+                '$set': jsonable_encoder(edited_event, exclude={'id', 'recurrence_exceptions', 'recurrence_overrides', 'revision'}),
+                '$inc': {'revision': 1},
+            },
         )
 
         if updated_event is None:
             return JSONResponse(content={
                 'detail': 'we could not update that event'}, status_code=422)
         
-        return
+        if updated_event.matched_count == 0:
+            return JSONResponse(content={
+                'detail': 'That event could not be found'}, status_code=404)
+        
+        return await CalendarDataHelper.record_calendar_change(
+            request, 
+            edited_event.calendar_id, 
+            'event', 
+            event_id, 
+            'upsert',
+        )
     
 
+    @staticmethod
+    async def find_one_event(request: Request, calendar_id: str, event_id: str):
+        return await request.app.db['events'].find_one({'_id': event_id, 'calendar_id': calendar_id})
+
+
+    @staticmethod
+    def build_occurrence_override(event, request_body: dict):
+        override = {}
+        first = RecurrenceHelper.parse_event_date(event['event_date'])
+
+        if request_body.get('date'):
+            # a moved occurrence keeps the series' time of day unless a new time is sent with it
+            moved_date = datetime.strptime(request_body['date'], '%Y-%m-%d')
+            override['event_date'] = RecurrenceHelper.format_event_date(datetime.combine(moved_date.date(), first.time()))
+        if request_body.get('eventName') is not None:
+            override['event_name'] = request_body['eventName']
+        if request_body.get('eventDescription') is not None:
+            override['event_description'] = request_body['eventDescription']
+        if request_body.get('selectedTime') is not None:
+            override['event_time'] = request_body['selectedTime']
+
+        return override
+
+
+    @staticmethod
+    async def update_event_occurrences(request: Request, event_id: str, update: dict):
+        return await request.app.db['events'].find_one_and_update(
+            {'_id': event_id},
+            {**update, '$inc': {'revision': 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+
     @staticmethod
     async def remove_event_from_calendar(
         request: Request,
         calendar_id: str,
         event_id: str,
     ):
-        return await request.app.db['calendars'].update_one(
-            {'_id': calendar_id},
-            {'$pull': {'events': event_id}}
-        )
+        removed_event = await CalendarDataHelper.pull_legacy_document_id(request, calendar_id, 'events', event_id)
+
+        CalendarDataHelper.invalidate_cached_calendar(calendar_id)
+
+        return removed_event
     
 
     @staticmethod
@@ -701,9 +1346,11 @@ class CalendarDataHelper:
         request: Request,
         event_id: str,
     ):
-        return await request.app.db['events'].delete_one(
+        deleted_event = await request.app.db['events'].delete_one(
             {'_id': event_id}
         )
+
+        return deleted_event
     
 
     @staticmethod
@@ -713,6 +1360,15 @@ class CalendarDataHelper:
         calendar: Calendar, 
         type_of_user: str, 
     ):
+        if type_of_user not in CalendarMemberHelper.roles:
+            return None
+
+        # a user already on the calendar, pending or not, cannot be invited a second time
+        existing_member = await CalendarMemberHelper.find_member(request, calendar['_id'], user_id)
+
+        if existing_member is not None:
+            return None
+
         new_pending_user = PendingUser(type_of_user, user_id)
 
         if new_pending_user is None:
@@ -733,75 +1389,52 @@ class CalendarDataHelper:
         
 
     @staticmethod
-    def verify_user_is_in_calendar(
-        updated_calendar: Calendar,
+    async def verify_user_is_in_calendar(
+        request: Request,
+        calendar_id: str,
         permission_type: str,
         user_id: str
     ):
-        pending_users = updated_calendar.get('pending_users', [])
-        for pending_user in pending_users:
-            if pending_user['_id'] == user_id and pending_user['type'] == permission_type:
-                return True
-        return False
+        member = await CalendarMemberHelper.find_member(request, calendar_id, user_id)
+        return member is not None and member.get('pending') is True and member.get('role') == permission_type
     
 
     @staticmethod
-    def group_all_user_ids_in_calendar(calendar, user_id):
-        all_user_ids = [user_id]
+    async def delete_one_calendar(request: Request, calendar_id: str):
+        try:
+            return await request.app.db['calendars'].delete_one({'_id': calendar_id})
+        except Exception as e:
+            logger.error(f"Error deleting calendar {calendar_id}: {e}")
+            return None
+        finally:
+            CalendarDataHelper.invalidate_cached_calendar(calendar_id)
 
-        all_user_ids.extend(calendar['authorized_users'])
-        all_user_ids.extend(calendar['view_only_users'])
 
-        for pending_user in calendar['pending_users']:
-            all_user_ids.append(pending_user['_id'])
+    @staticmethod
+    async def remove_all_calendar_members(request: Request, calendar_id: str):
+        # users list their calendars through member edges, any left behind keep the deleted calendar in those lists
+        removed_members = await CalendarMemberHelper.remove_calendar_members(request, calendar_id)
 
-        return all_user_ids
+        if removed_members is None:
+            return JSONResponse(content={
+                'detail': 'failed to remove calendar members'}, status_code=422
+            )
 
+        try:
+            CalendarDataHelper.log_member_removal_status(
+                await request.app.db[CalendarMemberHelper.collection].count_documents({'calendar_id': calendar_id})
+            )
+        except Exception as e:
+            logger.error(f"Error counting members left on deleted calendar {calendar_id}: {e}")
 
-    @staticmethod
-    async def remove_calendar_from_users(
-        request: Request, 
-        all_user_ids: list[str], 
-        calendar_id: str
-    ):
-        errors = 0
-
-        async for user in request.app.db['users'].find({'_id': {'$in': all_user_ids}}):
-            try:
-                if calendar_id in user['calendars']:
-                    await request.app.db['users'].update_one(
-                        {'_id': user['_id']}, 
-                        {'$pull': {'calendars': calendar_id}}
-                    )
-            except Exception as e:
-                logging.error(f"Error updating calendars for user {user['_id']}: {e}")
-                errors += 1
-                continue
-
-            try:
-                if calendar_id in user['pending_calendars']:
-                    await request.app.db['users'].update_one(
-                        {'_id': user['_id']}, 
-                        {'$pull': {'pending_calendars': calendar_id}}
-                    )
-            except Exception as e:
-                logging.error(f"Error updating pending_calendars for user {user['_id']}: {e}")
-                errors += 1
-                continue
-            
-        return errors
-    
+        return removed_members.deleted_count
 
-    @staticmethod
-    async def delete_one_calendar(request: Request, calendar_id: str):
-        return await request.app.db['calendars'].delete_one({'_id': calendar_id})
-    
 
     @staticmethod
-    def log_user_removal_status(users_remove_status: int):
-        if users_remove_status > 0:
-            return logger.warning(f'When attempting to remove calendar from user instances, {users_remove_status}\'s were not removed')
-        
+    def log_member_removal_status(members_remove_status: int):
+        if members_remove_status > 0:
+            return logger.warning(f'When attempting to remove members from a calendar, {members_remove_status} members were not removed')
+
 
     @staticmethod
     def log_event_removal_status(events_remove_status: int):
@@ -813,6 +1446,15 @@ class CalendarDataHelper:
     def log_note_removal_status(notes_remove_status: int):
         if notes_remove_status > 0:
             return logger.warning(f'When attempting to remove notes from a calendar, {notes_remove_status} notes were not removed')
+    
+
+    @staticmethod
+    async def pull_legacy_document_id(request: Request, calendar_id: str, field: str, document_id: str):
+        # only unmigrated calendars still list the id, everything else matches nothing and is left untouched
+        return await request.app.db['calendars'].update_one(
+            {'_id': calendar_id, field: document_id},
+            {'$pull': {field: document_id}}
+        )
 
 
     @staticmethod
@@ -822,26 +1464,17 @@ class CalendarDataHelper:
         calendar_id: str
     ):
         try:
-            user = await CalendarDataHelper.find_one_user_by_email(
-                request, 
-                user_email
-            )
+            user = await load_principal(request, user_email)
 
-            calendar = await CalendarDataHelper.find_one_calendar(
-                request,
-                calendar_id,
-                projection={'authorized_users': 1}
-            )
-
-            if user is None or calendar is None:
+            if user is None:
                 return JSONResponse(content={
                     'detail': 'Failed to verify user or calendar being accessed'}, status_code=404
                 )
 
-            if user['_id'] in calendar['authorized_users']:
-                return True
-            else:
-                return False
+            # a missing calendar has no members, so it fails the same way an unauthorized user does
+            member = await CalendarMemberHelper.find_member(request, calendar_id, user['_id'])
+
+            return CalendarMemberHelper.is_authorized(member)
             
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -878,9 +1511,9 @@ class CalendarDataHelper:
                     'detail': 'The note you posted is not compatible'}, status_code=404
                 )
 
-            upload_note = await CalendarDataHelper.create_calendar_note(request, calendar_note)
+            upload_note = await CalendarDataHelper.upload_calendar_note(request, calendar_note)
 
-            if upload_note is None:
+            if upload_note is None or isinstance(upload_note, JSONResponse):
                 return JSONResponse(content={
                     'detail': 'Failed to upload new note'}, status_code=422
                 )
@@ -908,18 +1541,14 @@ class CalendarDataHelper:
         note_id: str,
     ):
         try:
-            updated_calendar = await CalendarDataHelper.add_calendar_note_to_calendar(
-                request,
-                calendar_id,
-                note_id
+            # the note already points at its calendar through calendar_id, only the version has to move
+            return await CalendarDataHelper.record_calendar_change(
+                request, 
+                calendar_id, 
+                'note', 
+                note_id, 
+                'upsert',
             )
-
-            if updated_calendar is None:
-                return JSONResponse(content={
-                    'detail': 'We could not update that calendar with your note'}, status_code=404
-                )
-            
-            return updated_calendar
         
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -930,28 +1559,22 @@ class CalendarDataHelper:
         request: Request,
         user_id: str, 
         calendar_id: str,
-        authorized_users: list[str], 
-        view_only_users: list[str],
     ):
-        removal_status = None
-
-        if user_id in authorized_users:
-            removal_status = await CalendarDataHelper.remove_user_from_calendar(
-                request,
-                user_id,
-                calendar_id,
-                'authorized_users',
-            )
+        member = await CalendarMemberHelper.find_member(request, calendar_id, user_id)
+        user_removal = CalendarDataHelper.build_user_removal_update(
+            user_id,
+            CalendarMemberHelper.get_member_permissions(member),
+        )
 
-        if user_id in view_only_users:
-            removal_status = await CalendarDataHelper.remove_user_from_calendar(
-                request,
-                user_id,
-                calendar_id,
-                'view_only_users',
-            )
+        if user_removal is None:
+            return None
 
-        return removal_status
+        return await CalendarDataHelper.remove_user_from_calendar(
+            request,
+            user_id,
+            calendar_id,
+            user_removal,
+        )
     
 
     @staticmethod
@@ -997,9 +1620,11 @@ class CalendarDataHelper:
         note: CalendarNote,
     ):
         try:
-            remove_note_from_calendar = await request.app.db['calendars'].update_one(
-                {'_id': note['calendar_id']},
-                {'$pull': {'calendar_notes': note['_id']}}
+            remove_note_from_calendar = await CalendarDataHelper.pull_legacy_document_id(
+                request,
+                note['calendar_id'],
+                'calendar_notes',
+                note['_id'],
             )
 
             if remove_note_from_calendar is None:
@@ -1008,7 +1633,13 @@ class CalendarDataHelper:
                 )
             
             else:
-                return
+                return await CalendarDataHelper.record_calendar_change(
+                    request, 
+                    note['calendar_id'], 
+                    'note', 
+                    note['_id'], 
+                    'delete',
+                )
             
         except Exception as e:
             return CalendarDataHelper.handle_server_error(e)
@@ -1025,7 +1656,6 @@ class CalendarDataHelper:
             removal_status = await CalendarDataHelper.remove_note_from_previous_calendar(
                 request,
                 note,
-                calendar_id,
             )
 
             if isinstance(removal_status, JSONResponse):
@@ -1047,13 +1677,7 @@ class CalendarDataHelper:
     @staticmethod
     async def build_user_reference(request: Request, user_email: str):
         try:
-            user_ref = await request.app.db['users'].find_one(
-                {'email': user_email},
-                projection={
-                    "first_name": 1,
-                    "last_name": 1,
-                }
-            )
+            user_ref = await load_principal(request, user_email)
 
             if user_ref is None:
                 return JSONResponse(content={
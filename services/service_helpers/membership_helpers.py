@@ -0,0 +1,155 @@
+from fastapi import Request
+from pymongo import ReplaceOne, UpdateOne
+from datetime import datetime
+from .calendar_member_helpers import CalendarMemberHelper
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# one document per (user, resource) edge, in place of the id arrays that used to grow on every user document.
+# calendar edges already live in calendar_members next to the user's role, so calendar reads are served from
+# there and this collection holds everything else. users created before memberships existed can still carry
+# the arrays until scripts/db_data_uploaders/migrate_user_memberships.py has run, reads merge them in until then
+class MembershipDataHelper:
+
+    collection = 'memberships'
+    states = ('active', 'pending')
+
+    # the user array each (resource_type, state) used to be kept in
+    legacy_fields = {
+        ('team', 'active'): 'teams',
+        ('team', 'pending'): 'pending_teams',
+        ('task', 'active'): 'tasks',
+        ('task', 'pending'): 'pending_tasks',
+        ('chat', 'active'): 'chats',
+        ('chat', 'pending'): 'pending_chats',
+        ('note', 'active'): 'notes',
+        ('class', 'active'): 'classes',
+    }
+
+    @staticmethod
+    def build_membership_id(user_id: str, resource_type: str, resource_id: str):
+        return f"{user_id}:{resource_type}:{resource_id}"
+
+
+    @staticmethod
+    def build_membership(
+        user_id: str,
+        resource_type: str,
+        resource_id: str,
+        state: str = 'active',
+        order: float = None,
+    ):
+        return {
+            '_id': MembershipDataHelper.build_membership_id(user_id, resource_type, resource_id),
+            'user_id': str(user_id),
+            'resource_type': resource_type,
+            'resource_id': str(resource_id),
+            'state': state,
+            # reordering numbers a user's list from 0, a new membership is stamped with the time so it lands last
+            'order': datetime.now().timestamp() if order is None else order,
+        }
+
+
+    @staticmethod
+    async def create_membership_indexes(db):
+        # the listing index carries resource_id, so reading a user's ordered ids never touches the documents
+        await asyncio.gather(
+            db[MembershipDataHelper.collection].create_index(
+                [('user_id', 1), ('resource_type', 1), ('state', 1), ('order', 1), ('resource_id', 1)],
+                name='user_id_resource_type_state_order',
+            ),
+            db[MembershipDataHelper.collection].create_index(
+                [('resource_type', 1), ('resource_id', 1)],
+                name='resource_type_resource_id',
+            ),
+        )
+
+
+    @staticmethod
+    async def upsert_memberships(request: Request, memberships: list[dict]):
+        if len(memberships) == 0:
+            return None
+
+        try:
+            return await request.app.db[MembershipDataHelper.collection].bulk_write(
+                [ReplaceOne({'_id': membership['_id']}, membership, upsert=True) for membership in memberships],
+                ordered=False,
+            )
+        except Exception as e:
+            logger.error(f"Error saving memberships: {e}")
+            return None
+
+
+    @staticmethod
+    async def remove_membership(request: Request, user_id: str, resource_type: str, resource_id: str):
+        try:
+            return await request.app.db[MembershipDataHelper.collection].delete_one(
+                {'_id': MembershipDataHelper.build_membership_id(user_id, resource_type, resource_id)}
+            )
+        except Exception as e:
+            logger.error(f"Error removing user {user_id} from {resource_type} {resource_id}: {e}")
+            return None
+
+
+    @staticmethod
+    def get_legacy_ids(user: dict, resource_type: str, state: str):
+        legacy_field = MembershipDataHelper.legacy_fields.get((resource_type, state))
+        return list(user.get(legacy_field, [])) if legacy_field else []
+
+
+    @staticmethod
+    async def get_resource_ids(request: Request, user: dict, resource_type: str, state: str = 'active'):
+        if resource_type == 'calendar':
+            calendar_ids = await CalendarMemberHelper.get_user_calendar_ids(request, user['_id'], pending=state == 'pending')
+            # the personal calendar is a member like any other, but callers serve it on its own
+            return [calendar_id for calendar_id in calendar_ids if calendar_id != user.get('personal_calendar')]
+
+        cursor = request.app.db[MembershipDataHelper.collection].find(
+            {'user_id': str(user['_id']), 'resource_type': resource_type, 'state': state},
+            projection={'_id': 0, 'resource_id': 1},
+        ).sort('order', 1)
+        resource_ids = [membership['resource_id'] async for membership in cursor]
+
+        # anything still in a legacy array predates memberships, so it keeps its place ahead of them
+        return list(dict.fromkeys(MembershipDataHelper.get_legacy_ids(user, resource_type, state) + resource_ids))
+
+
+    @staticmethod
+    async def reorder(request: Request, user: dict, resource_type: str, ordered_ids: list[str]):
+        if len(ordered_ids) == 0:
+            return None
+
+        # every id is written, so a user still on the legacy array is moved over in the same call
+        try:
+            reordered = await request.app.db[MembershipDataHelper.collection].bulk_write(
+                [
+                    UpdateOne(
+                        {'_id': MembershipDataHelper.build_membership_id(user['_id'], resource_type, resource_id)},
+                        {
+                            '$set': {'order': order},
+                            '$setOnInsert': {
+                                'user_id': str(user['_id']),
+                                'resource_type': resource_type,
+                                'resource_id': str(resource_id),
+                                'state': 'active',
+                            },
+                        },
+                        upsert=True,
+                    )
+                    for order, resource_id in enumerate(ordered_ids)
+                ],
+                ordered=False,
+            )
+        except Exception as e:
+            logger.error(f"Error reordering {resource_type} memberships for user {user['_id']}: {e}")
+            return None
+
+        legacy_field = MembershipDataHelper.legacy_fields.get((resource_type, 'active'))
+
+        if legacy_field in user:
+            await request.app.db['users'].update_one({'_id': user['_id']}, {'$unset': {legacy_field: ''}})
+
+        return reordered
@@ -0,0 +1,238 @@
+from scripts.ttl_cache import user_search_cache
+import asyncio
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Typeahead over users. Every user stores a lowercase search_terms array (name, email and company/job title
+# words) under a multikey index, so each query word becomes an index range scan for that prefix.
+# Typos are handled by fuzzy_search_keys, the first letters of every term plus each way of dropping one of
+# them. A word with one typo in those letters still shares a key with the term, so candidates are found by
+# exact key lookups and then ranked by edit distance
+class UserSearchHelper():
+
+    searchable_fields = ('first_name', 'last_name', 'email', 'company', 'job_title')
+
+    user_projection = {
+        'first_name': 1,
+        'last_name': 1,
+        'email': 1,
+        'job_title': 1,
+        'company': 1,
+        '_id': 1,
+    }
+
+    default_limit = 10
+    max_limit = 50
+    # words shorter than this are too ambiguous for typo tolerance
+    fuzzy_min_length = 4
+    fuzzy_key_length = 4
+    fuzzy_max_candidates = 100
+
+    @staticmethod
+    def split_terms(value):
+        if not isinstance(value, str):
+            return []
+        return [term for term in re.split(r'[^a-z0-9]+', value.lower()) if term]
+
+
+    @staticmethod
+    def build_search_terms(user: dict):
+        search_terms = set()
+
+        # queries are split the same way, so "jane.doe@gm" matches on jane, doe and gm
+        for field in UserSearchHelper.searchable_fields:
+            search_terms.update(UserSearchHelper.split_terms(user.get(field)))
+
+        return sorted(search_terms)
+
+
+    @staticmethod
+    def build_fuzzy_keys(term: str):
+        # typos after the key letters leave the prefix itself intact, typos inside them leave a shared deletion
+        prefix = term[:UserSearchHelper.fuzzy_key_length]
+        fuzzy_keys = {prefix} | {prefix[:index] + prefix[index + 1:] for index in range(len(prefix))}
+        return {fuzzy_key for fuzzy_key in fuzzy_keys if fuzzy_key}
+
+
+    @staticmethod
+    def build_fuzzy_search_keys(search_terms: list):
+        fuzzy_search_keys = set()
+
+        for term in search_terms:
+            fuzzy_search_keys.update(UserSearchHelper.build_fuzzy_keys(term))
+
+        return sorted(fuzzy_search_keys)
+
+
+    @staticmethod
+    def build_prefix_filter(term: str):
+        # a range instead of a regex, so the bounds are plain index bounds for any input
+        return {'search_terms': {'$gte': term, '$lt': term + '\uffff'}}
+
+
+    @staticmethod
+    def get_max_distance(term: str):
+        if len(term) < UserSearchHelper.fuzzy_min_length:
+            return 0
+        return 1 if len(term) < 8 else 2
+
+
+    @staticmethod
+    def get_prefix_distance(query_term: str, search_term: str, max_distance: int):
+        # optimal string alignment distance from query_term to the closest prefix of search_term,
+        # abandoned as soon as every alignment is past max_distance
+        search_term = search_term[:len(query_term) + max_distance]
+        out_of_band = max_distance + 1
+        previous_previous_row = None
+        previous_row = list(range(len(search_term) + 1))
+
+        for i in range(1, len(query_term) + 1):
+            current_row = [i] + [out_of_band] * len(search_term)
+
+            # cells more than max_distance off the diagonal can never come back under it
+            for j in range(max(1, i - max_distance), min(len(search_term), i + max_distance) + 1):
+                cost = 0 if query_term[i - 1] == search_term[j - 1] else 1
+                current_row[j] = min(
+                    previous_row[j] + 1,
+                    current_row[j - 1] + 1,
+                    previous_row[j - 1] + cost,
+                )
+                if i > 1 and j > 1 and query_term[i - 1] == search_term[j - 2] and query_term[i - 2] == search_term[j - 1]:
+                    current_row[j] = min(current_row[j], previous_previous_row[j - 2] + 1)
+
+            if min(current_row) > max_distance:
+                return out_of_band
+
+            previous_previous_row, previous_row = previous_row, current_row
+
+        # the last row holds the distance to every prefix of search_term
+        return min(previous_row)
+
+
+    @staticmethod
+    def get_term_distance(query_term: str, search_terms: list, max_distance: int):
+        best_distance = max_distance + 1
+
+        for search_term in search_terms:
+            best_distance = min(best_distance, UserSearchHelper.get_prefix_distance(query_term, search_term, max_distance))
+            if best_distance == 0:
+                return 0
+
+        return best_distance
+
+
+    @staticmethod
+    def build_user_ref(document: dict):
+        return {field: document.get(field) or '' for field in ('company', 'email', 'first_name', 'job_title', 'last_name', '_id')}
+
+
+    @staticmethod
+    def parse_limit(limit):
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            return UserSearchHelper.default_limit
+        return max(1, min(limit, UserSearchHelper.max_limit))
+
+
+    @staticmethod
+    async def find_prefix_matches(request, query_terms: list, limit: int, cursor: str = None):
+        query = {'$and': [UserSearchHelper.build_prefix_filter(term) for term in query_terms]}
+
+        # _id order is stable, so the last _id of a page is the cursor for the next one
+        if cursor:
+            query['$and'].append({'_id': {'$gt': cursor}})
+
+        return await request.app.db['users'].find(
+            query,
+            projection=UserSearchHelper.user_projection,
+        ).sort('_id', 1).limit(limit + 1).to_list(None)
+
+
+    @staticmethod
+    async def find_fuzzy_matches(request, query_terms: list, limit: int, exclude_ids: set):
+        fuzzy_terms = [term for term in query_terms if UserSearchHelper.get_max_distance(term) > 0]
+
+        if len(fuzzy_terms) == 0:
+            return []
+
+        # every candidate has to match each word anyway, so the longest one is enough to find them,
+        # ties go alphabetically so the same query always looks up the same keys
+        anchor_term = min(fuzzy_terms, key=lambda term: (-len(term), term))
+        candidates = await request.app.db['users'].find(
+            {
+                'fuzzy_search_keys': {'$in': sorted(UserSearchHelper.build_fuzzy_keys(anchor_term))},
+                '_id': {'$nin': list(exclude_ids)},
+            },
+            projection={**UserSearchHelper.user_projection, 'search_terms': 1},
+        ).sort('_id', 1).limit(UserSearchHelper.fuzzy_max_candidates).to_list(None)
+
+        scored_candidates = []
+        for candidate in candidates:
+            search_terms = candidate.pop('search_terms', [])
+            total_distance = 0
+
+            for term in query_terms:
+                max_distance = UserSearchHelper.get_max_distance(term)
+                distance = UserSearchHelper.get_term_distance(term, search_terms, max_distance)
+                if distance > max_distance:
+                    break
+                total_distance += distance
+            else:
+                scored_candidates.append((total_distance, candidate['_id'], candidate))
+
+        scored_candidates.sort(key=lambda scored: scored[:2])
+        return [(candidate, 1 / (1 + distance)) for distance, _, candidate in scored_candidates[:limit]]
+
+
+    @staticmethod
+    async def search_users(request, user_query: str, limit=None, cursor: str = None):
+        query_terms = UserSearchHelper.split_terms(user_query)
+        limit = UserSearchHelper.parse_limit(limit)
+
+        if len(query_terms) == 0:
+            return {'user_results': [], 'next_cursor': None}
+
+        cache_key = (' '.join(query_terms), limit, cursor)
+        cached_results = user_search_cache.lookup(cache_key)
+
+        if cached_results is not None:
+            return cached_results
+
+        prefix_matches = await UserSearchHelper.find_prefix_matches(request, query_terms, limit, cursor)
+        has_next_page = len(prefix_matches) > limit
+        prefix_matches = prefix_matches[:limit]
+
+        user_results = [{'user': UserSearchHelper.build_user_ref(document), 'score': 1} for document in prefix_matches]
+
+        # typo matches only fill out the first page, later pages walk exact prefix matches
+        if cursor is None and len(user_results) < limit:
+            fuzzy_matches = await UserSearchHelper.find_fuzzy_matches(
+                request,
+                query_terms,
+                limit - len(user_results),
+                {document['_id'] for document in prefix_matches},
+            )
+            user_results.extend(
+                {'user': UserSearchHelper.build_user_ref(document), 'score': score}
+                for document, score in fuzzy_matches
+            )
+
+        search_results = {
+            'user_results': user_results,
+            'next_cursor': prefix_matches[-1]['_id'] if has_next_page else None,
+        }
+
+        user_search_cache[cache_key] = search_results
+        return search_results
+
+
+    @staticmethod
+    async def create_user_search_indexes(db):
+        await asyncio.gather(
+            db['users'].create_index('search_terms', name='search_terms'),
+            db['users'].create_index('fuzzy_search_keys', name='fuzzy_search_keys'),
+        )
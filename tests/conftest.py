@@ -1,10 +1,9 @@
 import pytest
 import certifi
-import os
 from fastapi.testclient import TestClient
 from motor.motor_asyncio import AsyncIOMotorClient
 from main import app as main_app
-from dotenv import dotenv_values
+from scripts.settings import get_settings
 from scripts.jwt_token_encoders import encode_bearer_token
 from models.user import UserLogin
 
@@ -16,11 +15,10 @@ def test_client():
 
 @pytest.fixture
 def test_client_with_db():
-    dotenv_path = os.path.join(os.path.dirname(__file__), "..", ".env")
-    config = dotenv_values(dotenv_path)
+    settings = get_settings()
     
-    mongodb_client = AsyncIOMotorClient(config["DEV_MONGO_URI"], tlsCAFile=certifi.where())
-    db = mongodb_client[config["DEV_DB_NAME"]]
+    mongodb_client = AsyncIOMotorClient(settings.dev_mongo_uri, tlsCAFile=certifi.where())
+    db = mongodb_client[settings.dev_db_name]
 
     # Inject the db instance into your FastAPI app
     main_app.mongodb_client = mongodb_client
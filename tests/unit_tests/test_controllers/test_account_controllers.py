@@ -0,0 +1,17 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from controllers.account_controller import delete_account
+
+
+# @pytest.mark.skip(reason='Not implemented')
+@patch('controllers.account_controller.token_verification_cache')
+def test_delete_account_revokes_cached_access_tokens_and_refresh_tokens(mock_token_verification_cache):
+    request = MagicMock()
+    request.state.principal = None
+    request.app.db['users'].find_one = AsyncMock(return_value={'_id': 'test-user', 'email': 'test@gmail.com'})
+    request.app.db['refresh_tokens'].delete_many = AsyncMock()
+
+    asyncio.run(delete_account(request, {'email': 'test@gmail.com'}))
+
+    mock_token_verification_cache.revoke_user_tokens.assert_called_once_with('test@gmail.com')
+    request.app.db['refresh_tokens'].delete_many.assert_awaited_once_with({'user_id': 'test-user'})
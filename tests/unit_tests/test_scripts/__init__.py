@@ -0,0 +1,3 @@
+# This folder is for testing all db and service logic for controllers.
+# all db queries are mocked in this folder.
+# Actual db testing is done in the integration folder, unit_testing is only for checking if edge cases are handled
\ No newline at end of file
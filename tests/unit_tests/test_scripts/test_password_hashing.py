@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+import threading
+from fastapi import HTTPException
+from scripts.password_hashing import PasswordHasher
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_password_hasher_round_trip():
+    hasher = PasswordHasher(workers=1, max_pending=2, retry_after=1)
+
+    hashed_password = asyncio.run(hasher.hash_password('Test123$'))
+
+    assert isinstance(hashed_password, str)
+    assert asyncio.run(hasher.check_password('Test123$', hashed_password)) is True
+    assert asyncio.run(hasher.check_password('wrong', hashed_password)) is False
+    assert hasher.stats()['completed'] == 3
+    hasher.shutdown()
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_password_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(workers=1, max_pending=1, retry_after=2)
+    release = threading.Event()
+
+    async def saturate():
+        blocked_hash = asyncio.create_task(hasher.run(release.wait))
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as exception:
+            await hasher.run(release.wait)
+
+        release.set()
+        await blocked_hash
+        return exception.value
+
+    rejection = asyncio.run(saturate())
+
+    assert rejection.status_code == 503
+    assert rejection.headers['Retry-After'] == '2'
+    assert hasher.stats()['rejected'] == 1
+    assert hasher.stats()['pending'] == 0
+    hasher.shutdown()
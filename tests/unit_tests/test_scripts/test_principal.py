@@ -0,0 +1,30 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
+from scripts.principal import load_principal, principal_projection
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_load_principal_reads_the_caller_once_per_request():
+    request = MagicMock()
+    request.state = SimpleNamespace()
+    request.app.db['users'].find_one = AsyncMock(return_value={'_id': '1', 'email': 'test@gmail.com', 'calendars': ['a']})
+
+    async def load_repeatedly():
+        return [await load_principal(request, 'test@gmail.com') for _ in range(3)]
+
+    principals = asyncio.run(load_repeatedly())
+
+    assert all(principal is principals[0] for principal in principals)
+    assert request.state.principal['_id'] == '1'
+    request.app.db['users'].find_one.assert_awaited_once_with({'email': 'test@gmail.com'}, projection=principal_projection)
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_load_principal_does_not_cache_missing_users():
+    request = MagicMock()
+    request.state = SimpleNamespace()
+    request.app.db['users'].find_one = AsyncMock(return_value=None)
+
+    assert asyncio.run(load_principal(request, 'gone@gmail.com')) is None
+    assert not hasattr(request.state, 'principal')
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+import time
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+from scripts.ttl_cache import TokenVerificationCache
+from scripts import jwt_token_decoders
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_token_cache_entries_expire_with_the_token():
+    cache = TokenVerificationCache(maxsize=10, ttl=60 * 60, negative_ttl=60)
+
+    cache.add_token('expired', {'email': 'test@gmail.com', 'exp': time.time() - 1})
+    cache.add_token('valid', {'email': 'test@gmail.com', 'exp': time.time() + 60 * 60 * 24})
+
+    assert 'expired' not in cache
+    assert cache.lookup('valid').payload['email'] == 'test@gmail.com'
+    assert cache.tokens_by_email['test@gmail.com'] == {'valid'}
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_token_cache_revokes_every_token_for_a_user():
+    cache = TokenVerificationCache(maxsize=10, ttl=60 * 60, negative_ttl=60)
+    expires = time.time() + 60 * 60
+
+    cache.add_token('first', {'email': 'test@gmail.com', 'exp': expires})
+    cache.add_token('second', {'email': 'test@gmail.com', 'exp': expires})
+    cache.add_token('other', {'email': 'other@gmail.com', 'exp': expires})
+
+    cache.revoke_user_tokens('test@gmail.com')
+
+    assert cache.lookup('first') is None
+    assert cache.lookup('second') is None
+    assert cache.lookup('other') is not None
+    assert cache.stats()['revocations'] == 2
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_validate_bearer_token_negatively_caches_unknown_users(monkeypatch):
+    cache = TokenVerificationCache(maxsize=10, ttl=60 * 60, negative_ttl=60)
+    monkeypatch.setattr(jwt_token_decoders, 'token_verification_cache', cache)
+    monkeypatch.setattr(jwt_token_decoders, 'decode_bearer_token', MagicMock(return_value={'email': 'gone@gmail.com', 'exp': time.time() + 60}))
+
+    request = MagicMock()
+    request.app.db['users'].find_one = AsyncMock(return_value=None)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exception:
+            asyncio.run(jwt_token_decoders.validate_bearer_token(request, 'token'))
+        assert exception.value.status_code == 401
+
+    request.app.db['users'].find_one.assert_awaited_once_with({'email': 'gone@gmail.com'}, projection={'_id': 1})
+    assert cache.stats()['negative_hits'] == 1
@@ -0,0 +1,62 @@
+from datetime import datetime
+from services.service_helpers.calendar_free_busy_helpers import FreeBusyHelper
+
+day_window = {'start': '2024-03-04 00:00:00', 'end': '2024-03-05 00:00:00'}
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_merge_intervals_folds_overlapping_and_touching_blocks():
+    window_start = datetime(2024, 3, 4)
+    window_end = datetime(2024, 3, 5)
+    intervals = [
+        (datetime(2024, 3, 4, 13), datetime(2024, 3, 4, 14)),
+        (datetime(2024, 3, 4, 9), datetime(2024, 3, 4, 10)),
+        (datetime(2024, 3, 4, 9, 30), datetime(2024, 3, 4, 11)),
+        (datetime(2024, 3, 4, 11), datetime(2024, 3, 4, 12)),
+        (datetime(2024, 3, 3, 23), datetime(2024, 3, 4, 1)),
+    ]
+
+    busy = FreeBusyHelper.merge_intervals(intervals, window_start, window_end)
+
+    assert busy == [
+        [datetime(2024, 3, 4, 0), datetime(2024, 3, 4, 1)],
+        [datetime(2024, 3, 4, 9), datetime(2024, 3, 4, 12)],
+        [datetime(2024, 3, 4, 13), datetime(2024, 3, 4, 14)],
+    ]
+    assert FreeBusyHelper.invert_intervals(busy, window_start, window_end)[0] == [datetime(2024, 3, 4, 1), datetime(2024, 3, 4, 9)]
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_build_free_busy_places_events_on_every_user_who_can_see_them():
+    users = [
+        {'_id': 'lead', 'calendars': ['team-calendar'], 'personal_calendar': 'lead-personal'},
+        {'_id': 'member', 'calendars': ['team-calendar'], 'personal_calendar': 'member-personal'},
+    ]
+    events = [
+        {'_id': '1', 'calendar_id': 'team-calendar', 'event_date': '2024-03-04 00:00:00', 'event_time': '09:00:00'},
+        {'_id': '2', 'calendar_id': 'member-personal', 'event_date': '2024-03-04 00:00:00', 'event_time': '09:30'},
+        {'_id': '3', 'calendar_id': 'lead-personal', 'event_date': '2024-03-01 00:00:00', 'event_time': '15:00:00', 'repeats': True, 'repeat_option': 'daily'},
+    ]
+
+    free_busy = FreeBusyHelper.build_free_busy(users, events, day_window)
+
+    assert free_busy['users']['lead']['busy'] == [
+        {'start': '2024-03-04 09:00:00', 'end': '2024-03-04 10:00:00'},
+        {'start': '2024-03-04 15:00:00', 'end': '2024-03-04 16:00:00'},
+    ]
+    assert free_busy['users']['member']['busy'] == [{'start': '2024-03-04 09:00:00', 'end': '2024-03-04 10:30:00'}]
+    assert free_busy['busy'] == [
+        {'start': '2024-03-04 09:00:00', 'end': '2024-03-04 10:30:00'},
+        {'start': '2024-03-04 15:00:00', 'end': '2024-03-04 16:00:00'},
+    ]
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_events_without_a_time_block_the_whole_day():
+    users = [{'_id': 'lead', 'calendars': [], 'personal_calendar': 'lead-personal'}]
+    events = [{'_id': '1', 'calendar_id': 'lead-personal', 'event_date': '2024-03-04 00:00:00', 'event_time': ''}]
+
+    free_busy = FreeBusyHelper.build_free_busy(users, events, day_window)
+
+    assert free_busy['busy'] == [{'start': '2024-03-04 00:00:00', 'end': '2024-03-05 00:00:00'}]
+    assert free_busy['free'] == []
@@ -0,0 +1,114 @@
+from services.service_helpers.calendar_recurrence_helpers import RecurrenceHelper
+
+march_window = {'start': '2024-03-01 00:00:00', 'end': '2024-04-01 00:00:00'}
+
+
+def build_repeating_event(event_id: str, event_date: str, repeat_option: str, **kwargs):
+    return {
+        '_id': event_id,
+        'calendar_id': '456',
+        'event_date': event_date,
+        'event_name': 'Standup',
+        'repeats': True,
+        'repeat_option': repeat_option,
+        **kwargs,
+    }
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_daily_event_started_years_ago_only_expands_inside_window():
+    event = build_repeating_event('daily-event', '2019-06-15 08:00:00', 'daily')
+
+    occurrences = RecurrenceHelper.expand_event(event, march_window)
+
+    assert len(occurrences) == 31
+    assert occurrences[0]['event_date'] == '2024-03-01 08:00:00'
+    assert occurrences[-1]['event_date'] == '2024-03-31 08:00:00'
+    assert occurrences[0]['recurring_event_id'] == 'daily-event'
+    assert occurrences[0]['occurrence_date'] == '2024-03-01'
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_weekly_and_weekday_events_land_on_the_right_days():
+    weekly_event = build_repeating_event('weekly-event', '2024-02-06 09:00:00', 'weekly')
+    weekday_event = build_repeating_event('weekday-event', '2024-02-29 09:00:00', 'Weekdays')
+    short_window = {'start': '2024-03-01 00:00:00', 'end': '2024-03-12 00:00:00'}
+
+    weekly_occurrences = RecurrenceHelper.expand_event(weekly_event, march_window)
+    weekday_occurrences = RecurrenceHelper.expand_event(weekday_event, short_window)
+
+    assert [occurrence['occurrence_date'] for occurrence in weekly_occurrences] == [
+        '2024-03-05', '2024-03-12', '2024-03-19', '2024-03-26',
+    ]
+    assert [occurrence['occurrence_date'] for occurrence in weekday_occurrences] == [
+        '2024-03-01', '2024-03-04', '2024-03-05', '2024-03-06', '2024-03-07', '2024-03-08', '2024-03-11',
+    ]
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_monthly_event_on_the_31st_falls_back_to_month_end():
+    event = build_repeating_event('monthly-event', '2024-01-31 12:00:00', 'monthly')
+    window = {'start': '2024-02-01 00:00:00', 'end': '2024-05-01 00:00:00'}
+
+    occurrences = RecurrenceHelper.expand_event(event, window)
+
+    assert [occurrence['occurrence_date'] for occurrence in occurrences] == ['2024-02-29', '2024-03-31', '2024-04-30']
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_exceptions_and_moved_occurrences_are_applied():
+    event = build_repeating_event(
+        'edited-event',
+        '2024-02-28 08:00:00',
+        'daily',
+        recurrence_exceptions=['2024-03-02'],
+        recurrence_overrides={
+            '2024-03-03': {'event_date': '2024-04-05 08:00:00'},
+            '2024-02-29': {'event_date': '2024-03-15 10:00:00', 'event_name': 'Moved standup'},
+        },
+    )
+
+    occurrences = RecurrenceHelper.expand_event(event, march_window)
+    occurrence_dates = [occurrence['occurrence_date'] for occurrence in occurrences]
+    moved_occurrence = next(occurrence for occurrence in occurrences if occurrence['occurrence_date'] == '2024-02-29')
+
+    assert len(occurrences) == 30
+    assert '2024-03-02' not in occurrence_dates
+    assert '2024-03-03' not in occurrence_dates
+    assert moved_occurrence['event_date'] == '2024-03-15 10:00:00'
+    assert moved_occurrence['event_name'] == 'Moved standup'
+    assert 'recurrence_overrides' not in moved_occurrence
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_is_occurrence_only_accepts_canonical_dates_in_the_series():
+    event = build_repeating_event('weekday-event', '2024-02-29 09:00:00', 'weekdays')
+
+    assert RecurrenceHelper.is_occurrence(event, '2024-03-11') is True
+    assert RecurrenceHelper.is_occurrence(event, '2024-03-09') is False
+    assert RecurrenceHelper.is_occurrence(event, '20240311') is False
+    assert RecurrenceHelper.is_occurrence(event, '2024-02-28') is False
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_expand_events_keeps_one_off_events_and_unknown_rules():
+    one_off_event = {'_id': 'one-off', 'event_date': '2024-03-10 08:00:00', 'repeats': False}
+    unknown_rule_event = build_repeating_event('unknown-rule', '2024-03-20 08:00:00', 'every other blue moon')
+
+    expanded_events = RecurrenceHelper.expand_events([one_off_event, unknown_rule_event], march_window)
+
+    assert expanded_events == [one_off_event, unknown_rule_event]
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_expansion_is_cached_until_the_event_revision_changes():
+    event = build_repeating_event('revised-event', '2024-02-28 08:00:00', 'daily', revision=3)
+
+    first_occurrences = RecurrenceHelper.expand_event(event, march_window)
+    # a stale copy at the same revision is served from the cache, the bumped revision is expanded again
+    cached_occurrences = RecurrenceHelper.expand_event({**event, 'event_name': 'Renamed standup'}, march_window)
+    revised_occurrences = RecurrenceHelper.expand_event({**event, 'event_name': 'Renamed standup', 'revision': 4}, march_window)
+
+    assert cached_occurrences == first_occurrences
+    assert cached_occurrences[0]['event_name'] == 'Standup'
+    assert revised_occurrences[0]['event_name'] == 'Renamed standup'
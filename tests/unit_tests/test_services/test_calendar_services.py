@@ -1,6 +1,6 @@
 import pytest
 import logging
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.responses import JSONResponse
 
 logger = logging.getLogger(__name__)
@@ -67,7 +67,7 @@ def test_remove_user_from_calendar_service_fails_on_no_user_or_calendar(
 
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
 def test_remove_user_from_calendar_service_fails_on_no_user_has_no_permissions(
     mock_has_calendar_permissions,
     mock_validate_user_and_calendar,
@@ -101,11 +101,11 @@ def test_remove_user_from_calendar_service_fails_on_no_user_has_no_permissions(
 
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.filter_out_user_from_calendar_list')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_removal_update')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
 def test_remove_user_from_calendar_service_failed_to_filter_user(
     mock_has_calendar_permissions,
-    mock_filter_out_user_from_calendar_list,
+    mock_build_user_removal_update,
     mock_validate_user_and_calendar,
     test_client_with_db,
     generate_test_token,
@@ -119,7 +119,7 @@ def test_remove_user_from_calendar_service_failed_to_filter_user(
         {'_id': '456', 'created_by': '999', 'authorized_users': ['123']}
     )
     mock_has_calendar_permissions.return_value = True
-    mock_filter_out_user_from_calendar_list.return_value = None
+    mock_build_user_removal_update.return_value = None
 
     response = test_client_with_db.delete(
         f'calendar/{calendar_id}/removeUserFromCalendar/{user_type}/{user_id}',
@@ -138,13 +138,13 @@ def test_remove_user_from_calendar_service_failed_to_filter_user(
 
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.filter_out_user_from_calendar_list')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.replace_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_removal_update')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_user_from_calendar', new_callable=AsyncMock)
 def test_remove_user_from_calendar_service_failed_to_filter_user(
     mock_has_calendar_permissions,
-    mock_filter_out_user_from_calendar_list,
-    mock_replace_one_calendar,
+    mock_build_user_removal_update,
+    mock_remove_user_from_calendar,
     mock_validate_user_and_calendar,
     test_client_with_db,
     generate_test_token,
@@ -158,8 +158,8 @@ def test_remove_user_from_calendar_service_failed_to_filter_user(
         {'_id': '456', 'created_by': '999', 'authorized_users': ['123']}
     )
     mock_has_calendar_permissions.return_value = True
-    mock_filter_out_user_from_calendar_list.return_value = ({'_id': 'test'})
-    mock_replace_one_calendar.return_value = None
+    mock_build_user_removal_update.return_value = ({'_id': 'test'})
+    mock_remove_user_from_calendar.return_value = None
 
     response = test_client_with_db.delete(
         f'calendar/{calendar_id}/removeUserFromCalendar/{user_type}/{user_id}',
@@ -178,14 +178,14 @@ def test_remove_user_from_calendar_service_failed_to_filter_user(
 
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.filter_out_user_from_calendar_list')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.replace_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_removal_update')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_user_from_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
 def test_remove_user_from_calendar_fails_on_failure_to_repopulate_calendar(
         mock_populate_one_calendar,
-        mock_replace_one_calendar,
-        mock_filter_out_user_from_calendar_list,
+        mock_remove_user_from_calendar,
+        mock_build_user_removal_update,
         mock_has_calendar_permissions,
         mock_validate_user_and_calendar,
         test_client_with_db,
@@ -200,8 +200,8 @@ def test_remove_user_from_calendar_fails_on_failure_to_repopulate_calendar(
         {'_id': '456', 'created_by': '999', 'authorized_users': ['123']}
     )
     mock_has_calendar_permissions.return_value = True
-    mock_filter_out_user_from_calendar_list.return_value = ({'_id': '123'})
-    mock_replace_one_calendar.return_value = ({'_id': '123'})
+    mock_build_user_removal_update.return_value = ({'_id': '123'})
+    mock_remove_user_from_calendar.return_value = ({'_id': '123'})
     mock_populate_one_calendar.return_value = None
 
     response = test_client_with_db.delete(
@@ -221,14 +221,14 @@ def test_remove_user_from_calendar_fails_on_failure_to_repopulate_calendar(
 
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.filter_out_user_from_calendar_list')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.replace_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_removal_update')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_user_from_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
 def test_remove_user_from_calendar_succeeds(
         mock_populate_one_calendar,
-        mock_replace_one_calendar,
-        mock_filter_out_user_from_calendar_list,
+        mock_remove_user_from_calendar,
+        mock_build_user_removal_update,
         mock_has_calendar_permissions,
         mock_validate_user_and_calendar,
         test_client_with_db,
@@ -243,8 +243,8 @@ def test_remove_user_from_calendar_succeeds(
         {'_id': '456', 'created_by': '999', 'authorized_users': ['123']}
     )
     mock_has_calendar_permissions.return_value = True
-    mock_filter_out_user_from_calendar_list.return_value = ({'_id': '123'})
-    mock_replace_one_calendar.return_value = ({'_id': '123'})
+    mock_build_user_removal_update.return_value = ({'_id': '123'})
+    mock_remove_user_from_calendar.return_value = ({'_id': '123'})
     mock_populate_one_calendar.return_value = ({'_id': '123'})
 
     response = test_client_with_db.delete(
@@ -297,7 +297,9 @@ def test_add_user_to_calendar_fails_on_no_permissions(
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
 def test_add_user_to_calendar_fails_on_no_calendar_found(
+        mock_has_calendar_permissions,
         mock_find_one_user,
         mock_validate_user_and_calendar,
         test_client_with_db,
@@ -311,6 +313,7 @@ def test_add_user_to_calendar_fails_on_no_calendar_found(
         {'_id': '123'}, 
         {'_id': '456', 'created_by': '999', 'authorized_users': ['123']}
     )
+    mock_has_calendar_permissions.return_value = True
     mock_find_one_user.return_value = None
 
     response = test_client_with_db.post(
@@ -331,7 +334,7 @@ def test_add_user_to_calendar_fails_on_no_calendar_found(
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
 def test_add_user_to_calendar_fails_on_no_calendar_permissions(
         mock_has_calendar_permissions,
         mock_find_one_user,
@@ -368,7 +371,7 @@ def test_add_user_to_calendar_fails_on_no_calendar_permissions(
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.add_user_to_calendar_users_list', new_callable=AsyncMock)
 def test_add_user_to_calendar_fails_on_user_not_added_to_calendar_list(
         mock_add_user_to_calendar_users_list,
@@ -408,56 +411,11 @@ def test_add_user_to_calendar_fails_on_user_not_added_to_calendar_list(
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.add_user_to_calendar_users_list', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
-def test_add_user_to_calendar_fails_on_no_calendar_return_on_update_find(
-        mock_find_one_calendar,
-        mock_add_user_to_calendar_users_list,
-        mock_has_calendar_permissions,
-        mock_find_one_user,
-        mock_validate_user_and_calendar,
-        test_client_with_db,
-        generate_test_token,
-    ):
-    calendar_id = 'test_calendar_id'
-    user_type = 'test_user_type'
-    user_id = 'authorized'
-
-    mock_validate_user_and_calendar.return_value = (
-        {'_id': '123'}, 
-        {'_id': '456', 'created_by': '999', 'authorized_users': ['123']}
-    )
-    mock_find_one_user.return_value = {'_id': '123'}
-    mock_has_calendar_permissions.return_value = True
-    mock_add_user_to_calendar_users_list.return_value = {'_id': '123'}
-    mock_find_one_calendar.return_value = None
-
-    response = test_client_with_db.post(
-        f'calendar/{calendar_id}/addUser/{user_id}/{user_type}',
-        headers={
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {generate_test_token}',
-            'Content-type': 'application/json',
-        }
-    )
-
-    json_response = response.json()
-
-    assert response.status_code == 404
-    assert json_response['detail'] == "Failed to refetch updated calendar with added user"
-
-
-# @pytest.mark.skip(reason='Not implemented')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.add_user_to_calendar_users_list', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.verify_user_is_in_calendar')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.verify_user_is_in_calendar', new_callable=AsyncMock)
 def test_add_user_to_calendar_fails_on_user_in_calendar_check_fail(
         mock_verify_user_is_in_calendar,
-        mock_find_one_calendar,
         mock_add_user_to_calendar_users_list,
         mock_has_calendar_permissions,
         mock_find_one_user,
@@ -476,7 +434,6 @@ def test_add_user_to_calendar_fails_on_user_in_calendar_check_fail(
     mock_find_one_user.return_value = {'_id': '123'}
     mock_has_calendar_permissions.return_value = True
     mock_add_user_to_calendar_users_list.return_value = {'_id': '123'}
-    mock_find_one_calendar.return_value = {'_id': '123'}
     mock_verify_user_is_in_calendar.return_value = False
 
     response = test_client_with_db.post(
@@ -497,15 +454,13 @@ def test_add_user_to_calendar_fails_on_user_in_calendar_check_fail(
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.add_user_to_calendar_users_list', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.verify_user_is_in_calendar')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.verify_user_is_in_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
 def test_add_user_to_calendar_fails_on_unpopulated_calendar_return(
         mock_populate_one_calendar,
         mock_verify_user_is_in_calendar,
-        mock_find_one_calendar,
         mock_add_user_to_calendar_users_list,
         mock_has_calendar_permissions,
         mock_find_one_user,
@@ -524,7 +479,6 @@ def test_add_user_to_calendar_fails_on_unpopulated_calendar_return(
     mock_find_one_user.return_value = {'_id': '123'}
     mock_has_calendar_permissions.return_value = True
     mock_add_user_to_calendar_users_list.return_value = {'_id': '123'}
-    mock_find_one_calendar.return_value = {'_id': '123'}
     mock_verify_user_is_in_calendar.return_value = True
     mock_populate_one_calendar.return_value = None
 
@@ -546,15 +500,13 @@ def test_add_user_to_calendar_fails_on_unpopulated_calendar_return(
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.validate_user_and_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.has_calendar_permissions', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.add_user_to_calendar_users_list', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.verify_user_is_in_calendar')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.verify_user_is_in_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
 def test_add_user_to_calendar_succeeds(
         mock_populate_one_calendar,
         mock_verify_user_is_in_calendar,
-        mock_find_one_calendar,
         mock_add_user_to_calendar_users_list,
         mock_has_calendar_permissions,
         mock_find_one_user,
@@ -573,7 +525,6 @@ def test_add_user_to_calendar_succeeds(
     mock_find_one_user.return_value = {'_id': '123'}
     mock_has_calendar_permissions.return_value = True
     mock_add_user_to_calendar_users_list.return_value = {'_id': '123'}
-    mock_find_one_calendar.return_value = {'_id': '123'}
     mock_verify_user_is_in_calendar.return_value = True
     mock_populate_one_calendar.return_value = {'_id': '123'}
 
@@ -594,23 +545,19 @@ def test_add_user_to_calendar_succeeds(
 
 
 # @pytest.mark.skip(reason='Not implemented')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_all_calendar_members', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.delete_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_all_calendar_notes', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_all_calendar_events', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.log_user_removal_status')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_calendar_from_users', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.group_all_user_ids_in_calendar')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
 def test_delete_calendar_succeeds(
         mock_find_one_user,
         mock_find_one_calendar,
-        mock_group_all_user_ids_in_calendar,
-        mock_remove_calendar_from_users,
-        mock_log_user_removal_status,
         mock_remove_all_calendar_events,
         mock_remove_all_calendar_notes,
         mock_delete_one_calendar,
+        mock_remove_all_calendar_members,
         test_client_with_db,
         generate_test_token,
     ):
@@ -624,12 +571,10 @@ def test_delete_calendar_succeeds(
         'events': ['123', '322'],
         'notes': ['123', '322'],
     }
-    mock_group_all_user_ids_in_calendar.return_value = ['123', '322']
-    mock_remove_calendar_from_users.return_value = 0
-    mock_log_user_removal_status.return_value = f'When attempting to remove calendar from user instances, {mock_remove_calendar_from_users.return_value}\'s were not removed'
     mock_remove_all_calendar_events.return_value = 0
     mock_remove_all_calendar_notes.return_value = 0
-    mock_delete_one_calendar.return_value = {'_id': '456'}
+    mock_delete_one_calendar.return_value = MagicMock(deleted_count=1)
+    mock_remove_all_calendar_members.return_value = 2
 
     response = test_client_with_db.delete(
         f'calendar/{calendar_id}/deleteCalendar/{user_id}',
@@ -645,27 +590,24 @@ def test_delete_calendar_succeeds(
     assert response.status_code == 200
     assert json_response['detail'] == "Calendar successfully deleted"
     assert 'calendar_id' in json_response
+    mock_remove_all_calendar_members.assert_awaited_once()
 
 
 
 # @pytest.mark.skip(reason='Not implemented')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_all_calendar_members', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.delete_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_all_calendar_notes', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_all_calendar_events', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.log_user_removal_status')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_calendar_from_users', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.group_all_user_ids_in_calendar')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
 def test_delete_calendar_fails_on_no_delete(
         mock_find_one_user,
         mock_find_one_calendar,
-        mock_group_all_user_ids_in_calendar,
-        mock_remove_calendar_from_users,
-        mock_log_user_removal_status,
         mock_remove_all_calendar_events,
         mock_remove_all_calendar_notes,
         mock_delete_one_calendar,
+        mock_remove_all_calendar_members,
         test_client_with_db,
         generate_test_token,
     ):
@@ -679,9 +621,6 @@ def test_delete_calendar_fails_on_no_delete(
         'events': ['123', '322'],
         'notes': ['123', '322'],
     }
-    mock_group_all_user_ids_in_calendar.return_value = ['123', '322']
-    mock_remove_calendar_from_users.return_value = 0
-    mock_log_user_removal_status.return_value = f'When attempting to remove calendar from user instances, {mock_remove_calendar_from_users.return_value}\'s were not removed'
     mock_remove_all_calendar_events.return_value = 0
     mock_remove_all_calendar_notes.return_value = 0
     mock_delete_one_calendar.return_value = None
@@ -699,6 +638,7 @@ def test_delete_calendar_fails_on_no_delete(
 
     assert response.status_code == 422
     assert json_response['detail'] == "Failed to delete calendar"
+    mock_remove_all_calendar_members.assert_not_called()
 
 
 # @pytest.mark.skip(reason='Not implemented')
@@ -790,13 +730,11 @@ def test_delete_calendar_fails_on_no_user_find(
 
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.handle_remove_user_from_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_calendar_from_user', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
 def test_user_leave_calendar_request_succeeds(
         mock_find_one_user,
         mock_find_one_calendar,
-        mock_remove_calendar_from_user,
         mock_handle_remove_user_from_calendar,
         test_client_with_db,
         generate_test_token,
@@ -812,7 +750,6 @@ def test_user_leave_calendar_request_succeeds(
         'authorized_users': ['123'],
         'view_only_users': ['000'],
     }
-    mock_remove_calendar_from_user.return_value = {'_id': '123'}
     mock_handle_remove_user_from_calendar.return_value = {'_id': '456'}
 
     response = test_client_with_db.delete(
@@ -833,13 +770,11 @@ def test_user_leave_calendar_request_succeeds(
 
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.handle_remove_user_from_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_calendar_from_user', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
 def test_user_leave_calendar_request_fails_on_failure_to_remove_user_from_calendar(
         mock_find_one_user,
         mock_find_one_calendar,
-        mock_remove_calendar_from_user,
         mock_handle_remove_user_from_calendar,
         test_client_with_db,
         generate_test_token,
@@ -855,7 +790,6 @@ def test_user_leave_calendar_request_fails_on_failure_to_remove_user_from_calend
         'authorized_users': ['123'],
         'view_only_users': ['000'],
     }
-    mock_remove_calendar_from_user.return_value = {'_id': '123'}
     mock_handle_remove_user_from_calendar.return_value = None
 
     response = test_client_with_db.delete(
@@ -873,45 +807,6 @@ def test_user_leave_calendar_request_fails_on_failure_to_remove_user_from_calend
     assert json_response['detail'] == "Failed to complete removal"
 
 
-# @pytest.mark.skip(reason='Not implemented')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_calendar_from_user', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
-def test_user_leave_calendar_request_fails_on_failure_to_remove_calendar_from_user(
-        mock_find_one_user,
-        mock_find_one_calendar,
-        mock_remove_calendar_from_user,
-        test_client_with_db,
-        generate_test_token,
-    ):
-
-    calendar_id = '456'
-    user_id = '123'
-
-    mock_find_one_user.return_value = {'_id': '123'}
-    mock_find_one_calendar.return_value = {
-        '_id': '456', 
-        'created_by': '999', 
-        'authorized_users': ['123'],
-        'view_only_users': ['000'],
-    }
-    mock_remove_calendar_from_user.return_value = None
-    
-    response = test_client_with_db.delete(
-        f'calendar/{calendar_id}/leaveCalendar/{user_id}',
-        headers={
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {generate_test_token}',
-            'Content-type': 'application/json',
-        }
-    )
-
-    json_response = response.json()
-
-    assert response.status_code == 422
-    assert json_response['detail'] == "Failed to complete removal"
-
-
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_user', new_callable=AsyncMock)
@@ -1333,7 +1228,7 @@ def test_update_calendar_note_fails_on_failure_to_migrate_calendars(
     ):
 
     mock_verify_user_has_calendar_authorization.return_value = True
-    mock_find_one_calendar_note.return_value = {'_id': '111', 'calendar_id': '456'}
+    mock_find_one_calendar_note.return_value = {'_id': '111', 'calendar_id': '123'}
     mock_create_updated_note.return_value = {'_id': '111'}
 
     # THIS IS ONLY TESTING THE FAILURE TO REMOVE FROM ORIGINAL CALENDAR
@@ -1726,7 +1621,7 @@ def test_delete_note_service_fails_on_no_permissions(
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.upload_new_event', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=MagicMock)
 @patch('scripts.json_parser', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_reference', new_callable=AsyncMock)
 def test_post_event_service_succeeds(
@@ -1782,7 +1677,7 @@ def test_post_event_service_succeeds(
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.upload_new_event', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=MagicMock)
 @patch('scripts.json_parser', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_reference', new_callable=AsyncMock)
 def test_post_event_service_fails_on_no_populated_calendar(
@@ -1836,7 +1731,7 @@ def test_post_event_service_fails_on_no_populated_calendar(
 
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.upload_new_event', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=MagicMock)
 @patch('scripts.json_parser', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_reference', new_callable=AsyncMock)
 def test_post_event_service_fails_on_event_not_uploaded(
@@ -1889,7 +1784,7 @@ def test_post_event_service_fails_on_event_not_uploaded(
 
 
 # @pytest.mark.skip(reason='Not implemented')
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=MagicMock)
 @patch('scripts.json_parser', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_reference', new_callable=AsyncMock)
 def test_post_event_service_fails_on_unable_to_create_event_instance(
@@ -2007,7 +1902,7 @@ def test_post_event_service_fails_on_no_user_ref_built(mock_build_user_reference
 # @pytest.mark.skip(reason='Not implemented')
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.replace_event', new_callable=AsyncMock)
-@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=MagicMock)
 @patch('scripts.json_parser', new_callable=AsyncMock)
 @patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.get_event_creator', new_callable=AsyncMock)
 def test_edit_event_service_succeeds(
@@ -2056,5 +1951,298 @@ def test_edit_event_service_succeeds(
     json_response = response.json()
 
     assert response.status_code == 200
-    assert json_response['detail'] == "Success! We uploaded your event"
-    assert 'updated_calendar' in json_response
\ No newline at end of file
+    assert json_response['detail'] == "Success! We updated your event"
+    assert 'updated_calendar' in json_response
+
+
+# @pytest.mark.skip(reason='Not implemented')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.upload_new_event', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=MagicMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_reference', new_callable=AsyncMock)
+def test_post_event_service_returns_delta_when_requested(
+        mock_build_user_reference,
+        mock_create_event_instance,
+        mock_upload_new_event,
+        mock_populate_one_calendar,
+        test_client_with_db,
+        generate_test_token,
+    ):
+    mock_build_user_reference.return_value = {'_id': '123', 'first_name': 'Master', 'last_name': 'Chief'}
+    mock_create_event_instance.return_value = {'_id': '789', 'event_name': 'Test Event'}
+    mock_upload_new_event.return_value = 8
+
+    response = test_client_with_db.post(
+        'calendar/456/createEvent',
+        headers={
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {generate_test_token}',
+            'Content-type': 'application/json',
+            'X-Response-Mode': 'delta',
+        },
+        json={
+            'combinedDateAndTime': '2022-01-01 00:00:00',
+            'date': '2022-01-01',
+            'eventName': 'Test Event',
+            'eventDescription': 'This is a test event',
+            'repeat': False,
+            'repeatOption': 'none',
+            'selectedCalendar': 'Personal Calendar',
+            'selectedCalendarId': '123',
+            'selectedTime': '00:00:00',
+        }
+    )
+
+    json_response = response.json()
+
+    assert response.status_code == 200
+    assert json_response['detail'] == 'Success! We uploaded your event'
+    assert json_response['calendar_id'] == '456'
+    assert json_response['version'] == 8
+    assert json_response['event']['_id'] == '789'
+    assert mock_create_event_instance.call_count == 1
+    assert mock_create_event_instance.call_args.args[1:] == ('456', mock_build_user_reference.return_value)
+    mock_populate_one_calendar.assert_not_called()
+
+
+# @pytest.mark.skip(reason='Not implemented')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.replace_event', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=MagicMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.get_event_creator', new_callable=AsyncMock)
+def test_put_event_service_returns_delta_when_requested(
+        mock_get_event_creator,
+        mock_create_event_instance,
+        mock_replace_event,
+        mock_populate_one_calendar,
+        test_client_with_db,
+        generate_test_token,
+    ):
+    mock_get_event_creator.return_value = {'_id': '123', 'first_name': 'Master', 'last_name': 'Chief'}
+    mock_create_event_instance.return_value = {'_id': '789', 'event_name': 'Edited Event'}
+    mock_replace_event.return_value = 9
+
+    response = test_client_with_db.put(
+        'calendar/456/editEvent/789',
+        headers={
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {generate_test_token}',
+            'Content-type': 'application/json',
+            'X-Response-Mode': 'delta',
+        },
+        json={
+            'combinedDateAndTime': '2022-01-01 00:00:00',
+            'date': '2022-01-01',
+            'eventName': 'Edited Event',
+            'eventDescription': 'This is a test event',
+            'repeat': False,
+            'repeatOption': 'none',
+            'selectedCalendar': 'Personal Calendar',
+            'selectedCalendarId': '123',
+            'selectedTime': '00:00:00',
+        }
+    )
+
+    json_response = response.json()
+
+    assert response.status_code == 200
+    assert json_response['detail'] == 'Success! We updated your event'
+    assert json_response['calendar_id'] == '456'
+    assert json_response['version'] == 9
+    assert json_response['event']['event_name'] == 'Edited Event'
+    assert mock_create_event_instance.call_args.args[1:] == ('456', mock_get_event_creator.return_value)
+    assert mock_replace_event.call_args.args[2] == '789'
+    mock_populate_one_calendar.assert_not_called()
+
+
+# @pytest.mark.skip(reason='Not implemented')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_calendar_sync', new_callable=AsyncMock)
+@patch('services.calendar_services.CalendarData.get_user_calendars_service', new_callable=AsyncMock)
+def test_sync_calendars_service_succeeds(
+        mock_get_user_calendars_service,
+        mock_build_calendar_sync,
+        test_client_with_db,
+        generate_test_token,
+    ):
+    mock_get_user_calendars_service.return_value = {
+        '_id': '123',
+        'calendars': ['456'],
+        'pending_calendars': [],
+        'personal_calendar': '789',
+    }
+    mock_build_calendar_sync.return_value = {
+        'calendars': [{'calendar_id': '456', 'version': 3, 'events': [], 'deleted_event_ids': ['1']}],
+        'full_calendars': [],
+        'removed_calendar_ids': [],
+    }
+
+    response = test_client_with_db.post(
+        'calendar/sync',
+        headers={
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {generate_test_token}',
+            'Content-type': 'application/json',
+        },
+        json={'calendars': {'456': 2, '789': 0}}
+    )
+
+    json_response = response.json()
+
+    assert response.status_code == 200
+    assert json_response['detail'] == 'Calendars synced'
+    assert json_response['calendars'][0]['deleted_event_ids'] == ['1']
+    assert mock_build_calendar_sync.call_args.args[1] == ['456', '789']
+    assert mock_build_calendar_sync.call_args.args[2] == {'456': 2, '789': 0}
+
+
+# @pytest.mark.skip(reason='Not implemented')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_note_from_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.delete_note', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar_note', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.find_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.verify_user_has_calendar_authorization', new_callable=AsyncMock)
+def test_delete_note_service_returns_delta_when_requested(
+        mock_verify_user_has_calendar_authorization,
+        mock_find_one_calendar,
+        mock_find_one_calendar_note,
+        mock_delete_note,
+        mock_remove_note_from_calendar,
+        mock_populate_one_calendar,
+        test_client_with_db,
+        generate_test_token,
+    ):
+
+    mock_verify_user_has_calendar_authorization.return_value = True
+    mock_find_one_calendar.return_value = {'_id': '456'}
+    mock_find_one_calendar_note.return_value = {'_id': '111', 'calendar_id': '456'}
+    mock_delete_note.return_value = {'_id': '111'}
+    mock_remove_note_from_calendar.return_value = 8
+
+    response = test_client_with_db.delete(
+        'calendar/456/deleteNote/111',
+        headers={
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {generate_test_token}',
+            'Content-type': 'application/json',
+            'X-Response-Mode': 'delta',
+        },
+    )
+
+    json_response = response.json()
+
+    assert response.status_code == 200
+    assert json_response['calendar_id'] == '456'
+    assert json_response['version'] == 8
+    assert json_response['deleted_note_id'] == '111'
+    assert 'updated_calendar' not in json_response
+    mock_populate_one_calendar.assert_not_called()
+
+
+# @pytest.mark.skip(reason='Not implemented')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.record_calendar_change', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.delete_event', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.remove_event_from_calendar', new_callable=AsyncMock)
+def test_delete_event_service_returns_delta_with_query_flag(
+        mock_remove_event_from_calendar,
+        mock_delete_event,
+        mock_record_calendar_change,
+        mock_populate_one_calendar,
+        test_client_with_db,
+        generate_test_token,
+    ):
+
+    mock_remove_event_from_calendar.return_value = {'_id': '456'}
+    mock_delete_event.return_value = {'_id': '111'}
+    mock_record_calendar_change.return_value = 12
+
+    response = test_client_with_db.delete(
+        'calendar/456/deleteEvent/111?response=delta',
+        headers={
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {generate_test_token}',
+            'Content-type': 'application/json',
+        },
+    )
+
+    json_response = response.json()
+
+    assert response.status_code == 200
+    assert json_response['detail'] == 'Success! We deleted your event'
+    assert json_response['version'] == 12
+    assert json_response['deleted_event_id'] == '111'
+    mock_populate_one_calendar.assert_not_called()
+
+
+# @pytest.mark.skip(reason='Not implemented')
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.populate_one_calendar', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.upload_new_events', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.create_event_instance', new_callable=MagicMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.build_user_reference', new_callable=AsyncMock)
+@patch('services.service_helpers.calendar_service_helpers.CalendarDataHelper.verify_user_has_calendar_authorization', new_callable=AsyncMock)
+def test_post_events_service_uploads_all_events_in_one_batch(
+        mock_verify_user_has_calendar_authorization,
+        mock_build_user_reference,
+        mock_create_event_instance,
+        mock_upload_new_events,
+        mock_populate_one_calendar,
+        test_client_with_db,
+        generate_test_token,
+    ):
+    event_data = {
+        'combinedDateAndTime': '2022-01-01 00:00:00',
+        'date': '2022-01-01',
+        'eventName': 'Test Event',
+        'eventDescription': 'This is a test event',
+        'repeat': False,
+        'repeatOption': 'none',
+        'selectedCalendar': 'Personal Calendar',
+        'selectedCalendarId': '123',
+        'selectedTime': '00:00:00',
+    }
+
+    mock_verify_user_has_calendar_authorization.return_value = True
+    mock_build_user_reference.return_value = {'_id': '123', 'first_name': 'Master', 'last_name': 'Chief'}
+    mock_create_event_instance.side_effect = [{'_id': str(index), 'event_name': 'Test Event'} for index in range(3)]
+    mock_upload_new_events.return_value = 21
+
+    response = test_client_with_db.post(
+        'calendar/456/createEvents',
+        headers={
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {generate_test_token}',
+            'Content-type': 'application/json',
+            'X-Response-Mode': 'delta',
+        },
+        json=[event_data, event_data, event_data]
+    )
+
+    json_response = response.json()
+
+    assert response.status_code == 200
+    assert json_response['version'] == 21
+    assert [event['_id'] for event in json_response['events']] == ['0', '1', '2']
+    assert mock_upload_new_events.call_count == 1
+    assert len(mock_upload_new_events.call_args.args[2]) == 3
+    mock_populate_one_calendar.assert_not_called()
+
+
+# @pytest.mark.skip(reason='Not implemented')
+@pytest.mark.parametrize('date_window', [
+    {'start': '2024-03-04T00:00:00Z', 'end': ''},
+    {'start': '', 'end': '2024-03-05T00:00:00Z'},
+])
+def test_free_busy_service_requires_start_and_end(date_window, test_client_with_db, generate_test_token):
+    response = test_client_with_db.post(
+        'calendar/freeBusy',
+        headers={
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {generate_test_token}',
+            'Content-type': 'application/json',
+        },
+        json={'userIds': ['test-user'], **date_window}
+    )
+
+    assert response.status_code == 422
+    assert response.json()['detail'] == 'Free/busy needs a start and an end'
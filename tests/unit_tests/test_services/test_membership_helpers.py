@@ -0,0 +1,50 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from services.service_helpers.membership_helpers import MembershipDataHelper
+
+
+class MockCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, *args):
+        return self
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        for document in self.documents:
+            yield document
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_get_resource_ids_reads_ordered_memberships_after_legacy_ids():
+    request = MagicMock()
+    request.app.db['memberships'].find = MagicMock(return_value=MockCursor([{'resource_id': 'b'}, {'resource_id': 'c'}]))
+    user = {'_id': '1', 'teams': ['a', 'b']}
+
+    team_ids = asyncio.run(MembershipDataHelper.get_resource_ids(request, user, 'team'))
+
+    assert team_ids == ['a', 'b', 'c']
+    request.app.db['memberships'].find.assert_called_once_with(
+        {'user_id': '1', 'resource_type': 'team', 'state': 'active'},
+        projection={'_id': 0, 'resource_id': 1},
+    )
+
+
+# @pytest.mark.skip(reason='Not implemented')
+def test_reorder_numbers_memberships_and_drops_the_legacy_array():
+    request = MagicMock()
+    request.app.db['memberships'].bulk_write = AsyncMock()
+    request.app.db['users'].update_one = AsyncMock()
+
+    asyncio.run(MembershipDataHelper.reorder(request, {'_id': '1', 'teams': ['a', 'b']}, 'team', ['b', 'a']))
+
+    operations = request.app.db['memberships'].bulk_write.call_args.args[0]
+
+    assert [(operation._filter['_id'], operation._doc['$set']['order']) for operation in operations] == [
+        ('1:team:b', 0),
+        ('1:team:a', 1),
+    ]
+    request.app.db['users'].update_one.assert_awaited_once_with({'_id': '1'}, {'$unset': {'teams': ''}})